@@ -0,0 +1,306 @@
+"""
+API Cassettes
+Intercepts the browser's /api requests with the DevTools Fetch domain, so UI
+tests can run against recorded API responses instead of a live backend.
+
+- record: requests go to the API as usual; every response (status, headers,
+  body and how long it took) is saved to the test's cassette file.
+- replay: requests never leave the browser; they are answered from the
+  cassette in memory, after no delay, a fixed delay or the recorded one.
+
+Responses are keyed by method, path, query and a hash of the JSON body. A
+request repeated within a test (e.g. a list fetched before and after
+creating an item) gets the recorded responses in order. A request whose
+body differs from every recording (e.g. a name made from the current time)
+gets the responses recorded for its method, path and query, in recording
+order. Requests missing from the cassette are answered with 404 and fail
+the test in replay mode.
+
+Credentials never reach the cassette file: the secret headers and JSON
+fields failure bundles mask (failure_bundle.SECRET_HEADERS, SECRET_FIELDS) -
+the JWT of /api/auth/login, Set-Cookie, passwords - are saved as
+'<redacted>', and request bodies are hashed after the same masking.
+
+The Fetch domain reports paused requests as events, which execute_cdp_cmd
+cannot receive, so the interceptor keeps its own DevTools connection to the
+page in a background thread (trio, which Selenium's CDP client is built on).
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import trio
+from selenium.webdriver.common.bidi import cdp
+from failure_bundle import REDACTED, SECRET_HEADERS, redact_fields
+from perf_reports import read_json, write_json
+from shared_browser import devtools_endpoint
+
+
+# Response headers that describe the original transfer, not the recorded body
+DROPPED_HEADERS = {'content-length', 'content-encoding', 'transfer-encoding', 'connection',
+                   'keep-alive', 'date', 'etag'}
+
+ATTACH_TIMEOUT = 10
+
+
+def request_key(method, url, post_data=None, content_type=''):
+    """
+    Cassette key of a request: 'METHOD /path?sorted-query #body-hash'.
+
+    JSON bodies are hashed in canonical form with secret fields masked;
+    multipart bodies (with their random boundary) are not part of the key.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = f"{method} {parts.path}" + (f"?{query}" if query else '')
+    if post_data and 'multipart/' not in content_type:
+        try:
+            post_data = json.dumps(redact_fields(json.loads(post_data)), sort_keys=True, ensure_ascii=False)
+        except ValueError:
+            pass
+        key += ' #' + hashlib.sha1(post_data.encode('utf-8')).hexdigest()[:12]
+    return key
+
+
+def without_body(key):
+    """A request key without its body hash: 'METHOD /path?sorted-query'."""
+    return key.split(' #', 1)[0]
+
+
+def cassette_path(cassette_dir, nodeid):
+    """Cassette file of a test: <dir>/<module>/<test name>.json."""
+    module, _, name = nodeid.partition('::')
+    module = os.path.splitext(os.path.basename(module))[0]
+    return os.path.join(cassette_dir, module, re.sub(r'[^\w.-]+', '_', name).strip('_') + '.json')
+
+
+def page_websocket_url(driver):
+    """Browser DevTools WebSocket URL, CDP version and target id of the driver's tab."""
+    websocket_url, version = devtools_endpoint(driver.capabilities['goog:chromeOptions']['debuggerAddress'])
+    # chromedriver names windows by their DevTools target id
+    return websocket_url, version, driver.current_window_handle
+
+
+class Cassette:
+    """Recorded responses of one test, keyed by request_key()."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        # Keys answered from a recording with another body
+        self.fallbacks = []
+        self._played = {}
+        self._recorded = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        cassette = cls(path)
+        data = read_json(path)
+        if data is None:
+            raise FileNotFoundError(f"No cassette at {path} - record it with CASSETTE_MODE=record")
+        cassette.entries = data['interactions']
+        return cassette
+
+    def add(self, key, status, headers, body, base64_encoded, latency_ms):
+        """Add a recorded response, with secret headers and JSON fields masked."""
+        headers = [[name, REDACTED if name.lower() in SECRET_HEADERS else value] for name, value in headers]
+        entry = {'status': status, 'headers': headers, 'latency_ms': round(latency_ms, 1)}
+        if base64_encoded:
+            entry['body_base64'] = body
+        else:
+            try:
+                body = json.dumps(redact_fields(json.loads(body)), ensure_ascii=False)
+            except ValueError:
+                pass
+            entry['body'] = body
+        with self._lock:
+            entry['order'] = self._recorded
+            self._recorded += 1
+            self.entries.setdefault(key, []).append(entry)
+
+    def next_response(self, key):
+        """
+        The next recorded response for a key (the last one repeats), or None.
+
+        Without a recording of the exact body, the responses recorded for the
+        same method, path and query are played in recording order.
+        """
+        with self._lock:
+            responses = self.entries.get(key)
+            played_key = key
+            if not responses:
+                played_key = without_body(key)
+                responses = sorted((response for recorded, responses in self.entries.items()
+                                    if without_body(recorded) == played_key for response in responses),
+                                   key=lambda response: response.get('order', 0))
+                if not responses:
+                    return None
+                self.fallbacks.append(key)
+            index = self._played.get(played_key, 0)
+            self._played[played_key] = index + 1
+            return responses[min(index, len(responses) - 1)]
+
+    def __len__(self):
+        return sum(len(responses) for responses in self.entries.values())
+
+    def save(self):
+        directory, filename = os.path.split(self.path)
+        return write_json(directory, filename, {'version': 1, 'interactions': self.entries})
+
+
+class CassetteInterceptor:
+    """
+    Instrument that records or replays the /api responses of one test.
+
+    Args:
+        path: Cassette file of the test (see cassette_path)
+        mode: 'record' or 'replay'
+        latency: Replay delay - milliseconds, or 'recorded' for the
+            latency measured while recording
+
+    Raises:
+        FileNotFoundError: In replay mode, when the cassette does not exist
+    """
+
+    def __init__(self, path, mode, latency=0):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.mode = mode
+        self.latency = latency
+        self.cassette = Cassette.load(path) if mode == 'replay' else Cassette(path)
+        self.misses = []
+        self.errors = []
+        self._started = {}
+        self._thread = None
+        self._trio_token = None
+        self._cancel_scope = None
+
+    def attach(self, driver):
+        websocket_url, version, target_id = page_websocket_url(driver)
+        ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(websocket_url, version, target_id, ready), name='api-cassettes', daemon=True)
+        self._thread.start()
+        if not ready.wait(ATTACH_TIMEOUT) or self.errors:
+            raise RuntimeError(f"Could not intercept API requests: {self.errors or 'timeout'}")
+
+    def _run(self, websocket_url, version, target_id, ready):
+        try:
+            trio.run(self._intercept, websocket_url, version, target_id, ready)
+        except Exception as e:
+            self.errors.append(repr(e))
+            ready.set()
+
+    async def _intercept(self, websocket_url, version, target_id, ready):
+        devtools = cdp.import_devtools(version)
+        fetch = devtools.fetch
+        async with cdp.open_cdp(websocket_url) as connection:
+            # The driver's own tab - a shared browser hosts the tabs of other tests too
+            async with connection.open_session(devtools.target.TargetID(target_id)) as session:
+                stages = [fetch.RequestStage.REQUEST]
+                if self.mode == 'record':
+                    stages.append(fetch.RequestStage.RESPONSE)
+                events = session.listen(fetch.RequestPaused, buffer_size=100)
+                await session.execute(fetch.enable(patterns=[
+                    fetch.RequestPattern(url_pattern='*/api/*', request_stage=stage) for stage in stages
+                ]))
+                async with trio.open_nursery() as nursery:
+                    self._cancel_scope = nursery.cancel_scope
+                    self._trio_token = trio.lowlevel.current_trio_token()
+                    ready.set()
+                    async for event in events:
+                        nursery.start_soon(self._handle, session, fetch, event)
+
+    async def _handle(self, session, fetch, event):
+        request = event.request
+        if not urlsplit(request.url).path.startswith('/api/'):
+            # e.g. a dev server module under src/**/api/
+            await session.execute(fetch.continue_request(event.request_id))
+            return
+        content_type = next((v for k, v in request.headers.items() if k.lower() == 'content-type'), '')
+        key = request_key(request.method, request.url, request.post_data, content_type)
+        try:
+            if self.mode == 'replay':
+                await self._replay(session, fetch, event, key)
+            elif event.response_status_code is None:
+                self._started[event.network_id] = time.monotonic()
+                await session.execute(fetch.continue_request(event.request_id))
+            else:
+                await self._record(session, fetch, event, key)
+        except Exception as e:
+            # The page may have navigated away; never leave a request paused
+            self.errors.append(f"{key}: {e!r}")
+
+    async def _record(self, session, fetch, event, key):
+        started = self._started.pop(event.network_id, None)
+        latency_ms = (time.monotonic() - started) * 1000 if started else 0
+        body, base64_encoded = '', False
+        if event.response_status_code not in (204, 304) and not 300 <= event.response_status_code < 400:
+            body, base64_encoded = await session.execute(fetch.get_response_body(event.request_id))
+        headers = [[h.name, h.value] for h in event.response_headers or []
+                   if h.name.lower() not in DROPPED_HEADERS]
+        self.cassette.add(key, event.response_status_code, headers, body, base64_encoded, latency_ms)
+        await session.execute(fetch.continue_response(event.request_id))
+
+    async def _replay(self, session, fetch, event, key):
+        response = self.cassette.next_response(key)
+        if response is None:
+            self.misses.append(key)
+            body = json.dumps({'error': 'not in cassette', 'request': key}).encode('utf-8')
+            await session.execute(fetch.fulfill_request(
+                event.request_id, 404, [fetch.HeaderEntry('Content-Type', 'application/json')],
+                body=base64.b64encode(body).decode('ascii')))
+            return
+        delay_ms = response['latency_ms'] if self.latency == 'recorded' else float(self.latency)
+        if delay_ms:
+            await trio.sleep(delay_ms / 1000)
+        body = response.get('body_base64')
+        if body is None:
+            body = base64.b64encode(response['body'].encode('utf-8')).decode('ascii')
+        await session.execute(fetch.fulfill_request(
+            event.request_id, response['status'],
+            [fetch.HeaderEntry(name, value) for name, value in response['headers']], body=body))
+
+    def detach(self):
+        """Close the DevTools connection (paused requests are released by Chrome)."""
+        if self._trio_token and self._cancel_scope:
+            try:
+                trio.from_thread.run_sync(self._cancel_scope.cancel, trio_token=self._trio_token)
+            except trio.RunFinishedError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def finish(self, driver, item):
+        """
+        Save the recorded cassette (unless the test failed) or report replay misses.
+
+        Returns:
+            Failure message when replayed requests were missing from the
+            cassette, otherwise None
+        """
+        self.detach()
+        for error in self.errors:
+            print(f"⚠️ API cassette: {error}")
+        if self.mode == 'record':
+            report = getattr(item, 'rep_call', None)
+            if report is not None and report.failed:
+                print(f"⚠️ Test failed - cassette not saved: {self.cassette.path}")
+            else:
+                print(f"📼 Recorded {len(self.cassette)} API responses to {self.cassette.path}")
+                self.cassette.save()
+            return None
+        if self.cassette.fallbacks:
+            print(f"📼 {len(self.cassette.fallbacks)} API requests replayed from a recording with another body")
+        if not self.misses:
+            return None
+        lines = [f"{len(self.misses)} API requests not in cassette {self.cassette.path} "
+                 f"(re-record with CASSETTE_MODE=record):"]
+        lines += [f"    {key}" for key in dict.fromkeys(self.misses)]
+        return '\n'.join(lines)
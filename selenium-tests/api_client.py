@@ -0,0 +1,136 @@
+"""
+StudyHub-IL API Client
+Minimal synchronous client for the backend REST API, used by the harness
+to sign in, prepare data and inspect responses without a browser.
+"""
+
+import json
+import urllib.error
+import urllib.request
+
+
+class ApiError(Exception):
+    """Raised when the API answers with a non-2xx status."""
+
+    def __init__(self, method, path, status, body):
+        self.method = method
+        self.path = path
+        self.status = status
+        self.body = body
+        super().__init__(f"{method} {path} -> {status}: {body}")
+
+
+class ApiClient:
+    """
+    JSON client for the Express API.
+
+    Usage:
+        api = ApiClient(TestConfig.API_URL)
+        api.login(TestConfig.TEST_EMAIL, TestConfig.TEST_PASSWORD)
+        posts = api.get('/api/forum')
+    """
+
+    def __init__(self, base_url, token=None, timeout=30, registry=None):
+        """
+        Args:
+            base_url: API origin, e.g. TestConfig.API_URL
+            token: Optional bearer token
+            timeout: Request timeout in seconds
+            registry: Optional EntityRegistry that records what this client
+                creates, for cleanup when the test ends
+        """
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.user = None
+        self.timeout = timeout
+        self.registry = registry
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Send a request and decode the JSON response.
+
+        Args:
+            method: HTTP method
+            path: Path starting with /api (query string included)
+            body: Optional JSON-serializable request body
+            headers: Optional extra headers
+
+        Returns:
+            Decoded response body (None for an empty body)
+
+        Raises:
+            ApiError: On a non-2xx response
+        """
+        request_headers = {'Accept': 'application/json'}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            request_headers['Content-Type'] = 'application/json'
+        if self.token:
+            request_headers['Authorization'] = f'Bearer {self.token}'
+        request_headers.update(headers or {})
+
+        request = urllib.request.Request(
+            self.base_url + path, data=data, headers=request_headers, method=method
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                result = self._decode(response.read())
+                status = response.status
+        except urllib.error.HTTPError as e:
+            raise ApiError(method, path, e.code, self._decode(e.read())) from None
+        if self.registry is not None:
+            self.registry.record_response(method, path, status, result)
+        return result
+
+    @staticmethod
+    def _decode(raw):
+        if not raw:
+            return None
+        try:
+            return json.loads(raw.decode('utf-8'))
+        except ValueError:
+            return raw.decode('utf-8', errors='replace')
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, body=None, **kwargs):
+        return self.request('POST', path, body=body, **kwargs)
+
+    def put(self, path, body=None, **kwargs):
+        return self.request('PUT', path, body=body, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def login(self, email, password):
+        """
+        Sign in and keep the token for the following requests.
+
+        Returns:
+            Login response ({'token': ..., 'user': ...})
+        """
+        result = self.post('/api/auth/login', {'email': email, 'password': password})
+        self.token = result['token']
+        self.user = result['user']
+        return result
+
+
+def seed_browser_session(driver, base_url, login_result):
+    """
+    Sign a browser in by writing the client's auth storage directly,
+    skipping the login form.
+
+    Args:
+        driver: WebDriver instance
+        base_url: Frontend origin to store the session for
+        login_result: Response of ApiClient.login()
+    """
+    if not driver.current_url.startswith(base_url):
+        driver.get(f"{base_url}/login")
+    driver.execute_script(
+        "localStorage.setItem('token', arguments[0]);"
+        "localStorage.setItem('user', arguments[1]);",
+        login_result['token'], json.dumps(login_result['user'], ensure_ascii=False),
+    )
@@ -0,0 +1,101 @@
+"""
+Browser Cold-Start Benchmark
+Starts Chrome the default way (Selenium Manager resolves chromedriver, Chrome
+creates a new profile) and the cached way (browser_startup.py: cached driver
+path, clone of a warmed profile template), alternating between the two, and
+reports how long each takes until the browser has loaded its first page.
+
+The one-time costs of the cached mode (resolving the driver, building the
+template) are reported separately and excluded from the per-launch times.
+
+Usage:
+    python bench_browser_startup.py
+    python bench_browser_startup.py --launches 10
+"""
+
+import argparse
+import time
+from selenium import webdriver
+import browser_startup
+from conftest import TestConfig, chrome_options
+from perf_reports import percentile, write_json
+
+
+FIRST_PAGE = 'data:text/html,<p>ready</p>'
+
+
+def launch(mode):
+    """
+    Start one browser, load a page and quit.
+
+    Returns:
+        Dict with the seconds to a session and to the first loaded page
+    """
+    started = time.perf_counter()
+    if mode == 'cached':
+        driver = browser_startup.start_chrome(chrome_options)
+    else:
+        driver = webdriver.Chrome(options=chrome_options())
+    try:
+        session_s = time.perf_counter() - started
+        driver.get(FIRST_PAGE)
+        first_page_s = time.perf_counter() - started
+    finally:
+        driver.quit()
+        browser_startup.release_profile(driver)
+    return {'mode': mode, 'session_s': round(session_s, 3), 'first_page_s': round(first_page_s, 3)}
+
+
+def summarize(samples, key):
+    values = [s[key] for s in samples]
+    return {
+        'mean_s': round(sum(values) / len(values), 3),
+        'median_s': round(percentile(values, 0.5), 3),
+        'p95_s': round(percentile(values, 0.95), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Browser cold-start benchmark')
+    parser.add_argument('--launches', type=int, default=5, help='Browsers started per mode')
+    parser.add_argument('--out', default=TestConfig.PERF_REPORT_DIR, help='Output directory')
+    args = parser.parse_args()
+
+    print("Preparing the cached mode (driver resolution, profile template)...")
+    started = time.perf_counter()
+    browser_startup.ensure_template(chrome_options)
+    preparation_s = round(time.perf_counter() - started, 2)
+
+    samples = []
+    for i in range(args.launches):
+        # Alternate so both modes see the same machine state (page cache, load)
+        for mode in ('default', 'cached'):
+            sample = launch(mode)
+            samples.append(sample)
+            print(f"{i + 1:>3} {mode:<8} session {sample['session_s']:6.2f}s  "
+                  f"first page {sample['first_page_s']:6.2f}s")
+
+    results = {}
+    for mode in ('default', 'cached'):
+        runs = [s for s in samples if s['mode'] == mode]
+        results[mode] = {'session': summarize(runs, 'session_s'), 'first_page': summarize(runs, 'first_page_s')}
+
+    default, cached = results['default']['first_page'], results['cached']['first_page']
+    print("\n=== Time to first page ===")
+    for mode, stats in (('default', default), ('cached', cached)):
+        print(f"{mode:<8} mean {stats['mean_s']:.2f}s  median {stats['median_s']:.2f}s  p95 {stats['p95_s']:.2f}s")
+    print(f"Saved per launch: {default['median_s'] - cached['median_s']:.2f}s (median), "
+          f"one-time preparation {preparation_s}s")
+
+    path = write_json(args.out, 'browser_startup_bench.json', {
+        'launches': args.launches,
+        'preparation_s': preparation_s,
+        'one_time': browser_startup.STARTUP_STATS,
+        'results': results,
+        'samples': samples,
+    })
+    print(f"Results saved: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Repeat-Visit HTTP Cache Benchmark
+Loads each route cold (empty browser cache) and then warm in the same
+browser, classifies every resource of the warm visit by where it came from,
+and reports the bytes and time the cache saved per route. It also checks
+whether files under /uploads (served by express.static) carry validators
+and answer conditional requests with 304.
+
+Requires the frontend (BASE_URL) and the API (API_URL) to be running and the
+test user from .env to exist.
+
+Usage:
+    python bench_http_cache.py
+    python bench_http_cache.py --routes /summaries,/forum --uploads 5
+"""
+
+import argparse
+import time
+import urllib.error
+import urllib.request
+from conftest import TestConfig, create_driver, release_driver
+from api_client import ApiClient, seed_browser_session
+from network_log import duration_ms, get_network_log, header
+from perf_reports import write_json
+
+
+DEFAULT_ROUTES = ['/dashboard', '/summaries', '/forum', '/tools', '/profile']
+
+# Quiet period after which a page counts as settled
+NETWORK_IDLE_SECONDS = 0.5
+
+CACHE_CLASSES = ['memory-cache', 'disk-cache', '304', 'refetch', 'failed']
+
+NAVIGATION_TIMING_JS = """
+var nav = performance.getEntriesByType('navigation')[0];
+return nav ? nav.loadEventEnd : null;
+"""
+
+
+def classify(record):
+    """
+    Where a response came from.
+
+    Returns:
+        One of CACHE_CLASSES
+    """
+    if record['failed']:
+        return 'failed'
+    if record['from_memory_cache']:
+        return 'memory-cache'
+    if record['from_disk_cache']:
+        return 'disk-cache'
+    if record['status'] == 304:
+        return '304'
+    return 'refetch'
+
+
+def visit(driver, log, url):
+    """
+    Navigate to a URL and wait for the page and its API calls to settle.
+
+    Returns:
+        (requests, load_ms, settled_ms)
+    """
+    driver.get('about:blank')
+    cursor = log.mark()
+    started = time.time()
+    driver.get(url)
+    log.wait_for_idle(NETWORK_IDLE_SECONDS, timeout=TestConfig.PAGE_LOAD_TIMEOUT)
+    settled_ms = (log.last_activity - started) * 1000
+    load_ms = driver.execute_script(NAVIGATION_TIMING_JS)
+    requests = [r for r in log.since(cursor) if not r['url'].startswith('data:')]
+    return requests, load_ms, settled_ms
+
+
+def compare_visits(cold, warm):
+    """
+    Pair every warm request with the cold request for the same URL.
+
+    Returns:
+        List of per-resource rows
+    """
+    cold_by_url = {}
+    for record in cold:
+        cold_by_url.setdefault(record['url'], record)
+
+    rows = []
+    for record in warm:
+        previous = cold_by_url.get(record['url'])
+        # Cache hits may come without headers; the cold response has the originals
+        source = previous or record
+        cold_bytes = previous['encoded_bytes'] if previous else 0
+        cold_ms = duration_ms(previous) if previous else None
+        warm_ms = duration_ms(record)
+        rows.append({
+            'url': record['url'],
+            'type': record['resource_type'],
+            'class': classify(record),
+            'cold_bytes': cold_bytes,
+            'warm_bytes': record['encoded_bytes'],
+            'saved_bytes': max(0, cold_bytes - record['encoded_bytes']),
+            'saved_ms': round(cold_ms - warm_ms, 1) if cold_ms is not None and warm_ms is not None else None,
+            'cache_control': header(record, 'cache-control') or header(source, 'cache-control'),
+            'has_validator': bool(header(source, 'etag') or header(source, 'last-modified')),
+        })
+    return rows
+
+
+def measure_route(driver, log, route):
+    """
+    Cold and warm visit of one route.
+
+    Returns:
+        Route summary dict including per-resource rows
+    """
+    url = f"{TestConfig.BASE_URL}{route}"
+    driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+    cold, cold_load_ms, cold_settled_ms = visit(driver, log, url)
+    warm, warm_load_ms, warm_settled_ms = visit(driver, log, url)
+
+    resources = compare_visits(cold, warm)
+    counts = {name: 0 for name in CACHE_CLASSES}
+    for row in resources:
+        counts[row['class']] += 1
+
+    return {
+        'route': route,
+        'requests': len(resources),
+        'classes': counts,
+        'cold_bytes': sum(r['encoded_bytes'] for r in cold),
+        'warm_bytes': sum(r['encoded_bytes'] for r in warm),
+        'saved_bytes': sum(r['saved_bytes'] for r in resources),
+        'cold_load_ms': cold_load_ms,
+        'warm_load_ms': warm_load_ms,
+        'cold_settled_ms': round(cold_settled_ms, 1),
+        'warm_settled_ms': round(warm_settled_ms, 1),
+        'saved_ms': round(cold_settled_ms - warm_settled_ms, 1),
+        'resources': resources,
+    }
+
+
+def check_upload_validators(api, limit):
+    """
+    Check caching headers and conditional requests for files under /uploads.
+
+    Args:
+        api: Authenticated ApiClient
+        limit: Maximum number of files to check
+
+    Returns:
+        List of per-file results
+    """
+    summaries = api.get('/api/summaries') or []
+    paths = [s['filePath'] for s in summaries if s.get('filePath', '').startswith('uploads/')][:limit]
+
+    results = []
+    for path in paths:
+        url = f"{TestConfig.API_URL}/{path}"
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                headers = response.headers
+                size = len(response.read())
+        except urllib.error.HTTPError as e:
+            results.append({'url': url, 'status': e.code})
+            continue
+
+        conditional = {}
+        if headers.get('ETag'):
+            conditional['If-None-Match'] = headers['ETag']
+        if headers.get('Last-Modified'):
+            conditional['If-Modified-Since'] = headers['Last-Modified']
+
+        revalidation_status = None
+        if conditional:
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, headers=conditional), timeout=30) as r:
+                    revalidation_status = r.status
+            except urllib.error.HTTPError as e:
+                revalidation_status = e.code
+
+        results.append({
+            'url': url,
+            'status': 200,
+            'bytes': size,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'cache_control': headers.get('Cache-Control'),
+            'revalidation_status': revalidation_status,
+        })
+    return results
+
+
+def print_route(summary):
+    classes = '  '.join(f"{name} {count}" for name, count in summary['classes'].items() if count)
+    print(f"{summary['route']:<12} {summary['requests']:>3} requests  {classes}")
+    print(f"{'':<12} bytes {summary['cold_bytes']:>9} -> {summary['warm_bytes']:>9} "
+          f"(saved {summary['saved_bytes']})  settled {summary['cold_settled_ms']:.0f}ms -> "
+          f"{summary['warm_settled_ms']:.0f}ms (saved {summary['saved_ms']:.0f}ms)")
+    refetched = [r for r in summary['resources'] if r['class'] == 'refetch' and r['cold_bytes']]
+    for row in sorted(refetched, key=lambda r: r['warm_bytes'], reverse=True)[:5]:
+        print(f"{'':<14}refetched {row['warm_bytes']:>8}B  {row['url']}  "
+              f"(cache-control: {row['cache_control']}, validator: {row['has_validator']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Repeat-visit HTTP cache benchmark')
+    parser.add_argument('--routes', default=','.join(DEFAULT_ROUTES), help='Comma-separated client routes')
+    parser.add_argument('--uploads', type=int, default=3, help='Number of /uploads files to check (0 to skip)')
+    parser.add_argument('--out', default=TestConfig.PERF_REPORT_DIR, help='Output directory')
+    args = parser.parse_args()
+
+    api = ApiClient(TestConfig.API_URL)
+    login = api.login(TestConfig.TEST_EMAIL, TestConfig.TEST_PASSWORD)
+
+    driver = create_driver(capture_network=True)
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        log = get_network_log(driver)
+        seed_browser_session(driver, TestConfig.BASE_URL, login)
+
+        routes = []
+        for route in args.routes.split(','):
+            summary = measure_route(driver, log, route)
+            print_route(summary)
+            routes.append(summary)
+    finally:
+        driver.quit()
+        release_driver(driver)
+
+    uploads = check_upload_validators(api, args.uploads) if args.uploads else []
+    for result in uploads:
+        print(f"/uploads {result['url']}: etag={bool(result.get('etag'))} "
+              f"last-modified={bool(result.get('last_modified'))} "
+              f"cache-control={result.get('cache_control')} "
+              f"conditional -> {result.get('revalidation_status')}")
+
+    path = write_json(args.out, 'http_cache.json', {'routes': routes, 'uploads': uploads})
+    print(f"Results saved: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Front-End List Rendering Benchmark
+Seeds the stand-in backend with growing datasets and measures how the list
+pages (/forum, /summaries, /tools) cope: time-to-render, scroll frame times,
+main-thread blocking and JS heap. The resulting curves show at which dataset
+size pagination or virtualization becomes mandatory.
+
+The frontend is loaded from TestConfig.BASE_URL through the stand-in, so the
+client dev server (or a production build) must be running; the Node API and
+database are not needed.
+
+Usage:
+    python bench_list_rendering.py
+    python bench_list_rendering.py --sizes 100,1000 --routes /forum --runs 5
+"""
+
+import argparse
+import csv
+import json
+import os
+import statistics
+from selenium.webdriver.support.ui import WebDriverWait
+from conftest import TestConfig, create_driver, release_driver
+from longtasks import DRAIN_LONG_TASKS_JS, LONG_TASK_OBSERVER_JS, LONG_TASK_THRESHOLD_MS
+from perf_reports import percentile, write_json
+from standin_backend import TOKEN_PREFIX, StandinData, StandinServer
+
+
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+DEFAULT_ROUTES = ['/forum', '/summaries', '/tools']
+
+# A route "needs" pagination/virtualization once it crosses either budget
+RENDER_BUDGET_MS = 1000
+FRAME_BUDGET_MS = 1000 / 30
+
+# API endpoint each list page loads its data from
+ROUTE_ENDPOINTS = {'/forum': '/api/forum', '/summaries': '/api/summaries', '/tools': '/api/tools'}
+
+MARKER_STORAGE_KEY = '__benchRenderMarker'
+
+# Records when the first item of the list (whose title is stored in
+# localStorage before navigating) is added to the DOM, and the next frame
+# after that. performance.now() is relative to the start of the navigation.
+RENDER_MARKER_JS = r"""
+(function () {
+  var marker = localStorage.getItem('__benchRenderMarker');
+  var state = window.__benchRender = { renderedAt: null, paintedAt: null };
+  if (!marker) return;
+  var observer = new MutationObserver(function (records) {
+    for (var i = 0; i < records.length; i++) {
+      var added = records[i].addedNodes;
+      for (var j = 0; j < added.length; j++) {
+        var text = added[j].textContent;
+        if (text && text.indexOf(marker) !== -1) {
+          state.renderedAt = performance.now();
+          observer.disconnect();
+          requestAnimationFrame(function () {
+            setTimeout(function () { state.paintedAt = performance.now(); }, 0);
+          });
+          return;
+        }
+      }
+    }
+  });
+  observer.observe(document, { childList: true, subtree: true });
+})();
+"""
+
+# Scrolls from top to bottom over a fixed number of animation frames and
+# returns the duration of every frame.
+SCROLL_FRAMES_JS = r"""
+var done = arguments[arguments.length - 1];
+var steps = arguments[0];
+var scroller = document.scrollingElement || document.documentElement;
+var distance = Math.max(0, scroller.scrollHeight - window.innerHeight);
+var frames = [];
+var last = null;
+var step = 0;
+window.scrollTo(0, 0);
+function frame(now) {
+  if (last !== null) frames.push(now - last);
+  last = now;
+  if (step++ >= steps) { done(frames); return; }
+  window.scrollTo(0, distance * step / steps);
+  requestAnimationFrame(frame);
+}
+requestAnimationFrame(frame);
+"""
+
+PAGE_METRICS_JS = """
+var endpoint = arguments[0];
+var api = performance.getEntriesByType('resource').filter(function (e) {
+  return e.name.indexOf(endpoint) !== -1;
+}).pop();
+return {
+  renderedAt: window.__benchRender.renderedAt,
+  paintedAt: window.__benchRender.paintedAt,
+  apiMs: api ? api.responseEnd - api.startTime : null,
+  apiBytes: api ? api.encodedBodySize : null,
+  domNodes: document.getElementsByTagName('*').length
+};
+"""
+
+
+def measure_route(driver, server_url, route, marker, scroll_steps):
+    """
+    Load one list page and collect its rendering metrics.
+
+    Args:
+        driver: WebDriver already on the stand-in origin
+        server_url: Base URL of the stand-in server
+        route: Client route to load
+        marker: Title of the first list item
+        scroll_steps: Number of frames to spread the scroll over
+
+    Returns:
+        Dict of metrics for this load
+    """
+    driver.execute_script(f"localStorage.setItem('{MARKER_STORAGE_KEY}', arguments[0]);", marker)
+    driver.get(f"{server_url}{route}")
+    WebDriverWait(driver, TestConfig.PAGE_LOAD_TIMEOUT * 4, poll_frequency=0.05).until(
+        lambda d: d.execute_script('return window.__benchRender && window.__benchRender.paintedAt')
+    )
+
+    metrics = driver.execute_script(PAGE_METRICS_JS, ROUTE_ENDPOINTS[route])
+    tasks = driver.execute_script(DRAIN_LONG_TASKS_JS) or []
+    frames = driver.execute_async_script(SCROLL_FRAMES_JS, scroll_steps)
+
+    driver.execute_cdp_cmd('HeapProfiler.collectGarbage', {})
+    heap = driver.execute_cdp_cmd('Runtime.getHeapUsage', {})
+
+    return {
+        'time_to_render_ms': metrics['paintedAt'],
+        'dom_inserted_ms': metrics['renderedAt'],
+        'api_ms': metrics['apiMs'],
+        'api_bytes': metrics['apiBytes'],
+        'dom_nodes': metrics['domNodes'],
+        'blocking_ms': sum(max(0, t['duration'] - LONG_TASK_THRESHOLD_MS) for t in tasks),
+        'longest_task_ms': max((t['duration'] for t in tasks), default=0),
+        'frame_p50_ms': percentile(frames, 0.5),
+        'frame_p95_ms': percentile(frames, 0.95),
+        'frame_max_ms': max(frames, default=None),
+        'janky_frames': sum(1 for f in frames if f > FRAME_BUDGET_MS),
+        'heap_used_mb': heap['usedSize'] / (1024 * 1024),
+    }
+
+
+def median_metrics(samples):
+    """Median of every metric over repeated runs."""
+    keys = samples[0].keys()
+    return {
+        key: statistics.median([s[key] for s in samples if s[key] is not None])
+        if any(s[key] is not None for s in samples) else None
+        for key in keys
+    }
+
+
+def run_benchmark(sizes, routes, runs, scroll_steps):
+    """
+    Run every route against every dataset size.
+
+    Returns:
+        List of result rows (one per size and route, medians over runs)
+    """
+    results = []
+    for size in sizes:
+        print(f"\n=== Dataset size {size} ===")
+        data = StandinData(posts=size, summaries=size, tools=size)
+        with StandinServer(data, client_url=TestConfig.BASE_URL) as server:
+            driver = create_driver()
+            try:
+                driver.set_script_timeout(TestConfig.PAGE_LOAD_TIMEOUT * 4)
+                driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': RENDER_MARKER_JS})
+                driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': LONG_TASK_OBSERVER_JS})
+
+                # Sign in against the stand-in by seeding the client's auth storage
+                driver.get(f"{server.url}/api/health")
+                user = data.users[0]
+                driver.execute_script(
+                    "localStorage.setItem('token', arguments[0]);"
+                    "localStorage.setItem('user', arguments[1]);",
+                    f"{TOKEN_PREFIX}{user['id']}", json.dumps(user, ensure_ascii=False),
+                )
+
+                for route in routes:
+                    samples = [
+                        measure_route(driver, server.url, route, data.first_title(route), scroll_steps)
+                        for _ in range(runs)
+                    ]
+                    row = {'size': size, 'route': route, **median_metrics(samples)}
+                    results.append(row)
+                    print(f"{route:<11} render {row['time_to_render_ms']:8.0f}ms  "
+                          f"blocking {row['blocking_ms']:7.0f}ms  "
+                          f"scroll p95 {row['frame_p95_ms']:6.1f}ms  "
+                          f"heap {row['heap_used_mb']:7.1f}MB  dom {row['dom_nodes']}")
+            finally:
+                driver.quit()
+                release_driver(driver)
+    return results
+
+
+def find_breaking_points(results):
+    """
+    First dataset size at which each route exceeds the render or frame budget.
+
+    Returns:
+        Dict of route -> size (None when the route stayed within budget)
+    """
+    breaking = {}
+    for row in sorted(results, key=lambda r: r['size']):
+        over_budget = (row['time_to_render_ms'] or 0) > RENDER_BUDGET_MS or \
+                      (row['frame_p95_ms'] or 0) > FRAME_BUDGET_MS
+        breaking.setdefault(row['route'], None)
+        if over_budget and breaking[row['route']] is None:
+            breaking[row['route']] = row['size']
+    return breaking
+
+
+def write_csv(results, filepath):
+    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+        writer.writeheader()
+        writer.writerows(results)
+    return filepath
+
+
+def plot_curves(results, filepath):
+    """
+    Plot the metrics against dataset size, one line per route.
+    matplotlib is optional; without it only the JSON/CSV results are written.
+
+    Returns:
+        Path of the image, or None when matplotlib is not installed
+    """
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("⚠️ matplotlib not installed - skipping plot (pip install matplotlib)")
+        return None
+
+    panels = [
+        ('time_to_render_ms', 'Time to render (ms)', RENDER_BUDGET_MS),
+        ('frame_p95_ms', 'Scroll frame p95 (ms)', FRAME_BUDGET_MS),
+        ('blocking_ms', 'Main-thread blocking (ms)', None),
+        ('heap_used_mb', 'JS heap after render (MB)', None),
+    ]
+    fig, axes = plt.subplots(2, 2, figsize=(12, 8))
+    for ax, (key, title, budget) in zip(axes.flat, panels):
+        for route in sorted({r['route'] for r in results}):
+            rows = sorted((r for r in results if r['route'] == route), key=lambda r: r['size'])
+            ax.plot([r['size'] for r in rows], [r[key] for r in rows], marker='o', label=route)
+        if budget:
+            ax.axhline(budget, color='red', linestyle='--', linewidth=1, label='budget')
+        ax.set_xscale('log')
+        ax.set_xlabel('Items in dataset')
+        ax.set_title(title)
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+    fig.tight_layout()
+    fig.savefig(filepath, dpi=120)
+    plt.close(fig)
+    return filepath
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List rendering scalability benchmark')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Comma-separated dataset sizes')
+    parser.add_argument('--routes', default=','.join(DEFAULT_ROUTES), help='Comma-separated client routes')
+    parser.add_argument('--runs', type=int, default=3, help='Loads per route and size (median is reported)')
+    parser.add_argument('--scroll-steps', type=int, default=120, help='Frames to spread the scroll over')
+    parser.add_argument('--out', default=TestConfig.PERF_REPORT_DIR, help='Output directory')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    routes = args.routes.split(',')
+    unknown = [r for r in routes if r not in ROUTE_ENDPOINTS]
+    if unknown:
+        parser.error(f"Unknown routes: {', '.join(unknown)}")
+
+    results = run_benchmark(sizes, routes, args.runs, args.scroll_steps)
+    breaking = find_breaking_points(results)
+
+    print("\n=== Pagination / virtualization needed from ===")
+    for route, size in breaking.items():
+        print(f"{route:<11} {size if size else 'not reached'}")
+
+    write_json(args.out, 'list_rendering.json', {
+        'budgets': {'time_to_render_ms': RENDER_BUDGET_MS, 'frame_p95_ms': FRAME_BUDGET_MS},
+        'breaking_points': breaking,
+        'results': results,
+    })
+    print(f"Results saved: {write_csv(results, os.path.join(args.out, 'list_rendering.csv'))}")
+    image = plot_curves(results, os.path.join(args.out, 'list_rendering.png'))
+    if image:
+        print(f"Plot saved: {image}")
+
+
+if __name__ == "__main__":
+    main()
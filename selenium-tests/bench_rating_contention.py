@@ -0,0 +1,205 @@
+"""
+Rating Contention Benchmark
+Fires concurrent ratings from many distinct users at one item (summary,
+forum post or tool) and then checks the result for consistency.
+
+Each rating endpoint upserts the user's rating, re-reads every rating of the
+item and writes the average back to `avgRating`. Under concurrency two
+requests can read the ratings before either has been written, and the last
+writer then stores an average that misses the other's rating. The benchmark
+reports throughput and tail latency of the burst and compares the stored
+`avgRating` with the mean of the ratings that were actually sent.
+
+Requires the API (API_URL). Rating users are registered as
+loadtest-<n>@studyhub.local on first use - run against a disposable database.
+
+Usage:
+    python bench_rating_contention.py --kind summaries --users 1000
+    python bench_rating_contention.py --kind tools --id 3 --users 2000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import aiohttp
+from conftest import TestConfig
+from loadgen import LoadStats, endpoint_label
+from perf_reports import write_json
+from token_pool import TokenPool
+
+
+# Rate endpoint, list endpoint and item endpoint per kind
+KINDS = {
+    'summaries': {'rate': '/api/summaries/{id}/rate', 'list': '/api/summaries', 'item': '/api/summaries/{id}'},
+    'forum': {'rate': '/api/forum/{id}/ratings', 'list': '/api/forum', 'item': '/api/forum/{id}'},
+    'tools': {'rate': '/api/tools/{id}/rate', 'list': '/api/tools', 'item': '/api/tools/{id}'},
+}
+
+# avgRating is a float column; anything beyond this is a lost or stale rating
+TOLERANCE = 1e-6
+
+
+async def get_json(session, path, token=None):
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    async with session.get(f"{TestConfig.API_URL}{path}", headers=headers) as response:
+        response.raise_for_status()
+        return await response.json(content_type=None)
+
+
+async def pick_item(session, kind):
+    """First item of the kind's list (the hot item when no --id is given)."""
+    items = await get_json(session, KINDS[kind]['list'])
+    if not items:
+        raise SystemExit(f"❌ No {kind} to rate - seed the database first")
+    return items[0]['id']
+
+
+async def current_ratings(session, kind, item_id):
+    """All ratings of an item as {userId: rating}."""
+    result = await get_json(session, KINDS[kind]['item'].format(id=item_id) + '/ratings')
+    return {r['userId']: r['rating'] for r in result['ratings']}
+
+
+async def fire_ratings(session, pool, kind, item_id, ratings, concurrency):
+    """
+    Send every pool member's rating, at most `concurrency` at a time.
+
+    Returns:
+        (LoadStats, burst duration in seconds, set of user ids whose rating succeeded)
+    """
+    stats = LoadStats()
+    path = KINDS[kind]['rate'].format(id=item_id)
+    label = endpoint_label('POST', path)
+    semaphore = asyncio.Semaphore(concurrency)
+    succeeded = set()
+
+    async def rate(member):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                async with session.post(f"{TestConfig.API_URL}{path}",
+                                        json={'rating': ratings[member.user['id']]},
+                                        headers={'Authorization': f'Bearer {member.token}'}) as response:
+                    await response.read()
+                    stats.record(label, response.status, (time.perf_counter() - started) * 1000)
+                    if response.status < 400:
+                        succeeded.add(member.user['id'])
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                stats.record(label, 'error', (time.perf_counter() - started) * 1000)
+
+    started = time.monotonic()
+    stats.started = started
+    await asyncio.gather(*(rate(member) for member in pool.members))
+    return stats, time.monotonic() - started, succeeded
+
+
+def check_consistency(before, sent, succeeded, stored_avg, final):
+    """
+    Compare the stored and recomputed averages with the expected mean.
+
+    Args:
+        before: {userId: rating} before the burst
+        sent: {userId: rating} the burst sent
+        succeeded: User ids whose rating request succeeded
+        stored_avg: avgRating column of the item after the burst
+        final: {userId: rating} after the burst
+
+    Returns:
+        Dict with the expected mean, what was found and a list of problems
+    """
+    expected = dict(before)
+    expected.update({user_id: sent[user_id] for user_id in succeeded})
+    expected_avg = sum(expected.values()) / len(expected) if expected else None
+    final_avg = sum(final.values()) / len(final) if final else None
+
+    problems = []
+    missing = [user_id for user_id, rating in expected.items() if final.get(user_id) != rating]
+    if missing:
+        problems.append(f"{len(missing)} ratings missing or wrong in the ratings table")
+    if stored_avg is None or expected_avg is None or abs(stored_avg - expected_avg) > TOLERANCE:
+        problems.append(f"stored avgRating {stored_avg} != true mean {expected_avg}")
+
+    return {
+        'expected_ratings': len(expected),
+        'final_ratings': len(final),
+        'expected_avg': expected_avg,
+        'recomputed_avg': final_avg,
+        'stored_avg': stored_avg,
+        'stored_error': abs(stored_avg - expected_avg) if None not in (stored_avg, expected_avg) else None,
+        'consistent': not problems,
+        'problems': problems,
+    }
+
+
+async def run_benchmark(kind, item_id, users, concurrency, seed):
+    timeout = aiohttp.ClientTimeout(total=TestConfig.PAGE_LOAD_TIMEOUT * 4)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        pool = TokenPool([])
+        print(f"🔑 Signing in {users} rating users...")
+        await pool.sign_in(session, TestConfig.API_URL, size=users)
+
+        item_id = item_id or await pick_item(session, kind)
+        rng = random.Random(seed)
+        sent = {member.user['id']: rng.randint(1, 5) for member in pool.members}
+        pool_ids = set(sent)
+        before = {user_id: rating for user_id, rating in (await current_ratings(session, kind, item_id)).items()
+                  if user_id not in pool_ids}
+
+        print(f"⚡ {len(pool.members)} concurrent ratings (max {concurrency} in flight) "
+              f"-> {KINDS[kind]['rate'].format(id=item_id)}")
+        stats, burst_s, succeeded = await fire_ratings(session, pool, kind, item_id, sent, concurrency)
+
+        item = await get_json(session, KINDS[kind]['item'].format(id=item_id))
+        final = await current_ratings(session, kind, item_id)
+
+    summary = stats.summary()['endpoints'][0]
+    consistency = check_consistency(before, sent, succeeded, item.get('avgRating'), final)
+    return {
+        'kind': kind,
+        'item_id': item_id,
+        'users': len(sent),
+        'concurrency': concurrency,
+        'burst_s': round(burst_s, 2),
+        'throughput_rps': round(len(sent) / burst_s, 1) if burst_s else None,
+        'latency': {key: summary[key] for key in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms')},
+        'statuses': summary['statuses'],
+        'rate_limited': summary['rate_limited'],
+        'consistency': consistency,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent rating contention benchmark')
+    parser.add_argument('--kind', choices=list(KINDS), default='summaries', help='What to rate')
+    parser.add_argument('--id', type=int, help='Item id (default: first item of the list)')
+    parser.add_argument('--users', type=int, default=1000, help='Distinct users rating the item')
+    parser.add_argument('--concurrency', type=int, default=500, help='Maximum ratings in flight')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the rating values')
+    parser.add_argument('--out', default=TestConfig.PERF_REPORT_DIR, help='Output directory')
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args.kind, args.id, args.users, args.concurrency, args.seed))
+    latency = result['latency']
+    print(f"\n{result['users']} ratings in {result['burst_s']}s ({result['throughput_rps']} ratings/s)")
+    print(f"latency p50 {latency['p50_ms']}ms  p95 {latency['p95_ms']}ms  "
+          f"p99 {latency['p99_ms']}ms  max {latency['max_ms']}ms")
+    print(f"statuses {result['statuses']}")
+
+    consistency = result['consistency']
+    print(f"\ntrue mean {consistency['expected_avg']}  stored avgRating {consistency['stored_avg']}  "
+          f"recomputed {consistency['recomputed_avg']} ({consistency['final_ratings']} ratings)")
+    if consistency['consistent']:
+        print("✅ avgRating is consistent")
+    else:
+        for problem in consistency['problems']:
+            print(f"❌ {problem}")
+
+    print(f"Results saved: {write_json(args.out, f'rating_contention_{args.kind}.json', result)}")
+    sys.exit(0 if consistency['consistent'] else 1)
+
+
+if __name__ == "__main__":
+    main()
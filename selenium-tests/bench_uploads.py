@@ -0,0 +1,267 @@
+"""
+Upload Throughput and Server Memory Benchmark
+Drives concurrent multipart uploads against the API at several file sizes and
+concurrency levels while sampling the RSS of the Node server process.
+
+Both upload routes use multer.memoryStorage(): every in-flight upload is held
+in full in the server's memory (10MB summaries, up to 5 x 5MB forum images),
+so peak RSS grows with file size x concurrency. The report shows uploads/sec,
+latency and peak memory per configuration - i.e. how many simultaneous
+uploads one instance survives.
+
+Requires the API (API_URL) and the test user. Uploaded summaries and posts
+are deleted again afterwards unless --keep is given.
+
+Usage:
+    python bench_uploads.py
+    python bench_uploads.py --kind forum --sizes 1,5 --concurrency 1,10,50
+    python bench_uploads.py --server-pid 12345
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import struct
+import time
+import zipfile
+import zlib
+import aiohttp
+import psutil
+from conftest import TestConfig
+from perf_reports import percentile, write_json
+from process_sampler import RssSampler, find_listening_process
+
+
+DEFAULT_SIZES_MB = [1, 5, 10]
+DEFAULT_CONCURRENCY = [1, 10, 50, 100]
+
+# Upload limits per route (server/src/routes/summaries.js, forum.js)
+MAX_SUMMARY_MB = 10
+MAX_IMAGE_MB = 5
+IMAGES_PER_POST = 5
+
+MB = 1024 * 1024
+
+
+def generate_pdf(size):
+    """A minimal PDF padded with incompressible stream data to `size` bytes."""
+    tail = b'\nendstream\nendobj\ntrailer\n<< /Root 1 0 R >>\n%%EOF\n'
+    body = max(0, size - len(tail) - 64)
+    head = b'%PDF-1.4\n1 0 obj\n<< /Length ' + str(body).encode() + b' >>\nstream\n'
+    return head + os.urandom(body) + tail
+
+
+def generate_docx(size):
+    """A DOCX (zip) with a one-paragraph document and a stored filler part."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as docx:
+        docx.writestr('[Content_Types].xml',
+                      '<?xml version="1.0"?><Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+                      'content-types"><Default Extension="xml" ContentType="application/xml"/></Types>')
+        docx.writestr('word/document.xml',
+                      '<?xml version="1.0"?><w:document xmlns:w="http://schemas.openxmlformats.org/'
+                      'wordprocessingml/2006/main"><w:body><w:p><w:r><w:t>סיכום</w:t></w:r></w:p></w:body>'
+                      '</w:document>')
+        docx.writestr('word/media/filler.bin', os.urandom(max(0, size - 1024)))
+    return buffer.getvalue()
+
+
+def generate_png(size):
+    """An uncompressed-noise PNG of at most `size` bytes (and close to it)."""
+    width = 1024
+    row = width * 3 + 1
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    def encode(height):
+        raw = b''.join(b'\x00' + os.urandom(width * 3) for _ in range(height))
+        return (b'\x89PNG\r\n\x1a\n'
+                + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+                + chunk(b'IDAT', zlib.compress(raw, 0))
+                + chunk(b'IEND', b''))
+
+    # Signature, IHDR, IDAT and IEND framing: 57 bytes; zlib header and checksum: 6;
+    # every stored deflate block: 5 more (blocks are at most 64 KB)
+    budget = size - 63
+    height = max(1, budget * 65535 // (65540 * row))
+    png = encode(height)
+    # Stay under upload limits such as multer's fileSize even if zlib used smaller blocks
+    while len(png) > size and height > 1:
+        height = max(1, height - (len(png) - size) // row - 1)
+        png = encode(height)
+    return png
+
+
+FILE_TYPES = {
+    'pdf': ('application/pdf', '.pdf', generate_pdf),
+    'docx': ('application/vnd.openxmlformats-officedocument.wordprocessingml.document', '.docx', generate_docx),
+    'png': ('image/png', '.png', generate_png),
+}
+
+
+def upload_form(kind, payload, file_type, course_id, index):
+    """Multipart body for one summary or forum-post upload."""
+    content_type, extension, _ = FILE_TYPES[file_type]
+    form = aiohttp.FormData()
+    form.add_field('courseId', str(course_id))
+    if kind == 'summaries':
+        form.add_field('title', f"סיכום בדיקת עומס {index}")
+        form.add_field('description', 'נוצר על ידי bench_uploads.py')
+        form.add_field('file', payload, filename=f"bench-{index}{extension}", content_type=content_type)
+    else:
+        form.add_field('title', f"שאלת בדיקת עומס מספר {index}")
+        form.add_field('content', 'תוכן שנוצר על ידי bench_uploads.py לבדיקת העלאת תמונות במקביל לשרת.')
+        form.add_field('category', 'general')
+        for image in range(IMAGES_PER_POST):
+            form.add_field('images', payload, filename=f"bench-{index}-{image}{extension}",
+                           content_type=content_type)
+    return form
+
+
+async def run_configuration(session, token, kind, payload, file_type, course_id, concurrency, uploads, process):
+    """
+    Upload `uploads` files with at most `concurrency` in flight.
+
+    Returns:
+        (result dict, list of created item ids)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+    created = []
+    headers = {'Authorization': f'Bearer {token}'}
+
+    async def upload(index):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                async with session.post(f"{TestConfig.API_URL}/api/{kind}", headers=headers,
+                                        data=upload_form(kind, payload, file_type, course_id, index)) as response:
+                    status = response.status
+                    body = await response.json(content_type=None) if status == 201 else await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                status, body = 'error', None
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 201 and body:
+                created.append((body.get('summary') or body.get('post'))['id'])
+
+    sampler = RssSampler(process) if process else None
+    if sampler:
+        sampler.start()
+    started = time.monotonic()
+    try:
+        await asyncio.gather(*(upload(i) for i in range(uploads)))
+    finally:
+        elapsed = time.monotonic() - started
+        if sampler:
+            sampler.stop()
+
+    request_mb = len(payload) * (IMAGES_PER_POST if kind == 'forum' else 1) / MB
+    succeeded = statuses.get(201, 0)
+    return {
+        'kind': kind,
+        'file_type': file_type,
+        'file_mb': round(len(payload) / MB, 2),
+        'request_mb': round(request_mb, 2),
+        'concurrency': concurrency,
+        'uploads': uploads,
+        'succeeded': succeeded,
+        'statuses': {str(k): v for k, v in statuses.items()},
+        'uploads_per_s': round(succeeded / elapsed, 2),
+        'mb_per_s': round(succeeded * request_mb / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 0.5), 1),
+        'p95_ms': round(percentile(latencies, 0.95), 1),
+        'p99_ms': round(percentile(latencies, 0.99), 1),
+        'rss_start_mb': round(sampler.first_mb, 1) if sampler else None,
+        'rss_peak_mb': round(sampler.peak_mb, 1) if sampler else None,
+    }, created
+
+
+async def sign_in(session):
+    async with session.post(f"{TestConfig.API_URL}/api/auth/login",
+                            json={'email': TestConfig.TEST_EMAIL, 'password': TestConfig.TEST_PASSWORD}) as response:
+        response.raise_for_status()
+        return (await response.json())['token']
+
+
+async def first_course_id(session):
+    async with session.get(f"{TestConfig.API_URL}/api/courses") as response:
+        response.raise_for_status()
+        courses = await response.json()
+    if not courses:
+        raise SystemExit("❌ No courses - seed the database first")
+    return courses[0]['id']
+
+
+async def delete_items(session, token, kind, ids):
+    headers = {'Authorization': f'Bearer {token}'}
+    for item_id in ids:
+        async with session.delete(f"{TestConfig.API_URL}/api/{kind}/{item_id}", headers=headers) as response:
+            await response.read()
+
+
+async def run_benchmark(kind, file_type, sizes, concurrency_levels, uploads_per_level, process, keep):
+    results = []
+    timeout = aiohttp.ClientTimeout(total=TestConfig.PAGE_LOAD_TIMEOUT * 10)
+    async with aiohttp.ClientSession(timeout=timeout, connector=aiohttp.TCPConnector(limit=0)) as session:
+        token = await sign_in(session)
+        course_id = await first_course_id(session)
+        for size_mb in sizes:
+            payload = FILE_TYPES[file_type][2](int(size_mb * MB))
+            for concurrency in concurrency_levels:
+                uploads = uploads_per_level or concurrency * 3
+                result, created = await run_configuration(
+                    session, token, kind, payload, file_type, course_id, concurrency, uploads, process
+                )
+                results.append(result)
+                print(f"{size_mb:>5}MB x{concurrency:<4} {result['uploads_per_s']:>7.1f} uploads/s "
+                      f"{result['mb_per_s']:>7.1f} MB/s  p50 {result['p50_ms']:>7.0f}ms "
+                      f"p99 {result['p99_ms']:>7.0f}ms  peak RSS {result['rss_peak_mb']}MB  "
+                      f"{result['statuses']}")
+                if not keep:
+                    await delete_items(session, token, kind, created)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Upload throughput and server memory benchmark')
+    parser.add_argument('--kind', choices=['summaries', 'forum'], default='summaries', help='Upload route')
+    parser.add_argument('--file-type', choices=list(FILE_TYPES),
+                        help='Generated file type (default: pdf for summaries, png for forum)')
+    parser.add_argument('--sizes', help='Comma-separated file sizes in MB (default: 1,5,10; forum: 1,5)')
+    parser.add_argument('--concurrency', default=','.join(str(c) for c in DEFAULT_CONCURRENCY),
+                        help='Comma-separated concurrency levels')
+    parser.add_argument('--uploads', type=int, default=0,
+                        help='Uploads per configuration (default: 3x the concurrency)')
+    parser.add_argument('--server-pid', type=int, help='PID of the Node server (default: process on API_URL port)')
+    parser.add_argument('--keep', action='store_true', help='Do not delete the uploaded items afterwards')
+    parser.add_argument('--out', default=TestConfig.PERF_REPORT_DIR, help='Output directory')
+    args = parser.parse_args()
+
+    file_type = args.file_type or ('pdf' if args.kind == 'summaries' else 'png')
+    limit_mb = MAX_SUMMARY_MB if args.kind == 'summaries' else MAX_IMAGE_MB
+    sizes = [float(s) for s in args.sizes.split(',')] if args.sizes else \
+        [s for s in DEFAULT_SIZES_MB if s <= limit_mb]
+    concurrency_levels = [int(c) for c in args.concurrency.split(',')]
+
+    process = psutil.Process(args.server_pid) if args.server_pid else find_listening_process(TestConfig.API_URL)
+    if process:
+        print(f"📈 Sampling RSS of {process.name()} (pid {process.pid})")
+    else:
+        print("⚠️ Server process not found - pass --server-pid to sample memory")
+
+    results = asyncio.run(run_benchmark(
+        args.kind, file_type, sizes, concurrency_levels, args.uploads, process, args.keep
+    ))
+    path = write_json(args.out, f'uploads_{args.kind}.json', {
+        'server_pid': process.pid if process else None,
+        'results': results,
+    })
+    print(f"Results saved: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Browser Daemon
+Keeps one Chrome and a signed-in session of the test user alive between
+pytest runs, so the edit-run loop on a single test skips the browser startup
+and the login form:
+
+- The first run with BROWSER_DAEMON=true starts Chrome on
+  BROWSER_DAEMON_PORT. Chrome keeps running after pytest exits.
+- The driver fixture attaches a chromedriver session to it through
+  `debuggerAddress`. It then resets the browser to a clean state: one blank
+  tab, and no cookies or storage for the app's origins. The HTTP cache
+  stays warm.
+- authenticated_driver puts the daemon's saved session (token and user)
+  into localStorage instead of typing the credentials. The session is
+  renewed through the API once the server no longer accepts it.
+
+Usage:
+    python browser_daemon.py start
+    BROWSER_DAEMON=true pytest "test_03_forum_interaction.py::TestForumInteraction::test_04_create_new_forum_post"
+    python browser_daemon.py stop
+"""
+
+import argparse
+import json
+import os
+import urllib.request
+from urllib.parse import urlsplit
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+import browser_startup
+import shared_browser
+from api_client import ApiClient, ApiError
+from perf_reports import read_json, write_json
+
+
+STATE_FILE = 'daemon.json'
+
+# Everything an origin keeps between tests except the HTTP cache
+CLEARED_STORAGE = ('cookies,local_storage,session_storage,indexeddb,websql,service_workers,'
+                   'cache_storage,file_systems,shader_cache')
+
+
+def _state_path():
+    return os.path.join(browser_startup.BROWSER_CACHE_DIR, STATE_FILE)
+
+
+def load_state():
+    return read_json(_state_path(), default={})
+
+
+def save_state(state):
+    return write_json(browser_startup.BROWSER_CACHE_DIR, STATE_FILE, state)
+
+
+def is_running(port):
+    return shared_browser.devtools_endpoint(f'127.0.0.1:{port}') is not None
+
+
+def start(port, make_options):
+    """
+    Start the daemon browser unless it is already running.
+
+    Returns:
+        True when the browser was started now
+    """
+    return shared_browser.ensure_browser(port, make_options)
+
+
+def stop(port):
+    """Stop the daemon browser and forget its session."""
+    shared_browser.stop_browser(port)
+    if os.path.exists(_state_path()):
+        os.remove(_state_path())
+
+
+def _ensure_tab(port):
+    """Open a blank tab if a test closed the last one (chromedriver needs a page to attach to)."""
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/list", timeout=5) as response:
+        targets = json.load(response)
+    if not any(target['type'] == 'page' for target in targets):
+        request = urllib.request.Request(f"http://127.0.0.1:{port}/json/new?about:blank", method='PUT')
+        urllib.request.urlopen(request, timeout=5).close()
+
+
+def attach(port, make_options, origins):
+    """
+    WebDriver attached to the daemon browser, reset to a clean state.
+
+    Args:
+        port: Remote debugging port of the daemon
+        make_options: Callable returning the Chrome Options of the test browsers
+        origins: Origins whose cookies and storage are cleared (app and API)
+
+    Returns:
+        WebDriver instance; quitting it leaves the browser running
+    """
+    start(port, make_options)
+    _ensure_tab(port)
+    service = ChromeService(executable_path=browser_startup.resolve_driver(make_options()))
+    driver = webdriver.Chrome(service=service, options=shared_browser.attach_options(make_options, port))
+    reset(driver, origins)
+    return driver
+
+
+def reset(driver, origins):
+    """Close all tabs but one, load a blank page and clear the origins' storage."""
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    driver.get('about:blank')
+    for origin in origins:
+        driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': CLEARED_STORAGE})
+
+
+def origin_of(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def sign_in(api_url, email, password):
+    """Sign in through the API and save the session in the daemon state."""
+    api = ApiClient(api_url)
+    api.login(email, password)
+    state = load_state()
+    state['session'] = {'token': api.token, 'user': api.user}
+    save_state(state)
+    return state['session']
+
+
+def restore_session(driver, base_url, api_url, credentials):
+    """
+    Sign the browser in with the daemon's saved session.
+
+    Args:
+        driver: WebDriver attached by attach()
+        base_url: Frontend URL
+        api_url: API URL, used when the session has to be renewed
+        credentials: (email, password) of the test user
+    """
+    session = load_state().get('session')
+    if session:
+        api = ApiClient(api_url)
+        api.token = session['token']
+        try:
+            api.get('/api/auth/me')
+        except ApiError as e:
+            if e.status not in (401, 403):
+                raise
+            session = None
+    if not session:
+        session = sign_in(api_url, *credentials)
+
+    # localStorage belongs to the origin, so a page of the app has to be open to set it
+    driver.get(f"{base_url}/login")
+    driver.execute_script(
+        "localStorage.setItem('token', arguments[0]); localStorage.setItem('user', arguments[1]);",
+        session['token'], json.dumps(session['user'], ensure_ascii=False),
+    )
+    driver.get(f"{base_url}/dashboard")
+
+
+def main():
+    from conftest import TestConfig, chrome_options
+
+    parser = argparse.ArgumentParser(description='Persistent browser for the local edit-run loop')
+    parser.add_argument('command', choices=['start', 'stop', 'status'])
+    parser.add_argument('--port', type=int, default=TestConfig.BROWSER_DAEMON_PORT, help='Remote debugging port')
+    args = parser.parse_args()
+
+    if args.command == 'start':
+        started = start(args.port, chrome_options)
+        print(f"✅ Browser daemon {'started' if started else 'already running'} on port {args.port}")
+    elif args.command == 'stop':
+        stop(args.port)
+        print(f"🛑 Browser daemon on port {args.port} stopped")
+    else:
+        state = load_state()
+        if is_running(args.port):
+            signed_in = 'signed in' if state.get('session') else 'not signed in yet'
+            print(f"✅ Browser daemon running on port {args.port} ({signed_in})")
+        else:
+            print(f"❌ No browser daemon on port {args.port}")
+
+
+if __name__ == "__main__":
+    main()
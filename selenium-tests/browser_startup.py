@@ -0,0 +1,296 @@
+"""
+Browser Startup Cache
+Cuts the two costs every new browser pays before a test can start:
+
+1. Selenium Manager resolving chromedriver (a subprocess per
+   webdriver.Chrome call) - resolved once, the paths are kept in
+   BROWSER_CACHE_DIR/driver.json and reused until the driver stops matching
+   the installed Chrome.
+2. Chrome building a fresh profile (first-run work, component updates, font
+   cache) - done once in a warmed profile template, which every browser gets
+   a copy-on-write clone of (`cp --reflink=auto`, a plain copy where the file
+   system cannot share blocks).
+
+Every startup is timed, so reports show the cold-start time with and without
+the cache (see bench_browser_startup.py for a side-by-side run).
+"""
+
+import atexit
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.common.selenium_manager import SeleniumManager
+from perf_reports import percentile, read_json, write_json
+
+
+BROWSER_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.browser-cache')
+TEMPLATE_DIR = os.path.join(BROWSER_CACHE_DIR, 'profile-template')
+TEMPLATE_STAMP = '.template.json'
+
+# How long the template browser stays open for its background first-run work
+TEMPLATE_WARMUP_SECONDS = 10
+
+# Profile files that belong to a running browser and must not be cloned
+LOCK_FILES = ('SingletonLock', 'SingletonSocket', 'SingletonCookie', 'lockfile')
+
+# Renders Hebrew and Latin text in the common font families, so the template
+# holds a populated font cache
+FONT_WARMUP_PAGE = (
+    "data:text/html;charset=utf-8,<html dir='rtl'><body>"
+    + ''.join(f"<p style='font-family:{family}'>StudyHub-IL הפלטפורמה האקדמית שלך 0123456789</p>"
+              for family in ('sans-serif', 'serif', 'monospace', 'system-ui', 'Arial', 'Times New Roman'))
+    + "</body></html>"
+)
+
+
+def browser_version(browser_path):
+    """Version string of a Chrome binary, or None when it cannot be asked."""
+    if not browser_path:
+        return None
+    try:
+        result = subprocess.run([browser_path, '--version'], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip().split()[-1] if result.returncode == 0 and result.stdout.strip() else None
+
+
+def resolve_driver(options, cache_dir=BROWSER_CACHE_DIR, refresh=False):
+    """
+    Path of chromedriver (and Chrome) for the options, cached across runs.
+
+    Args:
+        options: Chrome Options; binary_location is set to the cached Chrome
+        cache_dir: Directory holding driver.json
+        refresh: Ignore the cache (e.g. after the driver no longer matched)
+
+    Returns:
+        Path of chromedriver
+    """
+    cache_path = os.path.join(cache_dir, 'driver.json')
+    cached = None if refresh else read_json(cache_path)
+    if cached and os.path.exists(cached['driver_path']) and \
+            (not cached['browser_path'] or os.path.exists(cached['browser_path'])):
+        STARTUP_STATS['driver_cache_hits'] += 1
+    else:
+        started = time.perf_counter()
+        driver_path = SeleniumManager().driver_location(options)
+        browser_path = getattr(options, 'binary_location', None) or None
+        cached = {'driver_path': driver_path, 'browser_path': browser_path,
+                  'browser_version': browser_version(browser_path)}
+        write_json(cache_dir, 'driver.json', cached)
+        STARTUP_STATS['driver_resolve_s'] = round(time.perf_counter() - started, 2)
+    if cached['browser_path']:
+        options.binary_location = cached['browser_path']
+    return cached['driver_path']
+
+
+def template_is_current(template_dir=TEMPLATE_DIR, cache_dir=BROWSER_CACHE_DIR):
+    """True when the template exists and was made by the installed Chrome version."""
+    stamp = read_json(os.path.join(template_dir, TEMPLATE_STAMP))
+    if not stamp:
+        return False
+    driver = read_json(os.path.join(cache_dir, 'driver.json'), default={})
+    current = browser_version(driver.get('browser_path'))
+    return current is None or stamp.get('browser_version') == current
+
+
+def build_template(options, service, template_dir=TEMPLATE_DIR, warmup=TEMPLATE_WARMUP_SECONDS):
+    """
+    Launch Chrome once on an empty user-data-dir and keep the warmed profile.
+    Not safe to run concurrently; ensure_template holds a lock around it.
+
+    Args:
+        options: Chrome Options of the test browsers (without --user-data-dir)
+        service: ChromeService with the resolved driver
+        template_dir: Where the template is kept
+        warmup: Seconds to leave Chrome running for component updates
+
+    Returns:
+        Seconds the build took
+    """
+    started = time.perf_counter()
+    partial = template_dir + '.partial'
+    shutil.rmtree(partial, ignore_errors=True)
+    os.makedirs(partial)
+    options.add_argument(f'--user-data-dir={partial}')
+    driver = webdriver.Chrome(service=service, options=options)
+    try:
+        driver.get(FONT_WARMUP_PAGE)
+        time.sleep(warmup)
+        version = driver.capabilities.get('browserVersion')
+    finally:
+        driver.quit()
+    for name in LOCK_FILES:
+        path = os.path.join(partial, name)
+        if os.path.lexists(path):
+            os.remove(path)
+    write_json(partial, TEMPLATE_STAMP, {'browser_version': version, 'created': time.time()})
+    shutil.rmtree(template_dir, ignore_errors=True)
+    # Only a finished template gets the final name
+    os.replace(partial, template_dir)
+    elapsed = round(time.perf_counter() - started, 2)
+    STARTUP_STATS['template_build_s'] = elapsed
+    return elapsed
+
+
+def clone_template(template_dir=TEMPLATE_DIR):
+    """
+    Copy-on-write clone of the template in a temporary directory.
+
+    Returns:
+        Path of the clone (removed by release_profile or at exit)
+    """
+    clone = os.path.join(tempfile.mkdtemp(prefix='studyhub-chrome-'), 'profile')
+    if platform.system() == 'Darwin':
+        command = ['cp', '-c', '-R', template_dir, clone]
+    else:
+        command = ['cp', '-a', '--reflink=auto', template_dir, clone]
+    try:
+        copied = subprocess.run(command, capture_output=True).returncode == 0
+    except OSError:
+        copied = False
+    if not copied:
+        shutil.rmtree(clone, ignore_errors=True)
+        shutil.copytree(template_dir, clone, symlinks=True)
+    _CLONES.add(clone)
+    return clone
+
+
+def release_profile(driver):
+    """Delete the cloned profile of a browser that has quit (no-op for other drivers)."""
+    clone = getattr(driver, '_profile_clone', None)
+    if clone:
+        _remove_clone(clone)
+
+
+def _remove_clone(clone):
+    _CLONES.discard(clone)
+    shutil.rmtree(os.path.dirname(clone), ignore_errors=True)
+
+
+def ensure_template(make_options):
+    """
+    Build the profile template unless the current one matches the installed Chrome.
+    Checked once per process, so later browsers start without the lock, the
+    driver lookup and `chrome --version`.
+
+    Args:
+        make_options: Callable returning the Chrome Options of the test browsers
+    """
+    global _TEMPLATE_CHECKED
+    if _TEMPLATE_CHECKED:
+        return
+    import fcntl  # Unix only, like the rest of the process management here
+
+    os.makedirs(BROWSER_CACHE_DIR, exist_ok=True)
+    with open(TEMPLATE_DIR + '.lock', 'w') as lock:
+        # Only one pytest-xdist worker builds; the others wait and then find it current
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        options = make_options()
+        service = ChromeService(executable_path=resolve_driver(options))
+        if not template_is_current():
+            print(f"\n🔥 Warming a Chrome profile template in {TEMPLATE_DIR} ...")
+            build_template(options, service)
+    _TEMPLATE_CHECKED = True
+
+
+def start_chrome(make_options):
+    """
+    Start Chrome with the cached chromedriver on a clone of the profile template
+    (call ensure_template first).
+
+    Args:
+        make_options: Callable returning the Chrome Options of the test browsers
+
+    Returns:
+        WebDriver instance; pass it to release_profile after quitting
+    """
+    for refresh in (False, True):
+        options = make_options()
+        service = ChromeService(executable_path=resolve_driver(options, refresh=refresh))
+        clone = clone_template()
+        options.add_argument(f'--user-data-dir={clone}')
+        try:
+            driver = webdriver.Chrome(service=service, options=options)
+        except SessionNotCreatedException:
+            _remove_clone(clone)
+            if refresh:
+                raise
+            # Chrome was updated and no longer matches the cached chromedriver
+            continue
+        driver._profile_clone = clone
+        return driver
+
+
+# Clones not released yet (removed at exit, e.g. after an interrupted run)
+_CLONES = set()
+
+# ensure_template has found or built a current template in this process
+_TEMPLATE_CHECKED = False
+
+
+@atexit.register
+def _remove_clones():
+    for clone in list(_CLONES):
+        _remove_clone(clone)
+
+
+# One-time costs of the session and every browser startup
+STARTUP_STATS = {'driver_resolve_s': None, 'template_build_s': None, 'driver_cache_hits': 0}
+STARTUP_TIMES = {'cached': [], 'default': [], 'context': [], 'daemon': []}
+
+
+def record_startup(mode, seconds):
+    """Record how long creating a browser took ('cached', 'default', 'context' or 'daemon')."""
+    STARTUP_TIMES[mode].append(seconds)
+
+
+def startup_summary():
+    """Mean, median and p95 startup time per mode, plus the one-time costs."""
+    summary = {}
+    for mode, times in STARTUP_TIMES.items():
+        if times:
+            summary[mode] = {
+                'launches': len(times),
+                'mean_s': round(sum(times) / len(times), 3),
+                'median_s': round(percentile(times, 0.5), 3),
+                'p95_s': round(percentile(times, 0.95), 3),
+            }
+    return {**summary, **STARTUP_STATS}
+
+
+def write_session_report(report_dir):
+    """
+    Write the browser startup times of the session to browser-startup.json.
+
+    Returns:
+        Path of the written file, or None when no browser was started
+    """
+    if not any(STARTUP_TIMES.values()):
+        return None
+    return write_json(report_dir, 'browser-startup.json', startup_summary())
+
+
+def summarize(terminalreporter):
+    """Print browser startup times per mode to the pytest terminal."""
+    summary = startup_summary()
+    modes = [mode for mode in STARTUP_TIMES if mode in summary]
+    if not modes:
+        return
+    terminalreporter.section('browser startup')
+    for mode in modes:
+        stats = summary[mode]
+        terminalreporter.write_line(
+            f"{mode:<8} {stats['launches']} launches, mean {stats['mean_s']:.2f}s, "
+            f"median {stats['median_s']:.2f}s, p95 {stats['p95_s']:.2f}s"
+        )
+    if summary['driver_resolve_s'] is not None:
+        terminalreporter.write_line(f"chromedriver resolved in {summary['driver_resolve_s']}s")
+    if summary['template_build_s'] is not None:
+        terminalreporter.write_line(f"profile template built in {summary['template_build_s']}s")
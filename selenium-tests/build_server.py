@@ -0,0 +1,152 @@
+"""
+Production Client Build Server
+Builds client/ with Vite once per source state and serves the bundle the way
+a production host would, so UI tests and their timings do not depend on the
+Vite dev server compiling hundreds of unbundled modules per cold page load.
+
+- Builds are cached under BUILD_CACHE_DIR, keyed by a hash of the client
+  sources and lockfile; an unchanged client is never rebuilt.
+- Text assets are gzipped once after the build and served pre-compressed.
+- Hashed files under /assets are cacheable forever, everything else is
+  revalidated; unknown paths fall back to index.html (client-side routing).
+- /api and /uploads are proxied to the API, like the dev server's proxy.
+
+Usage:
+    build_dir = ensure_build()
+    with BuildServer(build_dir, TestConfig.API_URL, port=3000) as server:
+        driver.get(f"{server.url}/forum")
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import subprocess
+from aiohttp import ClientSession, web
+from standin_backend import BackgroundServer, forward
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CLIENT_DIR = os.path.join(REPO_ROOT, 'client')
+BUILD_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.build-cache')
+
+# Everything that changes the bundle
+CLIENT_SOURCES = ['src', 'index.html', 'vite.config.ts', 'package.json', 'package-lock.json',
+                  'tailwind.config.js', 'postcss.config.js', 'tsconfig.json']
+
+# Cached builds kept besides the current one
+KEEP_BUILDS = 3
+
+COMPRESSIBLE = ('.js', '.css', '.html', '.svg', '.json', '.txt', '.map', '.ico')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def source_hash(client_dir=CLIENT_DIR, sources=CLIENT_SOURCES):
+    """Short SHA-256 over the paths and contents of the client sources."""
+    digest = hashlib.sha256()
+    for name in sources:
+        path = os.path.join(client_dir, name)
+        files = [path] if os.path.isfile(path) else sorted(
+            os.path.join(directory, filename)
+            for directory, _, filenames in os.walk(path) for filename in filenames
+        )
+        for filepath in files:
+            digest.update(os.path.relpath(filepath, client_dir).replace(os.sep, '/').encode('utf-8'))
+            with open(filepath, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def precompress(build_dir):
+    """Write a .gz next to every text asset (served when the browser accepts gzip)."""
+    for directory, _, filenames in os.walk(build_dir):
+        for filename in filenames:
+            if filename.endswith(COMPRESSIBLE):
+                path = os.path.join(directory, filename)
+                with open(path, 'rb') as f, gzip.open(path + '.gz', 'wb', compresslevel=9) as out:
+                    shutil.copyfileobj(f, out)
+
+
+def ensure_build(client_dir=CLIENT_DIR, cache_dir=BUILD_CACHE_DIR, log_path=None):
+    """
+    Return a production build of the client, building it if the sources changed.
+
+    Args:
+        client_dir: Client project directory
+        cache_dir: Directory holding builds named client-<source hash>
+        log_path: File for the build output (default: <cache_dir>/build.log)
+
+    Returns:
+        (build directory, True if it was built now / False if cached)
+    """
+    build_dir = os.path.join(cache_dir, f'client-{source_hash(client_dir)}')
+    if os.path.exists(os.path.join(build_dir, 'index.html')):
+        return build_dir, False
+
+    os.makedirs(cache_dir, exist_ok=True)
+    partial = build_dir + '.partial'
+    shutil.rmtree(partial, ignore_errors=True)
+    log_path = log_path or os.path.join(cache_dir, 'build.log')
+    with open(log_path, 'ab') as log:
+        result = subprocess.run([shutil.which('npx') or 'npx', 'vite', 'build', '--outDir', partial,
+                                 '--emptyOutDir'], cwd=client_dir, stdout=log, stderr=subprocess.STDOUT)
+    if result.returncode != 0:
+        raise RuntimeError(f"Client build failed - see {log_path}")
+    precompress(partial)
+    # Only complete builds get the final name, so an interrupted build is never served
+    os.replace(partial, build_dir)
+    prune_builds(cache_dir, keep=build_dir)
+    return build_dir, True
+
+
+def prune_builds(cache_dir, keep):
+    """Delete all but the newest KEEP_BUILDS cached builds (never `keep`)."""
+    builds = sorted(
+        (os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.startswith('client-')),
+        key=os.path.getmtime, reverse=True,
+    )
+    for path in builds[KEEP_BUILDS:]:
+        if path != keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+class BuildApp:
+    """aiohttp application serving a client build and proxying the API."""
+
+    def __init__(self, build_dir, api_url):
+        self.build_dir = os.path.realpath(build_dir)
+        self.api_url = api_url.rstrip('/')
+        self._api_session = None
+
+    def create_app(self):
+        app = web.Application(client_max_size=50 * 1024 * 1024)
+        app.router.add_route('*', '/api/{tail:.*}', self.proxy_to_api)
+        app.router.add_route('*', '/uploads/{tail:.*}', self.proxy_to_api)
+        app.router.add_get('/{tail:.*}', self.static)
+        app.on_cleanup.append(self._close_api_session)
+        return app
+
+    async def _close_api_session(self, app):
+        if self._api_session:
+            await self._api_session.close()
+
+    async def proxy_to_api(self, request):
+        if self._api_session is None:
+            self._api_session = ClientSession(auto_decompress=False)
+        return await forward(self._api_session, request, self.api_url + request.path_qs)
+
+    async def static(self, request):
+        path = os.path.realpath(os.path.join(self.build_dir, request.match_info['tail']))
+        if path.startswith(self.build_dir + os.sep) and os.path.isfile(path):
+            hashed = request.path.startswith('/assets/')
+            return web.FileResponse(path, headers={'Cache-Control': IMMUTABLE if hashed else 'no-cache'})
+        # SPA fallback: React Router resolves the path in the browser
+        return web.FileResponse(os.path.join(self.build_dir, 'index.html'),
+                                headers={'Cache-Control': 'no-cache'})
+
+
+class BuildServer(BackgroundServer):
+    """Serves a client build in a background thread."""
+
+    def __init__(self, build_dir, api_url, host='127.0.0.1', port=0):
+        super().__init__(BuildApp(build_dir, api_url), host, port, name='build-server')
@@ -0,0 +1,192 @@
+"""
+Database Snapshots
+Keeps a migrated and seeded template database next to the test database and
+restores a harness-owned clone of it, <database>_t_<worker>, with
+`CREATE DATABASE ... TEMPLATE ...`, a file-level copy that takes
+milliseconds instead of replaying migrations or cleaning up row by row. The
+API the harness starts runs against the clone; the DATABASE_URL database
+itself is never dropped or changed.
+
+The template is rebuilt only when the Prisma schema, migrations or seed
+script change (their hash is stored as the template's comment). Restoring
+drops the clone WITH (FORCE), which needs PostgreSQL 13 or newer. Only
+databases named for tests (see TEST_DATABASE) are accepted.
+"""
+
+import hashlib
+import os
+import re
+import time
+from urllib.parse import urlsplit, urlunsplit
+import psycopg
+from psycopg import sql
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PRISMA_DIR = os.path.join(REPO_ROOT, 'server', 'prisma')
+
+TEMPLATE_SUFFIX = '_template'
+CLONE_SUFFIX = '_t_'
+
+# Database names the harness may build templates and clones for: a 'test',
+# 'tests' or 'e2e' part, e.g. studyhub_e2e or studyhub_test
+TEST_DATABASE = re.compile(r'(^|[_-])(test|tests|e2e)([_-]|$)', re.IGNORECASE)
+
+
+def with_database(database_url, name):
+    """The same connection URL pointing at another database."""
+    parts = urlsplit(database_url)
+    return urlunsplit((parts.scheme, parts.netloc, f'/{name}', parts.query, parts.fragment))
+
+
+def schema_fingerprint(prisma_dir=PRISMA_DIR):
+    """Short SHA-256 over schema.prisma, the migrations and seed.js."""
+    digest = hashlib.sha256()
+    for directory, dirnames, filenames in os.walk(prisma_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(directory, filename)
+            digest.update(os.path.relpath(path, prisma_dir).replace(os.sep, '/').encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class DatabaseSnapshots:
+    """
+    Template database for a test database, and fast restores of a clone
+    of it for the API to run against.
+
+    Usage:
+        snapshots = DatabaseSnapshots(TestConfig.DATABASE_URL)
+        if not snapshots.template_is_current():
+            url = snapshots.create_template()
+            ...  # migrate and seed `url`, add_user()
+            snapshots.finish_template()
+        snapshots.restore()
+        ...  # start the API with DATABASE_URL=snapshots.clone_url
+        snapshots.drop_clone()
+
+    Raises:
+        RuntimeError: When the database is not named for tests
+    """
+
+    def __init__(self, database_url, worker=None):
+        """
+        Args:
+            database_url: URL of the test database; the template is
+                <database>_template and the clone <database>_t_<worker> on
+                the same server
+            worker: Name of the clone's owner (default: the pytest-xdist
+                worker, or 'main')
+        """
+        self.database_url = database_url
+        self.database = urlsplit(database_url).path.lstrip('/')
+        if not TEST_DATABASE.search(self.database):
+            raise RuntimeError(f"Refusing to snapshot database '{self.database}': its name has no "
+                               f"test/tests/e2e part (set DATABASE_URL to a test database or DB_SNAPSHOTS=false)")
+        self.template = self.database + TEMPLATE_SUFFIX
+        self.template_url = with_database(database_url, self.template)
+        worker = worker or os.getenv('PYTEST_XDIST_WORKER', 'main')
+        self.clone_name = f"{self.database}{CLONE_SUFFIX}{worker}"
+        self.clone_url = with_database(database_url, self.clone_name)
+        self.fingerprint = schema_fingerprint()
+        self.restore_times_ms = []
+        self._admin = None
+
+    @property
+    def admin(self):
+        """Autocommit connection to the maintenance database (CREATE/DROP DATABASE)."""
+        if self._admin is None or self._admin.closed:
+            self._admin = psycopg.connect(with_database(self.database_url, 'postgres'), autocommit=True)
+        return self._admin
+
+    def _execute(self, query, *params):
+        return self.admin.execute(query, params or None)
+
+    def template_is_current(self):
+        """True when the template exists and was built from the current schema and seed."""
+        row = self._execute(
+            "SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = %s",
+            self.template,
+        ).fetchone()
+        return row is not None and row[0] == self.fingerprint
+
+    def create_template(self):
+        """
+        Replace the template with an empty database.
+
+        Returns:
+            URL of the template, to run migrations and the seed against
+        """
+        template = sql.Identifier(self.template)
+        exists = self._execute("SELECT 1 FROM pg_database WHERE datname = %s", self.template).fetchone()
+        if exists:
+            self._execute(sql.SQL("ALTER DATABASE {} IS_TEMPLATE false").format(template))
+            self._execute(sql.SQL("DROP DATABASE {} WITH (FORCE)").format(template))
+        self._execute(sql.SQL("CREATE DATABASE {}").format(template))
+        return self.template_url
+
+    def finish_template(self):
+        """Mark the migrated and seeded template as current and read-only for cloning."""
+        template = sql.Identifier(self.template)
+        self._execute(sql.SQL("COMMENT ON DATABASE {} IS {}").format(template, sql.Literal(self.fingerprint)))
+        self._execute(sql.SQL("ALTER DATABASE {} IS_TEMPLATE true").format(template))
+
+    def add_user(self, email, password_hash, full_name):
+        """Insert a user into the template (before finish_template) unless the email exists."""
+        with psycopg.connect(self.template_url, autocommit=True) as connection:
+            connection.execute(
+                'INSERT INTO users ("fullName", email, "passwordHash", "updatedAt") '
+                'VALUES (%s, %s, %s, now()) ON CONFLICT (email) DO NOTHING',
+                (full_name, email, password_hash),
+            )
+
+    def clone(self, name):
+        """
+        Create (or replace) database `name` as a copy of the template.
+
+        Returns:
+            URL of the clone
+        """
+        self.drop(name)
+        self._execute(sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(
+            sql.Identifier(name), sql.Identifier(self.template)))
+        return with_database(self.database_url, name)
+
+    def drop(self, name):
+        """Drop a database, disconnecting its clients."""
+        self._execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(sql.Identifier(name)))
+
+    def restore(self):
+        """
+        Reset the harness-owned clone to the template.
+
+        Returns:
+            Milliseconds the restore took
+        """
+        started = time.perf_counter()
+        self.clone(self.clone_name)
+        elapsed = (time.perf_counter() - started) * 1000
+        self.restore_times_ms.append(elapsed)
+        return elapsed
+
+    def drop_clone(self):
+        """Drop the harness-owned clone (at the end of the session)."""
+        self.drop(self.clone_name)
+
+    def close(self):
+        if self._admin is not None:
+            self._admin.close()
+            self._admin = None
+
+    def report(self):
+        times = self.restore_times_ms
+        return {
+            'template': self.template,
+            'clone': self.clone_name,
+            'fingerprint': self.fingerprint,
+            'restores': len(times),
+            'restore_mean_ms': round(sum(times) / len(times), 1) if times else None,
+            'restore_max_ms': round(max(times), 1) if times else None,
+        }
@@ -0,0 +1,409 @@
+"""
+Test Dependency Map
+Records, for every test that runs, the client routes it visits and the API
+endpoints it calls, and keeps them in one JSON file across runs
+(TestConfig.DEPENDENCY_MAP_FILE). watch.py uses the map to pick the tests a
+changed file can affect:
+
+- client/src/**: the import graph of the client, from the changed file up to
+  the page components App.tsx mounts on each route, gives the affected
+  routes; the tests that visited them are selected.
+- server/src/**: the require graph of the server, from the changed file up to
+  the route modules index.js mounts on each /api prefix, gives the affected
+  prefixes; the tests that called endpoints under them are selected.
+- selenium-tests/*.py: a changed test module runs completely; a changed
+  harness module runs the test modules that import it.
+
+Files every page or every endpoint depends on (main.tsx, App.tsx, the auth
+context, index.js, the Prisma client, conftest.py) select the whole suite.
+"""
+
+import json
+import os
+import re
+import time
+from selenium.common.exceptions import WebDriverException
+from driver_hooks import add_command_listener
+from network_log import get_network_log, is_api_request
+from perf_reports import read_json
+from resource_blocking import route_of
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TESTS_DIR = os.path.join(REPO_ROOT, 'selenium-tests')
+CLIENT_SRC = os.path.join(REPO_ROOT, 'client', 'src')
+SERVER_SRC = os.path.join(REPO_ROOT, 'server', 'src')
+SERVER_INDEX = os.path.join(SERVER_SRC, 'index.js')
+CONFTEST = os.path.join(TESTS_DIR, 'conftest.py')
+
+CLIENT_EXTENSIONS = ('.tsx', '.ts', '.jsx', '.js', '.css')
+SERVER_EXTENSIONS = ('.js', '.json')
+
+# Installed before any page script runs; records every path the page shows,
+# including client-side navigations of React Router
+ROUTE_TRACKER_JS = r"""
+(function () {
+  if (window.__studyhubRoutes) return;
+  var state = { paths: [] };
+  var record = function () { state.paths.push(location.origin + location.pathname); };
+  state.drain = function () {
+    var paths = state.paths;
+    state.paths = [];
+    return paths;
+  };
+  window.__studyhubRoutes = state;
+  ['pushState', 'replaceState'].forEach(function (name) {
+    var original = history[name];
+    history[name] = function () {
+      var result = original.apply(this, arguments);
+      record();
+      return result;
+    };
+  });
+  window.addEventListener('popstate', record);
+  record();
+})();
+"""
+
+DRAIN_ROUTES_JS = """
+return window.__studyhubRoutes ? window.__studyhubRoutes.drain() : [];
+"""
+
+
+class DependencyRecorder:
+    """
+    Instrument that records the routes and API endpoints of one test.
+
+    Args:
+        base_url: Frontend URL; only paths of this origin count as routes
+        capture_network: The driver records network events, so API calls
+            can be seen (without it the test counts as calling every endpoint)
+    """
+
+    def __init__(self, base_url, capture_network=False):
+        self.origin = base_url.rstrip('/')
+        self.capture_network = capture_network
+        self.routes = set()
+        self._cursor = 0
+
+    def attach(self, driver):
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': ROUTE_TRACKER_JS})
+        if self.capture_network:
+            self._cursor = get_network_log(driver).mark()
+        add_command_listener(driver, self)
+
+    def before_command(self, driver, command, params):
+        if command in ('get', 'goBack', 'goForward', 'refresh', 'closeWindow'):
+            # Collect the paths of the current page before it goes away
+            self._drain(driver)
+
+    def _drain(self, driver):
+        try:
+            paths = driver.execute_script(DRAIN_ROUTES_JS) or []
+        except WebDriverException:
+            # Page is navigating or the window is gone - nothing to collect
+            return
+        for path in paths:
+            if path.startswith(self.origin):
+                self.routes.add(route_of(path))
+
+    def finish(self, driver, item):
+        self._drain(driver)
+        endpoints = None
+        if self.capture_network:
+            endpoints = sorted({f"{record['method']} {route_of(record['url'])}"
+                                for record in get_network_log(driver).since(self._cursor)
+                                if is_api_request(record)})
+        SESSION_ENTRIES[item.nodeid] = {
+            'routes': sorted(self.routes),
+            'endpoints': endpoints,
+            'recorded': round(time.time()),
+        }
+        return None
+
+
+# Dependencies of the tests run in this pytest process
+SESSION_ENTRIES = {}
+
+
+def load_map(path):
+    """Dependency map as {node id: {'routes', 'endpoints', 'recorded'}}."""
+    return (read_json(path, default={}) or {}).get('tests', {})
+
+
+def write_session_map(path):
+    """
+    Merge the dependencies recorded in this process into the map file.
+
+    Every pytest-xdist worker merges its own tests; a file lock keeps them
+    from overwriting each other.
+
+    Returns:
+        Path of the map file, or None when no test was recorded
+    """
+    if not SESSION_ENTRIES:
+        return None
+    import fcntl  # Unix only, like the rest of the process management here
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path + '.lock', 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        tests = load_map(path)
+        tests.update(SESSION_ENTRIES)
+        partial = path + '.partial'
+        with open(partial, 'w', encoding='utf-8') as f:
+            json.dump({'tests': dict(sorted(tests.items()))}, f, ensure_ascii=False, indent=2)
+        os.replace(partial, path)
+    return path
+
+
+def select_items(config, items, selection_path):
+    """
+    Deselect the collected tests a watch run did not pick.
+
+    Args:
+        config: pytest config
+        items: Collected test items (modified in place)
+        selection_path: JSON list of node ids and test module paths to keep
+    """
+    selection = set(read_json(selection_path, default=[]))
+    selected, deselected = [], []
+    for item in items:
+        if item.nodeid in selection or item.nodeid.split('::')[0] in selection:
+            selected.append(item)
+        else:
+            deselected.append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+# --- From changed files to tests ---
+
+def _read(path):
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def _resolve(base_dir, specifier, extensions):
+    """File a relative import specifier points to, or None."""
+    target = os.path.normpath(os.path.join(base_dir, specifier))
+    candidates = [target] + [target + ext for ext in extensions] + \
+        [os.path.join(target, 'index' + ext) for ext in extensions]
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def import_graph(root, extensions, pattern):
+    """
+    Relative imports of every source file under a directory.
+
+    Args:
+        root: Source directory
+        extensions: File extensions that are sources (and are tried when
+            resolving an import without one)
+        pattern: Regex whose first group is the imported specifier
+
+    Returns:
+        Dict of file -> set of imported files
+    """
+    graph = {}
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if not name.endswith(extensions):
+                continue
+            path = os.path.join(directory, name)
+            imports = set()
+            for specifier in re.findall(pattern, _read(path)):
+                if specifier.startswith('.'):
+                    resolved = _resolve(directory, specifier, extensions)
+                    if resolved:
+                        imports.add(resolved)
+            graph[path] = imports
+    return graph
+
+
+def requires(graph, files):
+    """The files plus everything they import, directly or not."""
+    reached = set(files)
+    pending = list(files)
+    while pending:
+        for path in graph.get(pending.pop(), set()):
+            if path not in reached:
+                reached.add(path)
+                pending.append(path)
+    return reached
+
+
+def importers(graph, changed):
+    """The changed files plus every file that imports one of them, directly or not."""
+    reached = set(changed)
+    pending = list(changed)
+    while pending:
+        target = pending.pop()
+        for path, imports in graph.items():
+            if target in imports and path not in reached:
+                reached.add(path)
+                pending.append(path)
+    return reached
+
+
+def route_pattern_matches(pattern, route):
+    """Whether a React Router path pattern matches a recorded route."""
+    if pattern == '*':
+        return True
+    regex = re.sub(r':\w+', '[^/]+', re.escape(pattern))
+    return re.fullmatch(regex, route) is not None
+
+
+def client_routes(changed):
+    """
+    Client routes whose page can render code from the changed files.
+
+    Returns:
+        (set of route patterns, True when every route is affected)
+    """
+    graph = import_graph(CLIENT_SRC, CLIENT_EXTENSIONS, r"""(?:from|import)\s*['"]([^'"]+)['"]""")
+    app_path = os.path.join(CLIENT_SRC, 'App.tsx')
+    main_path = os.path.join(CLIENT_SRC, 'main.tsx')
+    reached = importers(graph, changed)
+    if app_path in changed or main_path in changed:
+        return set(), True
+    # Files main.tsx wraps around every page (AuthProvider, global CSS)
+    if any(path in reached for path in graph.get(main_path, set()) - {app_path}):
+        return set(), True
+    if app_path not in reached:
+        return set(), False
+
+    source = _read(app_path)
+    imported = {}
+    for names, specifier in re.findall(r"import\s+([^;]+?)\s+from\s+['\"](\.[^'\"]+)['\"]", source):
+        path = _resolve(CLIENT_SRC, specifier, CLIENT_EXTENSIONS)
+        for name in re.findall(r'\w+', names.replace(' as ', ' ')):
+            imported[name] = path
+    locals_ = dict(re.findall(r'\nfunction (\w+)\((.*?)(?=\nfunction |\nexport )', source, re.S))
+    routes_source = source[source.index('<Routes>'):]
+    blocks = re.findall(r'<Route\s+path="([^"]+)"(.*?)(?=<Route\s|</Routes>)', routes_source, re.S)
+
+    def used_files(text, seen):
+        files = {imported[name] for name in imported if re.search(rf'\b{name}\b', text)}
+        for name, body in locals_.items():
+            if name not in seen and re.search(rf'<{name}\b', text):
+                files |= used_files(body, seen | {name})
+        return files
+
+    routes, attributed = set(), set()
+    for pattern, block in blocks:
+        files = used_files(block, set())
+        attributed |= files
+        if files & reached:
+            routes.add(pattern)
+    # Something App.tsx uses outside the routes (the app shell)
+    unattributed = {imported[name] for name in imported} - attributed
+    return routes, bool(unattributed & reached)
+
+
+def server_graph():
+    return import_graph(SERVER_SRC, SERVER_EXTENSIONS, r"""require\(\s*['"]([^'"]+)['"]\s*\)""")
+
+
+def server_mounts():
+    """Route module file per /api prefix, as index.js mounts them."""
+    source = _read(SERVER_INDEX)
+    modules = {name: _resolve(SERVER_SRC, specifier, SERVER_EXTENSIONS)
+               for name, specifier in re.findall(r"const (\w+) = require\('(\./routes/[^']+)'\)", source)}
+    return {prefix: modules[name] for prefix, name in re.findall(r"app\.use\('(/api/[^']+)',\s*(\w+)\)", source)
+            if modules.get(name)}
+
+
+def server_shared(graph, mounts):
+    """What index.js uses for every request (middleware, the Prisma client), besides the route modules."""
+    return graph.get(SERVER_INDEX, set()) - set(mounts.values())
+
+
+def server_prefixes(changed):
+    """
+    API prefixes whose route module can run code from the changed files.
+
+    Returns:
+        (set of prefixes such as '/api/forum', True when every endpoint is affected)
+    """
+    if SERVER_INDEX in changed:
+        return set(), True
+    graph = server_graph()
+    reached = importers(graph, changed)
+    mounts = server_mounts()
+    prefixes = {prefix for prefix, path in mounts.items() if path in reached}
+    return prefixes, bool(server_shared(graph, mounts) & reached)
+
+
+def harness_graph():
+    """Imports between the modules of the test directory."""
+    modules = {name[:-3]: os.path.join(TESTS_DIR, name)
+               for name in os.listdir(TESTS_DIR) if name.endswith('.py')}
+    graph = {}
+    for path in modules.values():
+        names = re.findall(r'^\s*(?:from|import)\s+(\w+)', _read(path), re.M)
+        graph[path] = {modules[name] for name in names if name in modules}
+    return graph
+
+
+def test_modules(changed):
+    """
+    Test modules affected by changed harness files.
+
+    Returns:
+        (set of test module file names, True when every module is affected)
+    """
+    reached = importers(harness_graph(), changed)
+    if CONFTEST in reached:
+        return set(), True
+    return {os.path.basename(path) for path in reached if os.path.basename(path).startswith('test_')}, False
+
+
+def affected_tests(changed_paths, dependency_map):
+    """
+    Tests a set of changed files can affect.
+
+    Args:
+        changed_paths: Changed files (absolute, or relative to the repository)
+        dependency_map: Map returned by load_map()
+
+    Returns:
+        (sorted selection of node ids and test module names, True when the
+        whole suite is affected)
+    """
+    changed = {os.path.normpath(os.path.join(REPO_ROOT, path)) for path in changed_paths}
+    client = {path for path in changed if path.startswith(CLIENT_SRC + os.sep)}
+    server = {path for path in changed if path.startswith(SERVER_SRC + os.sep)}
+    harness = {path for path in changed if os.path.dirname(path) == TESTS_DIR and path.endswith('.py')}
+
+    selection = set()
+    if harness:
+        modules, everything = test_modules(harness)
+        if everything:
+            return [], True
+        selection |= modules
+    if client:
+        routes, everything = client_routes(client)
+        if everything:
+            return [], True
+        selection |= {node_id for node_id, entry in dependency_map.items()
+                      if any(route_pattern_matches(pattern, route)
+                             for pattern in routes for route in entry['routes'])}
+    if server:
+        prefixes, everything = server_prefixes(server)
+        if everything:
+            return [], True
+        for node_id, entry in dependency_map.items():
+            if entry['endpoints'] is None:
+                # Recorded without network capture - it may call anything
+                selection.add(node_id)
+                continue
+            paths = [endpoint.split(' ', 1)[1] for endpoint in entry['endpoints']]
+            if any(path == prefix or path.startswith(prefix + '/') for prefix in prefixes for path in paths):
+                selection.add(node_id)
+    return sorted(selection), False
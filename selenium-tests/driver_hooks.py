@@ -0,0 +1,79 @@
+"""
+WebDriver Command Hooks
+Lets harness instruments observe every WebDriver command a test sends,
+without changing the type of the driver object the tests receive.
+"""
+
+import threading
+
+
+# WebDriver commands that correspond to something a user does in the browser,
+# mapped to the short action name used in reports
+USER_ACTION_COMMANDS = {
+    'get': 'navigate',
+    'goBack': 'back',
+    'goForward': 'forward',
+    'refresh': 'refresh',
+    'clickElement': 'click',
+    'sendKeysToElement': 'type',
+    'clearElement': 'clear',
+}
+
+
+def add_command_listener(driver, listener):
+    """
+    Register a listener that is notified around every WebDriver command.
+
+    A listener may implement any of:
+        before_command(driver, command, params)
+        after_command(driver, command, params, error)
+
+    Commands issued by a listener while it is being notified are sent
+    straight to the browser and are not reported back to the listeners.
+
+    Args:
+        driver: WebDriver instance
+        listener: Object implementing one or both hook methods
+    """
+    listeners = getattr(driver, '_command_listeners', None)
+    if listeners is None:
+        listeners = []
+        driver._command_listeners = listeners
+        _wrap_execute(driver, listeners)
+    listeners.append(listener)
+
+
+def _wrap_execute(driver, listeners):
+    """Replace driver.execute with a version that notifies listeners."""
+    original_execute = driver.execute
+    state = threading.local()
+
+    def notify(hook_name, *args):
+        state.busy = True
+        try:
+            for listener in list(listeners):
+                hook = getattr(listener, hook_name, None)
+                if hook is None:
+                    continue
+                try:
+                    hook(driver, *args)
+                except Exception as e:
+                    # Instrumentation must never break the test itself
+                    print(f"⚠️ {type(listener).__name__}.{hook_name} failed: {e}")
+        finally:
+            state.busy = False
+
+    def execute(driver_command, params=None):
+        if getattr(state, 'busy', False):
+            return original_execute(driver_command, params)
+
+        notify('before_command', driver_command, params or {})
+        try:
+            response = original_execute(driver_command, params)
+        except Exception as error:
+            notify('after_command', driver_command, params or {}, error)
+            raise
+        notify('after_command', driver_command, params or {}, None)
+        return response
+
+    driver.execute = execute
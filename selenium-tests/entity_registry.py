@@ -0,0 +1,214 @@
+"""
+Entity Registry
+Remembers every entity a test creates - through the UI (read from the API
+responses the browser receives) or through ApiClient - and deletes them all
+when the test ends, so long-lived environments do not fill up with test
+posts, summaries, tools and users.
+
+Deletes run concurrently as the admin account, which may delete any
+content. Comments have no delete endpoint; they are counted but only go
+away with their post or author.
+"""
+
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+from api_client import ApiClient, ApiError
+from driver_hooks import add_command_listener
+from network_log import get_network_log
+
+
+# (method, path pattern, key of the created entity in the response, kind)
+CREATE_ROUTES = [
+    ('POST', re.compile(r'^/api/forum$'), 'post', 'forum'),
+    ('POST', re.compile(r'^/api/summaries$'), 'summary', 'summaries'),
+    ('POST', re.compile(r'^/api/tools$'), 'tool', 'tools'),
+    ('POST', re.compile(r'^/api/help-requests$'), 'request', 'help-requests'),
+    ('POST', re.compile(r'^/api/auth/register$'), 'user', 'users'),
+    ('POST', re.compile(r'^/api/forum/\d+/comments$'), 'comment', 'forum-comments'),
+    ('POST', re.compile(r'^/api/summaries/\d+/comments$'), 'comment', 'summary-comments'),
+]
+
+# Delete endpoint per kind; kinds without one are only counted
+DELETE_PATHS = {
+    'forum': '/api/forum/{id}',
+    'summaries': '/api/summaries/{id}',
+    'tools': '/api/tools/{id}',
+    'help-requests': '/api/help-requests/{id}',
+    'users': '/api/admin/users/{id}',
+}
+
+# Users go last: deleting a user cascades to their content
+DELETE_ORDER = ['forum', 'summaries', 'tools', 'help-requests', 'users']
+
+# Commands after which the page (and the bodies of its responses) is replaced
+NAVIGATION_COMMANDS = {'get', 'goBack', 'goForward', 'refresh', 'quit', 'close'}
+
+MAX_PARALLEL_DELETES = 8
+
+
+def match_create_route(method, path):
+    """(response key, kind) when the request creates an entity, else None."""
+    path = path.split('?')[0]
+    for route_method, pattern, key, kind in CREATE_ROUTES:
+        if method == route_method and pattern.match(path):
+            return key, kind
+    return None
+
+
+class EntityRegistry:
+    """
+    Entities created during one test.
+
+    Usage:
+        registry = EntityRegistry()
+        api = ApiClient(TestConfig.API_URL, registry=registry)
+        ...
+        registry.cleanup(TestConfig.API_URL, (admin_email, admin_password))
+    """
+
+    def __init__(self):
+        # kind -> list of ids, in creation order
+        self.entities = {}
+
+    def record(self, kind, entity_id):
+        ids = self.entities.setdefault(kind, [])
+        if entity_id not in ids:
+            ids.append(entity_id)
+
+    def record_response(self, method, path, status, body):
+        """Record the entity a successful create request returned, if any."""
+        route = match_create_route(method, path)
+        if route is None or status is None or not 200 <= status < 300 or not isinstance(body, dict):
+            return
+        key, kind = route
+        entity = body.get(key)
+        if isinstance(entity, dict) and entity.get('id') is not None:
+            self.record(kind, entity['id'])
+
+    def __len__(self):
+        return sum(len(ids) for ids in self.entities.values())
+
+    def cleanup(self, api_url, admin_credentials, fallback_token=None):
+        """
+        Delete every recorded entity, concurrently within each kind.
+
+        Args:
+            api_url: Base URL of the API
+            admin_credentials: (email, password) of an admin account
+            fallback_token: Token used when the admin cannot sign in (it can
+                only delete its own content, not users)
+
+        Returns:
+            Dict with the counts per outcome and the failures
+        """
+        result = {'deleted': 0, 'gone': 0, 'failed': [], 'not_deletable': 0}
+        for kind, ids in self.entities.items():
+            if kind not in DELETE_PATHS:
+                result['not_deletable'] += len(ids)
+        if not any(kind in DELETE_PATHS for kind in self.entities):
+            return result
+
+        admin = ApiClient(api_url)
+        try:
+            admin.login(*admin_credentials)
+        except (ApiError, OSError) as e:
+            if not fallback_token:
+                result['failed'].append(f"admin sign-in: {e}")
+                return result
+            admin.token = fallback_token
+
+        def delete(kind, entity_id):
+            try:
+                admin.delete(DELETE_PATHS[kind].format(id=entity_id))
+                return 'deleted'
+            except ApiError as e:
+                # Already removed, e.g. together with its author
+                return 'gone' if e.status == 404 else f"{kind} {entity_id}: {e.status}"
+            except OSError as e:
+                return f"{kind} {entity_id}: {e}"
+
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_DELETES) as pool:
+            for kind in DELETE_ORDER:
+                ids = self.entities.get(kind, [])
+                if kind == 'users' and admin.user:
+                    ids = [i for i in ids if i != admin.user['id']]
+                for outcome in pool.map(lambda entity_id: delete(kind, entity_id), ids):
+                    if outcome in ('deleted', 'gone'):
+                        result[outcome] += 1
+                    else:
+                        result['failed'].append(outcome)
+        self.entities = {}
+        return result
+
+
+class EntityTracker:
+    """
+    Instrument that records the entities the browser creates.
+
+    Response bodies are only available while their page is loaded, so new
+    create requests are read before every navigation and when the test ends.
+    The driver must be created with network capture enabled.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.unresolved = 0
+        self._cursor = 0
+
+    def attach(self, driver):
+        add_command_listener(driver, self)
+
+    def before_command(self, driver, command, params):
+        if command in NAVIGATION_COMMANDS:
+            self.collect(driver)
+
+    def collect(self, driver):
+        """Read the bodies of create responses seen since the last call."""
+        log = get_network_log(driver)
+        records = log.since(self._cursor)
+        self._cursor += len(records)
+        for record in records:
+            path = urlsplit(record['url']).path
+            if match_create_route(record['method'], path) is None or not record['status']:
+                continue
+            try:
+                body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': record['request_id']})
+                data = json.loads(body['body'])
+            except (WebDriverException, ValueError, KeyError):
+                self.unresolved += 1
+                continue
+            self.registry.record_response(record['method'], path, record['status'], data)
+
+    def finish(self, driver, item):
+        self.collect(driver)
+        if self.unresolved:
+            print(f"⚠️ {self.unresolved} created entities could not be read back for cleanup")
+        return None
+
+
+# Cleanup results of the current pytest session
+SESSION_TOTALS = {'deleted': 0, 'gone': 0, 'failed': [], 'not_deletable': 0}
+
+
+def add_to_session(result):
+    SESSION_TOTALS['deleted'] += result['deleted']
+    SESSION_TOTALS['gone'] += result['gone']
+    SESSION_TOTALS['not_deletable'] += result['not_deletable']
+    SESSION_TOTALS['failed'] += result['failed']
+
+
+def summarize(terminalreporter):
+    """Print how many test entities were cleaned up."""
+    totals = SESSION_TOTALS
+    if not (totals['deleted'] or totals['gone'] or totals['failed'] or totals['not_deletable']):
+        return
+    terminalreporter.section('test data cleanup')
+    terminalreporter.write_line(
+        f"{totals['deleted']} deleted, {totals['gone']} already gone, "
+        f"{totals['not_deletable']} comments left (no delete endpoint), {len(totals['failed'])} failed"
+    )
+    for failure in totals['failed'][:20]:
+        terminalreporter.write_line(f"    {failure}")
@@ -0,0 +1,239 @@
+"""
+Failure Bundles
+Collects everything needed to debug a failed test in one compressed archive,
+and nothing at all for a test that passes:
+
+- the serialized DOM and the URL of the page at the time of the failure
+- the browser console and the network requests of the whole test, with
+  credentials (auth headers, cookies, password and token fields) redacted
+- the keys (not the values) of localStorage
+- the last WebDriver commands with their durations and errors
+- a screenshot of the failure, plus the screenshot ring buffer: the last
+  SCREENSHOT_RING screenshots the test took along the way
+
+The screenshots tests take on their success paths (take_screenshot) go to the
+ring buffer in memory as JPEGs instead of PNG files on disk, and are thrown
+away when the test passes.
+
+Each failure becomes FAILURE_BUNDLE_DIR/<test>_<timestamp>.zip with a
+manifest.json describing the rest.
+"""
+
+import base64
+import json
+import os
+import time
+import zipfile
+from collections import deque
+from datetime import datetime
+from selenium.common.exceptions import WebDriverException
+from driver_hooks import add_command_listener
+from network_log import get_network_log
+from page_errors import browser_log, report_filename
+
+
+# WebDriver commands kept for the bundle
+COMMAND_HISTORY = 50
+
+SCREENSHOT_QUALITY = 70
+
+# Parameters that may carry typed text (passwords); only their length is kept
+MASKED_PARAMS = ('text', 'value')
+
+# Request and response headers that carry credentials
+SECRET_HEADERS = ('authorization', 'cookie', 'set-cookie', 'proxy-authorization')
+
+# JSON body fields that carry credentials (matched case-insensitively, as substrings)
+SECRET_FIELDS = ('password', 'token', 'secret')
+
+REDACTED = '<redacted>'
+
+SERIALIZE_DOM_JS = "return new XMLSerializer().serializeToString(document);"
+
+LOCAL_STORAGE_KEYS_JS = "return Object.keys(window.localStorage || {});"
+
+
+def _summarize_params(params):
+    summary = {}
+    for key, value in params.items():
+        if key in MASKED_PARAMS:
+            summary[key] = f"<{len(value) if isinstance(value, (str, list)) else '?'} chars>"
+        elif isinstance(value, str) and len(value) > 200:
+            summary[key] = value[:200] + '...'
+        elif isinstance(value, (str, int, float, bool)) or value is None:
+            summary[key] = value
+    return summary
+
+
+def _redact_headers(headers):
+    return {name: REDACTED if name.lower() in SECRET_HEADERS else value for name, value in headers.items()}
+
+
+def redact_fields(value):
+    """Copy of parsed JSON with the values of secret fields masked, at any depth."""
+    if isinstance(value, dict):
+        return {key: REDACTED if any(field in key.lower() for field in SECRET_FIELDS) else redact_fields(item)
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact_fields(item) for item in value]
+    return value
+
+
+def redact_record(record):
+    """
+    Copy of a network record without credentials: secret headers are masked,
+    secret JSON fields of the body are masked, and bodies of /api/auth/
+    requests that are not JSON are dropped.
+    """
+    record = dict(record)
+    record['request_headers'] = _redact_headers(record.get('request_headers') or {})
+    record['response_headers'] = _redact_headers(record.get('response_headers') or {})
+    if record.get('post_data'):
+        try:
+            record['post_data'] = json.dumps(redact_fields(json.loads(record['post_data'])), ensure_ascii=False)
+        except ValueError:
+            if '/api/auth/' in record['url']:
+                record['post_data'] = REDACTED
+    return record
+
+
+class FailureRecorder:
+    """
+    Instrument that buffers recent commands and screenshots and writes a
+    bundle when the test failed.
+
+    Args:
+        bundle_dir: Directory for the archives
+        screenshots: Size of the screenshot ring buffer
+    """
+
+    def __init__(self, bundle_dir, screenshots=5):
+        self.bundle_dir = bundle_dir
+        self.screenshots = deque(maxlen=screenshots)
+        self.commands = deque(maxlen=COMMAND_HISTORY)
+        self._started = None
+
+    def attach(self, driver):
+        driver._failure_recorder = self
+        add_command_listener(driver, self)
+
+    def before_command(self, driver, command, params):
+        self._started = time.perf_counter()
+
+    def after_command(self, driver, command, params, error):
+        self.commands.append({
+            'command': command,
+            'params': _summarize_params(params),
+            'at': datetime.now().isoformat(timespec='milliseconds'),
+            'duration_ms': round((time.perf_counter() - self._started) * 1000, 1) if self._started else None,
+            'error': f"{type(error).__name__}: {error}".splitlines()[0] if error else None,
+        })
+
+    def screenshot(self, driver, name):
+        """
+        Add a screenshot to the ring buffer.
+
+        Returns:
+            True when the screenshot was taken
+        """
+        try:
+            data = driver.execute_cdp_cmd('Page.captureScreenshot',
+                                          {'format': 'jpeg', 'quality': SCREENSHOT_QUALITY})['data']
+            image, extension = base64.b64decode(data), 'jpg'
+        except WebDriverException:
+            try:
+                image, extension = driver.get_screenshot_as_png(), 'png'
+            except WebDriverException:
+                return False
+        self.screenshots.append({'name': name, 'at': datetime.now().strftime('%H%M%S_%f')[:-3],
+                                 'extension': extension, 'image': image})
+        return True
+
+    def finish(self, driver, item):
+        report = getattr(item, 'rep_call', None) or getattr(item, 'rep_setup', None)
+        if report is None or not report.failed:
+            return None
+        path = self.write(driver, item, report)
+        # Shows up on the teardown report (and in JUnit XML)
+        item.user_properties.append(('failure_bundle', path))
+        print(f"Failure bundle saved: {path}")
+        return None
+
+    def _collect(self, name, read, errors):
+        try:
+            return read()
+        except WebDriverException as e:
+            # The page or the whole browser may be gone - keep what can be read
+            errors[name] = str(e).splitlines()[0]
+            return None
+
+    def write(self, driver, item, report):
+        """
+        Write the bundle of a failed test.
+
+        Returns:
+            Path of the archive
+        """
+        # Before the bundle's own commands join the history
+        commands = list(self.commands)
+        errors = {}
+        url = self._collect('url', lambda: driver.current_url, errors)
+        dom = self._collect('dom', lambda: driver.execute_script(SERIALIZE_DOM_JS), errors)
+        storage_keys = self._collect('local_storage', lambda: driver.execute_script(LOCAL_STORAGE_KEYS_JS), errors)
+        console = self._collect('console', lambda: list(browser_log(driver)), errors)
+        network = self._collect('network', lambda: [redact_record(record)
+                                                    for record in get_network_log(driver).since(0)], errors)
+        self.screenshot(driver, 'failure')
+
+        manifest = {
+            'test': item.nodeid,
+            'phase': report.when,
+            'failure': report.longreprtext,
+            'saved': datetime.now().isoformat(timespec='seconds'),
+            'url': url,
+            'local_storage_keys': storage_keys,
+            'files': ['dom.html', 'console.json', 'network.json', 'commands.json'],
+            'screenshots': [],
+            'unreadable': errors,
+        }
+        os.makedirs(self.bundle_dir, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.bundle_dir, f"{report_filename(item.nodeid)}_{timestamp}.zip")
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('dom.html', dom or '')
+            archive.writestr('console.json', json.dumps(console or [], ensure_ascii=False, indent=2))
+            archive.writestr('network.json', json.dumps(network or [], ensure_ascii=False, indent=2))
+            archive.writestr('commands.json', json.dumps(commands, ensure_ascii=False, indent=2))
+            for index, shot in enumerate(self.screenshots, 1):
+                filename = f"screenshots/{index:02d}_{shot['at']}_{shot['name']}.{shot['extension']}"
+                # Images are compressed already
+                archive.writestr(filename, shot['image'], compress_type=zipfile.ZIP_STORED)
+                manifest['screenshots'].append(filename)
+            archive.writestr('manifest.json', json.dumps(manifest, ensure_ascii=False, indent=2))
+        return path
+
+
+def capture_screenshot(driver, name):
+    """
+    Put a screenshot in the driver's ring buffer instead of a file.
+
+    Returns:
+        True when the driver has a FailureRecorder and the screenshot was taken
+    """
+    recorder = getattr(driver, '_failure_recorder', None)
+    return recorder is not None and recorder.screenshot(driver, name)
+
+
+def summarize(terminalreporter):
+    """Print the failure bundles of the session (from all pytest-xdist workers)."""
+    bundles = {}
+    for reports in terminalreporter.stats.values():
+        for report in reports:
+            for name, value in getattr(report, 'user_properties', []):
+                if name == 'failure_bundle':
+                    bundles[value] = report.nodeid
+    if not bundles:
+        return
+    terminalreporter.section('failure bundles')
+    for path, nodeid in bundles.items():
+        terminalreporter.write_line(f"{nodeid}: {path}")
@@ -0,0 +1,300 @@
+"""
+Flaky Test History
+Keeps the outcome and duration of every test attempt in a local SQLite
+database (TestConfig.FLAKY_DB), so unstable tests become visible and only
+they pay for retries:
+
+- Outcomes are passed, failed or inconclusive. A test that passes but
+  printed "inconclusive" (an exception it swallowed) counts as inconclusive;
+  with INCONCLUSIVE_FAILS=true it fails instead.
+- A run of a test is flaky when its attempts disagree (failed, then passed)
+  or when it ended inconclusive. Runs are not compared with each other: a
+  test that fails consistently after a code change is broken, not flaky. The
+  flake rate is the share of flaky runs among the test's last FLAKY_WINDOW
+  runs.
+- Tests with a flake rate of at least FLAKY_THRESHOLD (over at least
+  FLAKY_MIN_RUNS runs) are rerun up to FLAKY_RERUNS times when they fail.
+  Every other test fails on the first failure, as before.
+- The end of the run prints a flake-rate leaderboard and writes it to
+  flaky-tests.json.
+
+Usage:
+    python flaky_tests.py            # print the leaderboard
+    python flaky_tests.py --top 20
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+import uuid
+from _pytest.runner import runtestprotocol
+from perf_reports import write_json
+
+
+# Runs of history kept in the database
+KEEP_RUNS = 500
+
+LEADERBOARD_SIZE = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    run_id TEXT NOT NULL,
+    nodeid TEXT NOT NULL,
+    attempt INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL,
+    message TEXT,
+    recorded REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_nodeid ON attempts (nodeid, recorded);
+"""
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def run_id(config):
+    """Id of the test run, shared by all pytest-xdist workers."""
+    return getattr(config, 'workerinput', {}).get('testrunuid') or uuid.uuid4().hex
+
+
+def is_inconclusive(report):
+    return report.when == 'call' and 'inconclusive' in report.capstdout
+
+
+def fail_inconclusive(report):
+    """Turn the report of a test that swallowed an exception as inconclusive into a failure."""
+    if report.passed and is_inconclusive(report):
+        lines = [line for line in report.capstdout.splitlines() if 'inconclusive' in line]
+        report.outcome = 'failed'
+        report.longrepr = 'Inconclusive (INCONCLUSIVE_FAILS=true):\n' + '\n'.join(lines)
+
+
+def record(item, report):
+    """
+    Add a phase report to the current attempt (call from pytest_runtest_makereport).
+    The attempt is complete after its teardown.
+    """
+    attempt = getattr(item, 'execution_count', 1)
+    entry = _PENDING.setdefault((item.nodeid, attempt), {'outcome': 'passed', 'duration': 0.0, 'message': None})
+    entry['duration'] += report.duration
+    if is_inconclusive(report):
+        entry['outcome'] = 'inconclusive'
+        entry['message'] = next(line for line in report.capstdout.splitlines() if 'inconclusive' in line)[:500]
+    elif report.failed:
+        entry['outcome'] = 'failed'
+        entry['message'] = (report.longreprtext.strip().splitlines() or [''])[-1][:500]
+    elif report.skipped:
+        entry['outcome'] = 'skipped'
+    if report.when == 'teardown':
+        del _PENDING[(item.nodeid, attempt)]
+        if entry['outcome'] != 'skipped':
+            SESSION_ATTEMPTS.append({'nodeid': item.nodeid, 'attempt': attempt, **entry, 'recorded': time.time()})
+
+
+# Phases of attempts still running, and finished attempts of this pytest process
+_PENDING = {}
+SESSION_ATTEMPTS = []
+
+# Flake rates of the tests that are rerun on failure in this session
+FLAKY = {}
+
+
+def write_attempts(db_path, current_run):
+    """
+    Store the attempts of this process in the database.
+
+    Returns:
+        Number of stored attempts
+    """
+    if not SESSION_ATTEMPTS:
+        return 0
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute('INSERT OR IGNORE INTO runs (run_id, started) VALUES (?, ?)',
+                         (current_run, min(a['recorded'] for a in SESSION_ATTEMPTS)))
+            conn.executemany(
+                'INSERT INTO attempts (run_id, nodeid, attempt, outcome, duration, message, recorded) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(current_run, a['nodeid'], a['attempt'], a['outcome'], round(a['duration'], 3),
+                  a['message'], a['recorded']) for a in SESSION_ATTEMPTS],
+            )
+            conn.execute('DELETE FROM attempts WHERE run_id NOT IN '
+                         '(SELECT run_id FROM runs ORDER BY started DESC LIMIT ?)', (KEEP_RUNS,))
+            conn.execute('DELETE FROM runs WHERE run_id NOT IN '
+                         '(SELECT run_id FROM runs ORDER BY started DESC LIMIT ?)', (KEEP_RUNS,))
+    finally:
+        conn.close()
+    return len(SESSION_ATTEMPTS)
+
+
+def history(db_path, window):
+    """
+    Flake statistics per test over its last `window` runs.
+
+    Returns:
+        Dict of node id -> {'runs', 'flaky_runs', 'flake_rate', 'failed',
+        'inconclusive', 'reruns', 'mean_s', 'last_message'}
+    """
+    if not os.path.exists(db_path):
+        return {}
+    conn = connect(db_path)
+    try:
+        rows = conn.execute('SELECT nodeid, run_id, attempt, outcome, duration, message FROM attempts '
+                            'ORDER BY nodeid, recorded, attempt').fetchall()
+    finally:
+        conn.close()
+
+    runs = {}
+    for nodeid, run, attempt, outcome, duration, message in rows:
+        attempts = runs.setdefault(nodeid, {}).setdefault(run, [])
+        attempts.append((outcome, duration, message))
+
+    stats = {}
+    for nodeid, by_run in runs.items():
+        recent = list(by_run.values())[-window:]
+        flaky_runs = 0
+        for attempts in recent:
+            outcomes = [outcome for outcome, _, _ in attempts]
+            if len(set(outcomes)) > 1 or outcomes[-1] == 'inconclusive':
+                flaky_runs += 1
+        attempts = [attempt for run_attempts in recent for attempt in run_attempts]
+        messages = [message for outcome, _, message in attempts if outcome != 'passed' and message]
+        stats[nodeid] = {
+            'runs': len(recent),
+            'flaky_runs': flaky_runs,
+            'flake_rate': round(flaky_runs / len(recent), 3),
+            'failed': sum(1 for outcome, _, _ in attempts if outcome == 'failed'),
+            'inconclusive': sum(1 for outcome, _, _ in attempts if outcome == 'inconclusive'),
+            'reruns': len(attempts) - len(recent),
+            'mean_s': round(sum(duration for _, duration, _ in attempts) / len(attempts), 2),
+            'last_message': messages[-1] if messages else None,
+        }
+    return stats
+
+
+def load_flaky(db_path, window, threshold, min_runs):
+    """Select the tests that are rerun on failure in this session."""
+    FLAKY.clear()
+    FLAKY.update({nodeid: s['flake_rate'] for nodeid, s in history(db_path, window).items()
+                  if s['runs'] >= min_runs and s['flake_rate'] >= threshold})
+    return FLAKY
+
+
+def run_protocol(item, nextitem, reruns):
+    """
+    Run a historically flaky test up to 1 + reruns times until it passes
+    (call from pytest_runtest_protocol).
+
+    Failed phases of attempts that are followed by another attempt are
+    reported with the 'rerun' outcome.
+
+    Returns:
+        True when the test was run here, None to leave it to pytest
+    """
+    if item.nodeid not in FLAKY or reruns < 1:
+        return None
+    item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+    for attempt in range(1, reruns + 2):
+        item.execution_count = attempt
+        reports = runtestprotocol(item, nextitem=nextitem, log=False)
+        retry = attempt <= reruns and any(report.failed for report in reports)
+        for report in reports:
+            if retry and report.failed:
+                report.outcome = 'rerun'
+            item.ihook.pytest_runtest_logreport(report=report)
+        if not retry:
+            break
+        print(f"\n🔁 Rerunning flaky test {item.nodeid} (flake rate {FLAKY[item.nodeid]:.0%}, "
+              f"attempt {attempt + 1} of {reruns + 1})")
+    item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+    return True
+
+
+def report_status(report):
+    """Short status of rerun reports for the terminal (call from pytest_report_teststatus)."""
+    if report.outcome == 'rerun':
+        return 'rerun', 'R', ('RERUN', {'yellow': True})
+    return None
+
+
+def leaderboard(stats, top=LEADERBOARD_SIZE):
+    """Tests with flaky runs, highest flake rate first."""
+    ranked = sorted(((nodeid, s) for nodeid, s in stats.items() if s['flaky_runs']),
+                    key=lambda entry: (-entry[1]['flake_rate'], -entry[1]['flaky_runs'], entry[0]))
+    return ranked[:top]
+
+
+def _leaderboard_lines(stats, top):
+    for rank, (nodeid, s) in enumerate(leaderboard(stats, top), 1):
+        yield (f"{rank:>2}. {s['flake_rate']:>5.0%} {nodeid} ({s['flaky_runs']}/{s['runs']} runs flaky, "
+               f"{s['failed']} failed, {s['inconclusive']} inconclusive, {s['reruns']} reruns, "
+               f"mean {s['mean_s']:.1f}s)")
+
+
+def session_reruns(terminalreporter):
+    """Reruns per test in this session (from all pytest-xdist workers)."""
+    reruns = {}
+    for report in terminalreporter.stats.get('rerun', []):
+        reruns[report.nodeid] = reruns.get(report.nodeid, 0) + 1
+    return reruns
+
+
+def write_session_report(report_dir, db_path, window, reruns):
+    """
+    Write the flake-rate leaderboard and the session's reruns to flaky-tests.json.
+
+    Returns:
+        Path of the written file, or None when there is no history
+    """
+    stats = history(db_path, window)
+    if not stats:
+        return None
+    return write_json(report_dir, 'flaky-tests.json', {
+        'window_runs': window,
+        'leaderboard': [{'nodeid': nodeid, **s} for nodeid, s in leaderboard(stats, top=len(stats))],
+        'rerun_this_session': reruns,
+    })
+
+
+def summarize(terminalreporter, db_path, window):
+    """Print the flake-rate leaderboard and this session's reruns."""
+    stats = history(db_path, window)
+    lines = list(_leaderboard_lines(stats, LEADERBOARD_SIZE))
+    reruns = session_reruns(terminalreporter)
+    if not lines and not reruns:
+        return
+    terminalreporter.section('flaky tests')
+    for nodeid, count in reruns.items():
+        terminalreporter.write_line(f"🔁 {nodeid} rerun {count}x (flaky)")
+    for line in lines:
+        terminalreporter.write_line(line)
+
+
+def main():
+    from conftest import TestConfig
+
+    parser = argparse.ArgumentParser(description='Flake-rate leaderboard of the Selenium tests')
+    parser.add_argument('--db', default=TestConfig.FLAKY_DB, help='History database')
+    parser.add_argument('--window', type=int, default=TestConfig.FLAKY_WINDOW, help='Recent runs per test')
+    parser.add_argument('--top', type=int, default=LEADERBOARD_SIZE, help='Tests to show')
+    args = parser.parse_args()
+
+    stats = history(args.db, args.window)
+    lines = list(_leaderboard_lines(stats, args.top))
+    print(f"📊 {len(stats)} tests with history, {len(leaderboard(stats, len(stats)))} with flaky runs")
+    for line in lines:
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
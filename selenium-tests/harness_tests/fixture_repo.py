@@ -0,0 +1,134 @@
+"""
+A miniature StudyHub-IL checkout laid out like the real one (client/src,
+server/src, server/prisma, selenium-tests), for the harness tests that map
+changed files to tests.
+"""
+
+import textwrap
+import pytest
+import dependency_map
+
+
+CLIENT_FILES = {
+    'main.tsx': """
+        import { StrictMode } from "react";
+        import { AuthProvider } from "./context/AuthContext";
+        import App from "./App.tsx";
+        import "./index.css";
+    """,
+    'index.css': "body { direction: rtl; }",
+    'App.tsx': """
+        import { Routes, Route } from 'react-router-dom';
+        import { useAuth } from './context/AuthContext';
+        import { Header } from './components/layout/Header';
+        import { LoginPage } from './components/auth/LoginPage';
+        import { ForumPage } from './components/forum/ForumPage';
+        import { ForumPostDetailPage } from './components/forum/ForumPostDetailPage';
+        import { ToolsPage } from './components/tools/ToolsPage';
+
+        // Protected Route Component
+        function ProtectedRoute({ children }: { children: React.ReactNode }) {
+          const { isAuthenticated } = useAuth();
+          return isAuthenticated ? <>{children}</> : null;
+        }
+
+        export default function App() {
+          return (
+            <>
+            <Header />
+            <Routes>
+              <Route path="/login" element={<LoginPage />} />
+              <Route
+                path="/forum"
+                element={
+                  <ProtectedRoute>
+                    <ForumPage />
+                  </ProtectedRoute>
+                }
+              />
+              <Route path="/forum/:id" element={<ProtectedRoute><ForumPostDetailPage /></ProtectedRoute>} />
+              <Route path="/tools" element={<ProtectedRoute><ToolsPage /></ProtectedRoute>} />
+            </Routes>
+            </>
+          );
+        }
+    """,
+    'context/AuthContext.tsx': "export function useAuth() { return { isAuthenticated: true }; }",
+    'components/layout/Header.tsx': "export function Header() { return null; }",
+    'components/auth/LoginPage.tsx': "export function LoginPage() { return null; }",
+    'components/forum/ForumPage.tsx': """
+        import { PostCard } from './PostCard';
+        import { RatingStars } from '../shared/RatingStars';
+    """,
+    'components/forum/ForumPostDetailPage.tsx': "import { RatingStars } from '../shared/RatingStars';",
+    'components/forum/PostCard.tsx': "export function PostCard() { return null; }",
+    'components/tools/ToolsPage.tsx': "import { RatingStars } from '../shared/RatingStars';",
+    'components/shared/RatingStars.tsx': "export function RatingStars() { return null; }",
+}
+
+SERVER_FILES = {
+    'index.js': """
+        const express = require('express');
+        const prisma = require('./lib/prisma');
+
+        const forumRoutes = require('./routes/forum');
+        const toolsRoutes = require('./routes/tools');
+
+        const app = express();
+        app.use('/api/forum', forumRoutes);
+        app.use('/api/tools', toolsRoutes);
+    """,
+    'lib/prisma.js': "module.exports = {};",
+    'middleware/auth.js': "const prisma = require('../lib/prisma');",
+    'utils/urls.js': "module.exports = {};",
+    'routes/forum.js': """
+        const prisma = require('../lib/prisma');
+        const { authenticate } = require('../middleware/auth');
+    """,
+    'routes/tools.js': """
+        const prisma = require('../lib/prisma');
+        const { authenticate } = require('../middleware/auth');
+        const { normalizeUrl } = require('../utils/urls');
+    """,
+}
+
+HARNESS_FILES = {
+    'conftest.py': "import api_client\n",
+    'api_client.py': "import json\n",
+    'page_helpers.py': "import time\n",
+    'test_forum.py': "import page_helpers\n\n\ndef test_list():\n    pass\n\n\ndef test_detail():\n    pass\n",
+    'test_tools.py': "def test_rate():\n    pass\n",
+    'test_auth.py': "def test_login():\n    pass\n",
+}
+
+# Dependency map of the tests above, as DependencyRecorder records it
+DEPENDENCIES = {
+    'test_auth.py::test_login': {'routes': ['/login'], 'endpoints': ['POST /api/auth/login']},
+    'test_forum.py::test_list': {'routes': ['/forum'], 'endpoints': ['GET /api/forum']},
+    'test_forum.py::test_detail': {'routes': ['/forum', '/forum/:id'],
+                                   'endpoints': ['GET /api/forum', 'GET /api/forum/:id']},
+    'test_tools.py::test_rate': {'routes': ['/tools'], 'endpoints': ['GET /api/tools', 'POST /api/tools/:id/rate']},
+}
+
+
+def write_files(root, files):
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(textwrap.dedent(content).lstrip(), encoding='utf-8')
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """A miniature checkout that dependency_map works on instead of the real one."""
+    write_files(tmp_path / 'client' / 'src', CLIENT_FILES)
+    write_files(tmp_path / 'server' / 'src', SERVER_FILES)
+    write_files(tmp_path / 'server' / 'prisma', {'schema.prisma': 'model User {\n  id Int @id\n}\n'})
+    write_files(tmp_path / 'selenium-tests', HARNESS_FILES)
+    monkeypatch.setattr(dependency_map, 'REPO_ROOT', str(tmp_path))
+    monkeypatch.setattr(dependency_map, 'TESTS_DIR', str(tmp_path / 'selenium-tests'))
+    monkeypatch.setattr(dependency_map, 'CLIENT_SRC', str(tmp_path / 'client' / 'src'))
+    monkeypatch.setattr(dependency_map, 'SERVER_SRC', str(tmp_path / 'server' / 'src'))
+    monkeypatch.setattr(dependency_map, 'SERVER_INDEX', str(tmp_path / 'server' / 'src' / 'index.js'))
+    monkeypatch.setattr(dependency_map, 'CONFTEST', str(tmp_path / 'selenium-tests' / 'conftest.py'))
+    return tmp_path
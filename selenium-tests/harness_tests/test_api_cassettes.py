@@ -0,0 +1,80 @@
+"""
+Tests for api_cassettes: matching replayed requests to recorded responses.
+"""
+
+import json
+from api_cassettes import Cassette, request_key
+
+
+PROFILE_URL = 'http://localhost:3000/api/auth/profile'
+
+
+def profile_key(full_name):
+    return request_key('PUT', PROFILE_URL, json.dumps({'fullName': full_name}), 'application/json')
+
+
+def record(path, *interactions):
+    """Save a cassette with (key, body) interactions and load it for replay."""
+    cassette = Cassette(path)
+    for key, body in interactions:
+        cassette.add(key, 200, [['Content-Type', 'application/json']], body, False, 12.5)
+    cassette.save()
+    return Cassette.load(path)
+
+
+class TestCassetteReplay:
+
+    def test_01_exact_body_replays_its_response(self, tmp_path):
+        cassette = record(tmp_path / 'test.json',
+                          (profile_key('Test User 1'), '{"n": 1}'), (profile_key('Test User 2'), '{"n": 2}'))
+        assert cassette.next_response(profile_key('Test User 2'))['body'] == '{"n": 2}'
+        assert cassette.fallbacks == []
+
+    def test_02_different_body_replays_recording_for_same_request(self, tmp_path):
+        # Recorded with one time-based name, replayed with another
+        cassette = record(tmp_path / 'test.json', (profile_key('Test User 123'), '{"message": "updated"}'))
+        response = cassette.next_response(profile_key('Test User 456'))
+        assert response is not None
+        assert response['status'] == 200
+        assert response['body'] == '{"message": "updated"}'
+        assert cassette.fallbacks == [profile_key('Test User 456')]
+
+    def test_03_different_bodies_replay_in_recording_order(self, tmp_path):
+        cassette = record(tmp_path / 'test.json',
+                          (profile_key('First 1'), '{"n": 1}'),
+                          (request_key('GET', 'http://localhost:3000/api/auth/me'), '{"me": true}'),
+                          (profile_key('Second 2'), '{"n": 2}'))
+        assert cassette.next_response(profile_key('First 9'))['body'] == '{"n": 1}'
+        assert cassette.next_response(profile_key('Second 9'))['body'] == '{"n": 2}'
+        # The last response repeats
+        assert cassette.next_response(profile_key('Third 9'))['body'] == '{"n": 2}'
+
+    def test_04_other_request_is_still_missing(self, tmp_path):
+        cassette = record(tmp_path / 'test.json', (profile_key('Test User 1'), '{}'))
+        assert cassette.next_response(request_key('PATCH', PROFILE_URL, '{}', 'application/json')) is None
+        assert cassette.next_response(request_key('PUT', PROFILE_URL + '/avatar', '{}', 'application/json')) is None
+
+
+class TestCassetteRedaction:
+
+    def test_01_saved_cassette_has_no_credentials(self, tmp_path):
+        cassette = Cassette(tmp_path / 'test.json')
+        login = request_key('POST', 'http://localhost:3000/api/auth/login',
+                            json.dumps({'email': 'test@studyhub.local', 'password': 'Test123456!'}),
+                            'application/json')
+        body = json.dumps({'token': 'eyJhbGciOiJIUzI1NiJ9.secret', 'user': {'id': 1, 'fullName': 'Test User'}})
+        cassette.add(login, 200, [['Set-Cookie', 'session=abc'], ['Content-Type', 'application/json']],
+                     body, False, 5)
+        cassette.save()
+        saved = (tmp_path / 'test.json').read_text(encoding='utf-8')
+        for secret in ('Test123456!', 'eyJhbGciOiJIUzI1NiJ9', 'session=abc'):
+            assert secret not in saved
+        response = Cassette.load(tmp_path / 'test.json').next_response(login)
+        assert json.loads(response['body']) == {'token': '<redacted>', 'user': {'id': 1, 'fullName': 'Test User'}}
+        assert ['Content-Type', 'application/json'] in response['headers']
+
+    def test_02_login_key_does_not_depend_on_password(self):
+        def login(password):
+            return request_key('POST', 'http://localhost:3000/api/auth/login',
+                               json.dumps({'email': 'test@studyhub.local', 'password': password}), 'application/json')
+        assert login('one') == login('two')
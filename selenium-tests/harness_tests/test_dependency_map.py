@@ -0,0 +1,93 @@
+"""
+Tests for dependency_map: which tests watch mode selects for changed files.
+"""
+
+import copy
+from fixture_repo import DEPENDENCIES, repo  # noqa: F401 (fixture)
+from dependency_map import affected_tests, client_routes, route_pattern_matches, server_prefixes
+
+
+def affected(repo, *paths, dependencies=DEPENDENCIES):
+    return affected_tests([str(repo / path) for path in paths], copy.deepcopy(dependencies))
+
+
+class TestClientChanges:
+
+    def test_01_page_component_selects_the_tests_of_its_routes(self, repo):
+        routes, everything = client_routes({str(repo / 'client/src/components/forum/PostCard.tsx')})
+        assert (routes, everything) == ({'/forum'}, False)
+        assert affected(repo, 'client/src/components/forum/PostCard.tsx') == \
+            (['test_forum.py::test_detail', 'test_forum.py::test_list'], False)
+
+    def test_02_page_reached_through_a_parameterized_route(self, repo):
+        routes, _ = client_routes({str(repo / 'client/src/components/forum/ForumPostDetailPage.tsx')})
+        assert routes == {'/forum/:id'}
+        assert affected(repo, 'client/src/components/forum/ForumPostDetailPage.tsx') == \
+            (['test_forum.py::test_detail'], False)
+
+    def test_03_shared_component_selects_every_route_that_renders_it(self, repo):
+        routes, everything = client_routes({str(repo / 'client/src/components/shared/RatingStars.tsx')})
+        assert (routes, everything) == ({'/forum', '/forum/:id', '/tools'}, False)
+        assert affected(repo, 'client/src/components/shared/RatingStars.tsx') == \
+            (['test_forum.py::test_detail', 'test_forum.py::test_list', 'test_tools.py::test_rate'], False)
+
+    def test_04_main_tsx_and_what_it_wraps_select_everything(self, repo):
+        for path in ('client/src/main.tsx', 'client/src/App.tsx', 'client/src/context/AuthContext.tsx',
+                     'client/src/index.css'):
+            assert affected(repo, path) == ([], True), path
+
+    def test_05_app_shell_selects_everything(self, repo):
+        assert affected(repo, 'client/src/components/layout/Header.tsx') == ([], True)
+
+    def test_06_unused_file_selects_nothing(self, repo):
+        unused = repo / 'client/src/components/Unused.tsx'
+        unused.write_text("export const Unused = 1;", encoding='utf-8')
+        assert affected(repo, 'client/src/components/Unused.tsx') == ([], False)
+
+    def test_07_route_patterns(self):
+        assert route_pattern_matches('/forum/:id', '/forum/:id')
+        assert not route_pattern_matches('/forum/:id', '/forum')
+        assert not route_pattern_matches('/forum', '/forum/:id')
+        assert route_pattern_matches('*', '/anything')
+
+
+class TestServerChanges:
+
+    def test_01_route_module_selects_the_tests_calling_its_prefix(self, repo):
+        assert server_prefixes({str(repo / 'server/src/routes/tools.js')}) == ({'/api/tools'}, False)
+        assert affected(repo, 'server/src/routes/tools.js') == (['test_tools.py::test_rate'], False)
+
+    def test_02_module_one_route_requires(self, repo):
+        assert affected(repo, 'server/src/utils/urls.js') == (['test_tools.py::test_rate'], False)
+
+    def test_03_shared_middleware_selects_every_route_using_it(self, repo):
+        assert server_prefixes({str(repo / 'server/src/middleware/auth.js')}) == \
+            ({'/api/forum', '/api/tools'}, False)
+        assert affected(repo, 'server/src/middleware/auth.js') == \
+            (['test_forum.py::test_detail', 'test_forum.py::test_list', 'test_tools.py::test_rate'], False)
+
+    def test_04_prisma_client_and_index_select_everything(self, repo):
+        assert server_prefixes({str(repo / 'server/src/lib/prisma.js')})[1] is True
+        assert affected(repo, 'server/src/lib/prisma.js') == ([], True)
+        assert affected(repo, 'server/src/index.js') == ([], True)
+
+    def test_05_entry_without_network_capture_is_always_selected(self, repo):
+        dependencies = {**DEPENDENCIES, 'test_auth.py::test_login': {'routes': ['/login'], 'endpoints': None}}
+        assert affected(repo, 'server/src/routes/tools.js', dependencies=dependencies) == \
+            (['test_auth.py::test_login', 'test_tools.py::test_rate'], False)
+        # Client changes still go by its routes
+        assert affected(repo, 'client/src/components/tools/ToolsPage.tsx', dependencies=dependencies) == \
+            (['test_tools.py::test_rate'], False)
+
+
+class TestHarnessChanges:
+
+    def test_01_test_module_runs_completely(self, repo):
+        assert affected(repo, 'selenium-tests/test_tools.py') == (['test_tools.py'], False)
+
+    def test_02_helper_module_runs_the_modules_importing_it(self, repo):
+        assert affected(repo, 'selenium-tests/page_helpers.py') == (['test_forum.py'], False)
+
+    def test_03_conftest_and_what_it_imports_select_everything(self, repo):
+        assert affected(repo, 'selenium-tests/conftest.py') == ([], True)
+        assert affected(repo, 'selenium-tests/api_client.py') == ([], True)
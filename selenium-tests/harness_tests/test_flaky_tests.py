@@ -0,0 +1,198 @@
+"""
+Tests for flaky_tests: flake-rate maths over the SQLite history, and the
+rerun protocol in a real pytest session (pytester).
+"""
+
+import os
+import pytest
+import flaky_tests
+
+
+HARNESS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+NODEID = 'test_sample.py::test_sample'
+
+# Wires flaky_tests into the inner session the way conftest.py does
+INNER_CONFTEST = f"""
+import os
+import sys
+sys.path.insert(0, {HARNESS_DIR!r})
+import pytest
+import flaky_tests
+
+DB = os.environ['FLAKY_DB']
+
+
+@pytest.hookimpl(tryfirst=True, hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    flaky_tests.record(item, outcome.get_result())
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item, nextitem):
+    return flaky_tests.run_protocol(item, nextitem, int(os.environ['FLAKY_RERUNS']))
+
+
+def pytest_report_teststatus(report):
+    return flaky_tests.report_status(report)
+
+
+def pytest_sessionstart(session):
+    flaky_tests.load_flaky(DB, 30, 0.1, 3)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    flaky_tests.write_attempts(DB, flaky_tests.run_id(session.config))
+"""
+
+# Fails on its first attempt in every session, passes on the next ones
+FAILS_THEN_PASSES = """
+import itertools
+
+ATTEMPTS = itertools.count(1)
+
+
+def test_sample():
+    assert next(ATTEMPTS) > 1
+"""
+
+ALWAYS_FAILS = """
+def test_sample():
+    assert False, 'broken'
+"""
+
+INCONCLUSIVE = """
+def test_sample():
+    try:
+        raise TimeoutError('element not found')
+    except TimeoutError as e:
+        print(f"Test inconclusive: {e}")
+"""
+
+
+def seed(db_path, nodeid, runs):
+    """Store earlier runs of a test, each a list of attempt outcomes."""
+    conn = flaky_tests.connect(db_path)
+    with conn:
+        for index, outcomes in enumerate(runs):
+            run = f'seed-{index}'
+            conn.execute('INSERT OR IGNORE INTO runs (run_id, started) VALUES (?, ?)', (run, 1000 + index))
+            conn.executemany(
+                'INSERT INTO attempts (run_id, nodeid, attempt, outcome, duration, message, recorded) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(run, nodeid, attempt, outcome, 1.0, None, 1000 + index + attempt / 100)
+                 for attempt, outcome in enumerate(outcomes, 1)])
+    conn.close()
+
+
+def session_attempts(db_path, nodeid):
+    """(attempt, outcome) of the test in the sessions run after seeding."""
+    conn = flaky_tests.connect(db_path)
+    rows = conn.execute("SELECT attempt, outcome FROM attempts WHERE nodeid = ? AND run_id NOT LIKE 'seed-%' "
+                        "ORDER BY recorded, attempt", (nodeid,)).fetchall()
+    conn.close()
+    return rows
+
+
+class TestFlakeRate:
+
+    def test_01_attempts_that_disagree_are_flaky(self, tmp_path):
+        db = str(tmp_path / 'history.sqlite')
+        seed(db, NODEID, [['failed', 'passed'], ['passed'], ['passed'], ['passed']])
+        stats = flaky_tests.history(db, 30)[NODEID]
+        assert (stats['runs'], stats['flaky_runs'], stats['flake_rate']) == (4, 1, 0.25)
+        assert (stats['failed'], stats['reruns']) == (1, 1)
+
+    def test_02_consistent_failures_are_not_flaky(self, tmp_path):
+        db = str(tmp_path / 'history.sqlite')
+        seed(db, NODEID, [['passed'], ['failed'], ['failed'], ['failed', 'failed', 'failed']])
+        stats = flaky_tests.history(db, 30)
+        assert stats[NODEID]['flaky_runs'] == 0
+        assert stats[NODEID]['flake_rate'] == 0
+        assert flaky_tests.leaderboard(stats) == []
+
+    def test_03_inconclusive_run_is_flaky(self, tmp_path):
+        db = str(tmp_path / 'history.sqlite')
+        seed(db, NODEID, [['passed'], ['inconclusive'], ['passed'], ['passed']])
+        stats = flaky_tests.history(db, 30)[NODEID]
+        assert (stats['flaky_runs'], stats['inconclusive'], stats['flake_rate']) == (1, 1, 0.25)
+
+    def test_04_window_keeps_only_recent_runs(self, tmp_path):
+        db = str(tmp_path / 'history.sqlite')
+        seed(db, NODEID, [['failed', 'passed'], ['passed'], ['passed'], ['passed']])
+        assert flaky_tests.history(db, 3)[NODEID]['runs'] == 3
+        assert flaky_tests.history(db, 3)[NODEID]['flaky_runs'] == 0
+        assert flaky_tests.history(db, 4)[NODEID]['flaky_runs'] == 1
+
+    def test_05_min_runs_limit(self, tmp_path):
+        db = str(tmp_path / 'history.sqlite')
+        seed(db, NODEID, [['failed', 'passed'], ['failed', 'passed']])
+        assert flaky_tests.load_flaky(db, 30, 0.1, 3) == {}
+        seed(db, 'test_other.py::test_other', [['failed', 'passed'], ['passed'], ['passed']])
+        assert flaky_tests.load_flaky(db, 30, 0.1, 3) == {'test_other.py::test_other': 0.333}
+
+    def test_06_threshold_limit(self, tmp_path):
+        db = str(tmp_path / 'history.sqlite')
+        seed(db, NODEID, [['failed', 'passed']] + [['passed']] * 9)
+        assert flaky_tests.load_flaky(db, 30, 0.1, 3) == {NODEID: 0.1}
+        assert flaky_tests.load_flaky(db, 30, 0.11, 3) == {}
+
+    def test_07_no_history(self, tmp_path):
+        assert flaky_tests.history(str(tmp_path / 'missing.sqlite'), 30) == {}
+
+
+class TestRerunProtocol:
+
+    @pytest.fixture
+    def session(self, pytester, monkeypatch, tmp_path, capsys):
+        """Run a test module in a separate pytest session; returns (run, db path)."""
+        db = str(tmp_path / 'history.sqlite')
+        monkeypatch.setenv('FLAKY_DB', db)
+        monkeypatch.setenv('FLAKY_RERUNS', '2')
+        pytester.makeconftest(INNER_CONFTEST)
+
+        def run(source):
+            pytester.makepyfile(test_sample=source)
+            # A subprocess: flaky_tests keeps its session state in module globals
+            result = pytester.runpytest_subprocess('-p', 'no:cacheprovider')
+            # Keep the inner output (e.g. "inconclusive") out of this test's own history
+            capsys.readouterr()
+            return result
+        return run, db
+
+    def test_01_flaky_test_that_fails_then_passes_is_rerun(self, session):
+        run, db = session
+        seed(db, NODEID, [['failed', 'passed'], ['passed'], ['passed']])
+        outcomes = run(FAILS_THEN_PASSES).parseoutcomes()
+        assert (outcomes.get('passed'), outcomes.get('rerun'), outcomes.get('failed')) == (1, 1, None)
+        # execution_count numbers the attempts
+        assert session_attempts(db, NODEID) == [(1, 'failed'), (2, 'passed')]
+        stats = flaky_tests.history(db, 30)[NODEID]
+        assert (stats['runs'], stats['flaky_runs']) == (4, 2)
+
+    def test_02_flaky_test_that_keeps_failing_fails_after_reruns(self, session):
+        run, db = session
+        seed(db, NODEID, [['failed', 'passed'], ['passed'], ['passed']])
+        result = run(ALWAYS_FAILS)
+        outcomes = result.parseoutcomes()
+        assert (outcomes.get('failed'), outcomes.get('rerun')) == (1, 2)
+        assert session_attempts(db, NODEID) == [(1, 'failed'), (2, 'failed'), (3, 'failed')]
+        # A run whose attempts all fail is broken, not flaky
+        assert flaky_tests.history(db, 30)[NODEID]['flaky_runs'] == 1
+
+    def test_03_test_without_flaky_history_is_not_rerun(self, session):
+        run, db = session
+        seed(db, NODEID, [['passed'], ['passed'], ['passed']])
+        outcomes = run(FAILS_THEN_PASSES).parseoutcomes()
+        assert (outcomes.get('failed'), outcomes.get('rerun')) == (1, None)
+        assert session_attempts(db, NODEID) == [(1, 'failed')]
+        assert flaky_tests.history(db, 30)[NODEID]['flaky_runs'] == 0
+
+    def test_04_inconclusive_run_is_recorded(self, session):
+        run, db = session
+        outcomes = run(INCONCLUSIVE).parseoutcomes()
+        assert outcomes.get('passed') == 1
+        assert session_attempts(db, NODEID) == [(1, 'inconclusive')]
+        stats = flaky_tests.history(db, 30)[NODEID]
+        assert (stats['flaky_runs'], stats['last_message']) == (1, 'Test inconclusive: element not found')
@@ -0,0 +1,197 @@
+"""
+Tests for result_cache: what its keys depend on, and which outcomes it
+stores (pytester).
+"""
+
+import copy
+import json
+import os
+import types
+import pytest
+import build_server
+import result_cache
+from fixture_repo import DEPENDENCIES, repo  # noqa: F401 (fixture)
+from test_flaky_tests import FAILS_THEN_PASSES, HARNESS_DIR, NODEID, seed
+
+
+class Config:
+    BASE_URL = 'http://localhost:5173'
+    API_URL = 'http://localhost:5000/api'
+    STANDIN_API = False
+    STANDIN_SIZE = 'small'
+    CASSETTE_MODE = 'off'
+    SERVE_BUILD = False
+
+
+def edit(path):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n// edited\n')
+
+
+class TestKey:
+
+    @pytest.fixture
+    def key(self, repo, monkeypatch):  # noqa: F811
+        """Key of test_tools.py::test_rate, computed from the current files."""
+        monkeypatch.setattr(result_cache, 'source_hash',
+                            lambda: build_server.source_hash(client_dir=str(repo / 'client')))
+        monkeypatch.setattr(result_cache, 'PRISMA_SCHEMA', str(repo / 'server' / 'prisma' / 'schema.prisma'))
+
+        def key(nodeid='test_tools.py::test_rate', dependencies=DEPENDENCIES):
+            item = types.SimpleNamespace(nodeid=nodeid, fspath=repo / 'selenium-tests' / nodeid.split('::')[0])
+            return result_cache.KeyBuilder(copy.deepcopy(dependencies), Config).key(item)
+        return key
+
+    @pytest.mark.parametrize('path', [
+        'selenium-tests/test_tools.py',
+        'selenium-tests/conftest.py',
+        'selenium-tests/api_client.py',
+        'client/src/components/tools/ToolsPage.tsx',
+        'client/src/components/forum/PostCard.tsx',
+        'server/src/routes/tools.js',
+        'server/src/utils/urls.js',
+        'server/src/lib/prisma.js',
+        'server/prisma/schema.prisma',
+    ])
+    def test_01_key_changes_with_its_files(self, repo, key, path):  # noqa: F811
+        before = key()
+        edit(repo / path)
+        assert key() != before
+
+    @pytest.mark.parametrize('name', result_cache.CONFIG_KEYS)
+    def test_02_key_changes_with_settings(self, key, monkeypatch, name):
+        before = key()
+        monkeypatch.setattr(Config, name, 'changed')
+        assert key() != before
+
+    @pytest.mark.parametrize('path', [
+        'selenium-tests/test_forum.py',
+        'selenium-tests/page_helpers.py',
+        'server/src/routes/forum.js',
+    ])
+    def test_03_key_ignores_what_the_test_does_not_use(self, repo, key, path):  # noqa: F811
+        before = key()
+        edit(repo / path)
+        assert key() == before
+
+    def test_04_no_key_without_known_dependencies(self, key):
+        assert key('test_unknown.py::test_other') is None
+        dependencies = {**DEPENDENCIES, 'test_tools.py::test_rate': {'routes': ['/tools'], 'endpoints': None}}
+        assert key(dependencies=dependencies) is None
+
+
+# Wires result_cache (and flaky_tests' reruns) into the inner session the way
+# conftest.py does
+INNER_CONFTEST = f"""
+import os
+import sys
+sys.path.insert(0, {HARNESS_DIR!r})
+import pytest
+import flaky_tests
+import result_cache
+
+DB = os.environ['FLAKY_DB']
+CACHE = os.environ['RESULT_CACHE_FILE']
+
+
+class Config:
+    BASE_URL = API_URL = STANDIN_SIZE = CASSETTE_MODE = ''
+    STANDIN_API = SERVE_BUILD = False
+
+
+@pytest.hookimpl(tryfirst=True, hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    rep = outcome.get_result()
+    setattr(item, f"rep_{{rep.when}}", rep)
+    result_cache.record(item, rep)
+    flaky_tests.record(item, rep)
+
+
+def pytest_collection_modifyitems(config, items):
+    result_cache.apply(items, CACHE, os.environ['DEPENDENCY_MAP_FILE'], Config)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item, nextitem):
+    return flaky_tests.run_protocol(item, nextitem, 2)
+
+
+def pytest_report_teststatus(report):
+    return flaky_tests.report_status(report)
+
+
+def pytest_sessionstart(session):
+    flaky_tests.load_flaky(DB, 30, 0.1, 3)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    result_cache.write_results(CACHE)
+    flaky_tests.write_attempts(DB, flaky_tests.run_id(session.config))
+"""
+
+PASSES = """
+def test_sample():
+    pass
+"""
+
+FAILS = """
+def test_sample():
+    assert False, 'broken'
+"""
+
+
+class TestStoredOutcomes:
+
+    @pytest.fixture
+    def session(self, pytester, monkeypatch, tmp_path, capsys):
+        """Run a test module in a separate pytest session; returns (run, db path, cached node ids)."""
+        db = str(tmp_path / 'history.sqlite')
+        cache = tmp_path / 'result-cache.json'
+        dependencies = tmp_path / 'dependency-map.json'
+        dependencies.write_text(json.dumps({'tests': {NODEID: {
+            'routes': ['/tools'], 'endpoints': ['GET /api/tools'], 'recorded': 1000}}}), encoding='utf-8')
+        monkeypatch.setenv('FLAKY_DB', db)
+        monkeypatch.setenv('RESULT_CACHE_FILE', str(cache))
+        monkeypatch.setenv('DEPENDENCY_MAP_FILE', str(dependencies))
+        pytester.makeconftest(INNER_CONFTEST)
+
+        def run(source):
+            pytester.makepyfile(test_sample=source)
+            # A subprocess: result_cache keeps its session state in module globals
+            result = pytester.runpytest_subprocess('-p', 'no:cacheprovider', '-rs')
+            capsys.readouterr()
+            return result
+
+        def cached():
+            return set(result_cache.load_results(str(cache))) if os.path.exists(cache) else set()
+        return run, db, cached
+
+    def test_01_passing_test_is_cached(self, session):
+        run, _, cached = session
+        assert run(PASSES).parseoutcomes().get('passed') == 1
+        assert cached() == {NODEID}
+        result = run(PASSES)
+        assert result.parseoutcomes().get('skipped') == 1
+        result.stdout.fnmatch_lines([f'*{result_cache.CACHED_REASON}*'])
+
+    def test_02_failed_test_is_never_cached(self, session):
+        run, _, cached = session
+        assert run(FAILS).parseoutcomes().get('failed') == 1
+        assert cached() == set()
+        assert run(FAILS).parseoutcomes().get('failed') == 1
+
+    def test_03_test_passing_only_on_rerun_is_never_cached(self, session):
+        run, db, cached = session
+        seed(db, NODEID, [['failed', 'passed'], ['passed'], ['passed']])
+        outcomes = run(FAILS_THEN_PASSES).parseoutcomes()
+        assert (outcomes.get('passed'), outcomes.get('rerun')) == (1, 1)
+        assert cached() == set()
+
+    def test_04_cached_test_that_fails_loses_its_entry(self, session):
+        run, _, cached = session
+        run(PASSES)
+        assert cached() == {NODEID}
+        # Editing the module changes its key, so it runs again
+        assert run(FAILS).parseoutcomes().get('failed') == 1
+        assert cached() == set()
@@ -0,0 +1,509 @@
+"""
+HTTP Load Generator
+Replays the user journeys covered by the Selenium tests (login, dashboard,
+browsing and answering in the forum, rating summaries and tools, editing the
+profile) as HTTP scenarios against API_URL. Thousands of virtual users run
+concurrently on one asyncio event loop, each one pausing between steps like a
+student reading the page.
+
+Instead of the built-in journeys it can replay a workload recorded from a
+browser run (see workload.py), with every recorded test played by several
+virtual users at once.
+
+Virtual users sign in from a pool of accounts (see token_pool.py). Requests
+to rate-limited endpoints are sent as an account whose limiter window still
+has room, or held back when none has; 429 responses are counted separately
+from errors and kept out of the latency percentiles.
+
+Every request is labelled by endpoint (ids replaced by :id) and the report
+gives p50/p95/p99 latency, throughput and errors per endpoint. With
+--sample-resources it also records the CPU, memory and open files of the Node
+API and Postgres during the run (see process_sampler.py).
+
+Usage:
+    python loadgen.py --users 200 --duration 120
+    python loadgen.py --users 2000 --ramp-up 300 --duration 900 --think 5 --pool-size 200
+    python loadgen.py --users 50 --no-writes
+    python loadgen.py --workload perf-reports/workload.jsonl.gz --multiplier 20
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import time
+import aiohttp
+from conftest import TestConfig
+from perf_reports import percentile, write_json
+from process_sampler import ResourceSampler, format_summary
+from token_pool import TokenPool
+from workload import LOGIN_PATH, fill_placeholders, read_workload
+
+
+# Ids in request paths are reported as ":id" so requests group by endpoint
+ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+# Journeys are picked at random with these weights (roughly the mix of
+# page views in the e2e suite: mostly reading, some writing)
+JOURNEY_WEIGHTS = {
+    'dashboard': 20,
+    'browse_forum': 30,
+    'answer_forum': 10,
+    'rate_summary': 20,
+    'rate_tool': 15,
+    'edit_profile': 5,
+    'edit_own_content': 5,
+}
+
+# Journeys a virtual user runs before it signs out and a new one signs in
+SESSION_JOURNEYS = 10
+
+COMMENT_TEXTS = [
+    'תודה רבה, זה עזר לי מאוד!',
+    'גם אני נתקעתי בשאלה הזאת, מישהו מצא פתרון?',
+    'כדאי לבדוק את ההרצאה של שבוע 5, שם זה מוסבר.',
+]
+
+
+def endpoint_label(method, path):
+    """Group a request by method and path with ids and query removed."""
+    return f"{method} {ID_SEGMENT.sub('/:id', path.split('?')[0])}"
+
+
+def _round(value):
+    return round(value, 1) if value is not None else None
+
+
+class LoadStats:
+    """Latencies and outcomes per endpoint for one load run."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.statuses = {}
+        self.errors = {}
+        self.journeys = {}
+        self.skipped = {}
+        self.rate_limited = {}
+        self.deferred = {}
+        self.started = time.monotonic()
+
+    def record(self, label, status, latency_ms):
+        if status == 429:
+            # Rejected by a rate limiter - neither an error nor a served request
+            self.rate_limited[label] = self.rate_limited.get(label, 0) + 1
+            return
+        self.latencies.setdefault(label, []).append(latency_ms)
+        statuses = self.statuses.setdefault(label, {})
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == 'error' or status >= 400:
+            self.errors[label] = self.errors.get(label, 0) + 1
+
+    def record_deferred(self, label):
+        """A request held back because every account's limiter window was full."""
+        self.deferred[label] = self.deferred.get(label, 0) + 1
+
+    def record_skipped(self, label):
+        self.skipped[label] = self.skipped.get(label, 0) + 1
+
+    def record_journey(self, name):
+        self.journeys[name] = self.journeys.get(name, 0) + 1
+
+    def summary(self):
+        """
+        Per-endpoint latency percentiles and throughput.
+
+        Returns:
+            Dict with 'elapsed_s', 'requests', 'rps', 'errors', 'rate_limited',
+            'journeys' and 'endpoints'
+        """
+        elapsed = time.monotonic() - self.started
+        labels = set(self.latencies) | set(self.rate_limited) | set(self.deferred)
+        endpoints = []
+        for label in sorted(labels):
+            latencies = self.latencies.get(label, [])
+            endpoints.append({
+                'endpoint': label,
+                'requests': len(latencies),
+                'rps': round(len(latencies) / elapsed, 2),
+                'errors': self.errors.get(label, 0),
+                'rate_limited': self.rate_limited.get(label, 0),
+                'deferred': self.deferred.get(label, 0),
+                'statuses': {str(k): v for k, v in self.statuses.get(label, {}).items()},
+                'p50_ms': _round(percentile(latencies, 0.50)),
+                'p95_ms': _round(percentile(latencies, 0.95)),
+                'p99_ms': _round(percentile(latencies, 0.99)),
+                'max_ms': _round(max(latencies, default=None)),
+            })
+        total = sum(e['requests'] for e in endpoints)
+        return {
+            'elapsed_s': round(elapsed, 1),
+            'requests': total,
+            'rps': round(total / elapsed, 2) if elapsed else 0,
+            'errors': sum(e['errors'] for e in endpoints),
+            'rate_limited': sum(e['rate_limited'] for e in endpoints),
+            'deferred': sum(e['deferred'] for e in endpoints),
+            'journeys': self.journeys,
+            'skipped': self.skipped,
+            'endpoints': endpoints,
+        }
+
+
+class VirtualUser:
+    """
+    One simulated student. Signs in, runs journeys with think time between
+    steps, and signs in again as a new session after SESSION_JOURNEYS.
+    """
+
+    def __init__(self, session, member, pool, stats, think_seconds, writes, rng):
+        self.session = session
+        self.member = member
+        self.pool = pool
+        self.email, self.password = member.email, member.password
+        self.stats = stats
+        self.think_seconds = think_seconds
+        self.writes = writes
+        self.rng = rng
+        self.token = None
+
+    async def request(self, method, path, json=None, authenticated=True, as_member=None):
+        """
+        Send one API request and record its latency.
+
+        Args:
+            method: HTTP method
+            path: Path starting with /api
+            json: Optional JSON body
+            authenticated: Send the user's token (if signed in)
+            as_member: Send as another pool account instead of this user
+
+        Returns:
+            Decoded JSON body, or None on error or non-JSON response
+        """
+        token = as_member.token if as_member else self.token
+        headers = {'Authorization': f'Bearer {token}'} if token and authenticated else {}
+        label = endpoint_label(method, path)
+        started = time.perf_counter()
+        try:
+            async with self.session.request(method, f"{TestConfig.API_URL}{path}",
+                                            json=json, headers=headers) as response:
+                body = await response.read()
+                self.stats.record(label, response.status, (time.perf_counter() - started) * 1000)
+                self.pool.observe(as_member or self.member, method, path, response.status, response.headers)
+                if response.status >= 400 or 'json' not in response.content_type:
+                    return None
+                return await response.json(content_type=None) if body else None
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.stats.record(label, 'error', (time.perf_counter() - started) * 1000)
+            return None
+
+    async def think(self):
+        """Pause like a user reading the page (exponentially distributed)."""
+        if self.think_seconds:
+            await asyncio.sleep(min(self.rng.expovariate(1 / self.think_seconds), self.think_seconds * 5))
+
+    def pick(self, items):
+        return self.rng.choice(items) if items else None
+
+    async def login(self):
+        result = await self.request('POST', LOGIN_PATH, {'email': self.email, 'password': self.password})
+        self.token = result['token'] if result else None
+        if self.token:
+            await self.request('GET', '/api/auth/me')
+        return self.token is not None
+
+    # Journeys - each mirrors the API calls the client makes for the pages
+    # visited in the corresponding Selenium test
+
+    async def dashboard(self):
+        await asyncio.gather(
+            self.request('GET', '/api/stats'),
+            self.request('GET', '/api/summaries?limit=3'),
+            self.request('GET', '/api/forum?limit=3'),
+        )
+
+    async def browse_forum(self):
+        posts = await self.request('GET', '/api/forum')
+        await self.think()
+        post = self.pick(posts)
+        if post:
+            await asyncio.gather(
+                self.request('GET', f"/api/forum/{post['id']}"),
+                self.request('GET', f"/api/forum/{post['id']}/ratings"),
+            )
+        return post
+
+    async def answer_forum(self):
+        post = await self.browse_forum()
+        if not post or not self.writes:
+            return
+        await self.think()
+        await self.request('POST', f"/api/forum/{post['id']}/comments", {'text': self.pick(COMMENT_TEXTS)})
+        await self.request('POST', f"/api/forum/{post['id']}/ratings", {'rating': self.rng.randint(1, 5)})
+
+    async def rate_summary(self):
+        summaries, _, _ = await asyncio.gather(
+            self.request('GET', '/api/summaries'),
+            self.request('GET', '/api/courses/institutions'),
+            self.request('GET', '/api/courses'),
+        )
+        await self.think()
+        summary = self.pick(summaries)
+        if not summary:
+            return
+        await asyncio.gather(
+            self.request('GET', f"/api/summaries/{summary['id']}"),
+            self.request('GET', f"/api/summaries/{summary['id']}/ratings"),
+        )
+        if self.writes:
+            await self.think()
+            await self.request('POST', f"/api/summaries/{summary['id']}/rate", {'rating': self.rng.randint(1, 5)})
+
+    async def rate_tool(self):
+        tools = await self.request('GET', '/api/tools')
+        await self.think()
+        tool = self.pick(tools)
+        if not tool:
+            return
+        await self.request('GET', f"/api/tools/{tool['id']}/ratings")
+        if self.writes:
+            await self.think()
+            await self.request('POST', f"/api/tools/{tool['id']}/rate", {'rating': self.rng.randint(1, 5)})
+            await self.request('GET', f"/api/tools/{tool['id']}/ratings")
+
+    async def edit_profile(self):
+        await self.request('GET', '/api/courses/institutions')
+        if self.writes:
+            await self.think()
+            await self.request('PUT', '/api/auth/profile', {'bio': f"סטודנט/ית - עדכון {self.rng.randint(1, 10000)}"})
+
+    async def edit_own_content(self):
+        if not self.writes:
+            return
+        kind = self.rng.choice(['summaries', 'forum'])
+        # Edits count against a per-user limiter, so edit as whichever pool
+        # account still has budget (and only its own content)
+        member = self.pool.claim('PUT', f"/api/{kind}/:id")
+        if member is None:
+            self.stats.record_deferred(f"PUT /api/{kind}/:id")
+            return
+        own = await self.request('GET', '/api/summaries/my-content' if kind == 'summaries' else '/api/forum/my-posts',
+                                 as_member=member)
+        item = self.pick(own)
+        if not item:
+            return
+        await self.think()
+        if kind == 'summaries':
+            body = {'title': item['title'], 'courseId': item['courseId'],
+                    'description': f"עודכן {self.rng.randint(1, 10000)}"}
+        else:
+            body = {'title': item['title'], 'content': item['content'], 'category': item.get('category')}
+        await self.request('PUT', f"/api/{kind}/{item['id']}", body, as_member=member)
+
+    async def run(self, deadline):
+        """Run sessions of journeys until the deadline."""
+        names = list(JOURNEY_WEIGHTS)
+        weights = list(JOURNEY_WEIGHTS.values())
+        while time.monotonic() < deadline:
+            if not await self.login():
+                # Back off instead of hammering the login endpoint
+                await asyncio.sleep(max(1.0, self.think_seconds))
+                continue
+            for _ in range(SESSION_JOURNEYS):
+                if time.monotonic() >= deadline:
+                    return
+                await self.think()
+                name = self.rng.choices(names, weights)[0]
+                await getattr(self, name)()
+                self.stats.record_journey(name)
+            self.token = None
+
+
+class ReplayUser(VirtualUser):
+    """
+    Virtual user that replays one recorded session with its original timing
+    (divided by speed), signing in with its own account. Requests the client
+    sent in parallel are sent in parallel again; only a login is waited for,
+    since the requests after it need its token.
+    """
+
+    def __init__(self, session, member, pool, stats, recorded, speed, writes, rng):
+        super().__init__(session, member, pool, stats, 0, writes, rng)
+        self.recorded = recorded
+        self.speed = speed
+
+    async def replay(self):
+        started = time.monotonic()
+        pending = []
+        for entry in self.recorded['requests']:
+            delay = started + entry['t'] / 1000 / self.speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if 'k' in entry:
+                # Uploads and non-JSON bodies are not captured and cannot be replayed
+                self.stats.record_skipped(endpoint_label(entry['m'], entry['p']))
+                continue
+            if entry['m'] != 'GET' and not self.writes and entry['p'] != LOGIN_PATH:
+                continue
+
+            path = fill_placeholders(entry['p'], self.email, self.password)
+            body = fill_placeholders(entry.get('b'), self.email, self.password)
+            if entry['p'] == LOGIN_PATH:
+                result = await self.request(entry['m'], path, json=body, authenticated=False)
+                self.token = result['token'] if result else None
+                continue
+            if self.pool.claim(entry['m'], path, member=self.member) is None:
+                self.stats.record_deferred(endpoint_label(entry['m'], entry['p']))
+                continue
+            if entry['a'] and not self.token:
+                # The browser was already signed in when the recording started
+                await self.login()
+            pending.append(asyncio.ensure_future(
+                self.request(entry['m'], path, json=body, authenticated=entry['a'])
+            ))
+        await asyncio.gather(*pending)
+
+    async def run(self, deadline):
+        """Replay the session until the deadline, starting signed out each time."""
+        while time.monotonic() < deadline:
+            self.token = None
+            await self.replay()
+            self.stats.record_journey(self.recorded['test'])
+
+
+async def run_users(users, duration, ramp_up, connections, pool, pool_size, make_user):
+    """
+    Start virtual users (spread over the ramp-up) and wait for them to finish.
+
+    Args:
+        users: Number of virtual users
+        duration: Seconds at full load after the ramp-up
+        ramp_up: Seconds over which users are started
+        connections: Maximum open HTTP connections
+        pool: TokenPool to sign in before the users start
+        pool_size: Minimum number of pool accounts (extra ones are registered)
+        make_user: Callable (http_session, stats, index) -> virtual user
+
+    Returns:
+        LoadStats of the run
+    """
+    stats = LoadStats()
+    timeout = aiohttp.ClientTimeout(total=TestConfig.PAGE_LOAD_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=connections)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        if not await pool.sign_in(session, TestConfig.API_URL, size=pool_size):
+            raise SystemExit("❌ No pool account could sign in")
+        print(f"🔑 {len(pool.members)} accounts in the token pool")
+        deadline = time.monotonic() + ramp_up + duration
+        stats.started = time.monotonic()
+
+        async def start_user(index):
+            await asyncio.sleep(ramp_up * index / users)
+            await make_user(session, stats, index).run(deadline)
+
+        await asyncio.gather(*(start_user(i) for i in range(users)))
+    return stats
+
+
+async def run_load(users, duration, ramp_up, think_seconds, writes, accounts, pool_size, connections, seed):
+    """Run the built-in journeys with `users` virtual users."""
+    pool = TokenPool(accounts)
+
+    def make_user(session, stats, index):
+        return VirtualUser(session, pool.member(index), pool, stats,
+                           think_seconds, writes, random.Random(seed + index))
+
+    return await run_users(users, duration, ramp_up, connections, pool, pool_size, make_user)
+
+
+async def run_replay(sessions, multiplier, duration, ramp_up, speed, writes, accounts, pool_size, connections, seed):
+    """Replay every recorded session with `multiplier` concurrent virtual users."""
+    pool = TokenPool(accounts)
+
+    def make_user(session, stats, index):
+        return ReplayUser(session, pool.member(index), pool, stats,
+                          sessions[index % len(sessions)], speed, writes, random.Random(seed + index))
+
+    return await run_users(len(sessions) * multiplier, duration, ramp_up, connections, pool, pool_size, make_user)
+
+
+def parse_accounts(value):
+    """Parse 'email:password,email:password' (default: the test user)."""
+    if not value:
+        return [(TestConfig.TEST_EMAIL, TestConfig.TEST_PASSWORD)]
+    return [tuple(pair.split(':', 1)) for pair in value.split(',')]
+
+
+def print_summary(summary):
+    def ms(value):
+        return f"{value:>9.0f}" if value is not None else f"{'-':>9}"
+
+    print(f"\n{'endpoint':<42}{'reqs':>8}{'rps':>8}{'err':>6}{'429':>6}{'held':>6}"
+          f"{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for e in summary['endpoints']:
+        print(f"{e['endpoint']:<42}{e['requests']:>8}{e['rps']:>8.1f}{e['errors']:>6}"
+              f"{e['rate_limited']:>6}{e['deferred']:>6}"
+              f"{ms(e['p50_ms'])}{ms(e['p95_ms'])}{ms(e['p99_ms'])}{ms(e['max_ms'])}")
+    print(f"\nTotal: {summary['requests']} requests in {summary['elapsed_s']}s "
+          f"({summary['rps']} req/s), {summary['errors']} errors, "
+          f"{summary['rate_limited']} rate limited (429), {summary['deferred']} held back by the token pool")
+    print(f"Journeys: {summary['journeys']}")
+    if summary['skipped']:
+        print(f"Not replayable (uploads): {summary['skipped']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP load generator for the StudyHub-IL API')
+    parser.add_argument('--users', type=int, default=100, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds at full load (after ramp-up)')
+    parser.add_argument('--ramp-up', type=float, default=30, help='Seconds over which users are started')
+    parser.add_argument('--think', type=float, default=3, help='Mean think time between steps in seconds')
+    parser.add_argument('--no-writes', action='store_true', help='Skip comments, ratings and profile updates')
+    parser.add_argument('--accounts', default='',
+                        help='Comma-separated email:password pairs for the token pool (default: TEST_EMAIL)')
+    parser.add_argument('--pool-size', type=int, default=0,
+                        help='Register loadtest-<n>@studyhub.local accounts until the pool has this many')
+    parser.add_argument('--connections', type=int, default=1000, help='Maximum open HTTP connections')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for journey selection')
+    parser.add_argument('--workload', help='Replay a recorded workload file instead of the built-in journeys')
+    parser.add_argument('--multiplier', type=int, default=10,
+                        help='Concurrent virtual users per recorded session (with --workload)')
+    parser.add_argument('--speed', type=float, default=1,
+                        help='Replay speed factor; 2 halves the recorded gaps (with --workload)')
+    parser.add_argument('--sample-resources', action='store_true',
+                        help='Sample CPU, memory and open files of the Node API and Postgres during the run')
+    parser.add_argument('--out', default=TestConfig.PERF_REPORT_DIR, help='Output directory')
+    args = parser.parse_args()
+
+    accounts = parse_accounts(args.accounts)
+    sampler = ResourceSampler(interval=TestConfig.RESOURCE_SAMPLE_INTERVAL) if args.sample_resources else None
+    if sampler:
+        sampler.start()
+    if args.workload:
+        sessions = read_workload(args.workload)
+        print(f"🚀 Replaying {len(sessions)} recorded sessions x{args.multiplier} against "
+              f"{TestConfig.API_URL} (ramp-up {args.ramp_up}s, duration {args.duration}s, speed {args.speed}x)")
+        stats = asyncio.run(run_replay(
+            sessions, args.multiplier, args.duration, args.ramp_up, args.speed, not args.no_writes,
+            accounts, args.pool_size, args.connections, args.seed,
+        ))
+    else:
+        print(f"🚀 {args.users} users against {TestConfig.API_URL} "
+              f"(ramp-up {args.ramp_up}s, duration {args.duration}s, think {args.think}s)")
+        stats = asyncio.run(run_load(
+            args.users, args.duration, args.ramp_up, args.think, not args.no_writes,
+            accounts, args.pool_size, args.connections, args.seed,
+        ))
+    summary = stats.summary()
+    summary['config'] = {key: value for key, value in vars(args).items() if key != 'accounts'}
+    print_summary(summary)
+    if sampler:
+        sampler.stop()
+        summary['resources'] = sampler.report()
+        print()
+        for line in format_summary(summary['resources']['summary']):
+            print(line)
+    print(f"Results saved: {write_json(args.out, 'loadgen.json', summary)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Local Stack Launcher
+Brings up the whole application for a test session instead of relying on
+manually started dev servers:
+
+1. Postgres - reused when something listens on the DATABASE_URL port,
+   otherwise started as a Docker container
+2. Prisma migrations (`migrate deploy`, then `db push` for the tool ratings
+   tables that only exist in schema.prisma) and `prisma/seed.js` - with
+   snapshots enabled they run once into a template database, and the API
+   runs against a harness-owned clone of it (see db_snapshots.py)
+3. The Node API (`node src/index.js`), polled on /api/health
+4. A production build of the client (cached by source hash) served by
+   build_server.BuildServer on the BASE_URL port
+
+The API and the client are reused as well when they already answer, so the
+launcher is cheap when the stack is up. Every step is timed; processes and
+containers it started are stopped again at the end of the session.
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlsplit
+from api_client import ApiClient, ApiError
+from build_server import BuildServer, ensure_build
+from db_snapshots import DatabaseSnapshots
+from perf_reports import write_json
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_DIR = os.path.join(REPO_ROOT, 'server')
+CLIENT_DIR = os.path.join(REPO_ROOT, 'client')
+
+POSTGRES_IMAGE = 'postgres:16-alpine'
+POSTGRES_CONTAINER = 'studyhub-e2e-db'
+
+
+def port_open(host, port, timeout=0.5):
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def http_ok(url, timeout=2):
+    """True when the URL answers with a status below 500."""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout):
+            return True
+    except urllib.error.HTTPError as e:
+        return e.code < 500
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def wait_until(check, timeout, what, process=None):
+    """
+    Poll `check` until it returns True.
+
+    Args:
+        check: Callable without arguments
+        timeout: Seconds to wait
+        what: Description for the error message
+        process: Optional Popen that must not exit while waiting
+
+    Raises:
+        RuntimeError: When the timeout passes or the process exits
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if check():
+            return
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"{what} exited with status {process.returncode}")
+        time.sleep(0.25)
+    raise RuntimeError(f"{what} did not come up within {timeout}s")
+
+
+def npx():
+    return shutil.which('npx') or 'npx'
+
+
+class LocalStack:
+    """
+    Starts (or reuses) Postgres, the API and the production client.
+
+    Usage:
+        stack = LocalStack(TestConfig.BASE_URL, TestConfig.API_URL, TestConfig.DATABASE_URL, log_dir)
+        stack.start()
+        ...
+        stack.stop()
+    """
+
+    def __init__(self, base_url, api_url, database_url, log_dir, timeout=120, test_user=None, snapshots=False):
+        """
+        Args:
+            base_url: Frontend URL; its port is used for the build server
+            api_url: API URL; its port is passed to the server as PORT
+            database_url: PostgreSQL URL for the API and Prisma
+            log_dir: Directory for the process logs (stack/*.log)
+            timeout: Seconds to wait for each service to come up
+            test_user: Optional (email, password) that must be able to sign in
+            snapshots: Build a template database once and run the API
+                against a clone of it (reset_database() before each test)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.api_url = api_url.rstrip('/')
+        self.database_url = database_url
+        self.log_dir = os.path.join(log_dir, 'stack')
+        self.timeout = timeout
+        self.test_user = test_user
+        self.snapshots = DatabaseSnapshots(database_url) if snapshots else None
+        self.timings = {}
+        self.reused = []
+        self._processes = []
+        self._container = None
+        self._build_dir = None
+        self._client_server = None
+
+    def start(self):
+        """Bring up every part of the stack, timing each step."""
+        os.makedirs(self.log_dir, exist_ok=True)
+        started = time.monotonic()
+        self._step('postgres', self._start_postgres)
+        self._step('install', self._install_dependencies)
+        if self.snapshots and http_ok(f"{self.api_url}/api/health"):
+            # A running API keeps its own database; restoring a clone would not reset it
+            print(f"⚠️ API already running on {self.api_url} - DB_SNAPSHOTS has no effect on it, "
+                  f"the database is not reset between tests")
+            self.snapshots.close()
+            self.snapshots = None
+        if self.snapshots:
+            self._step('template', self._prepare_template)
+            self._step('restore', self.snapshots.restore)
+        else:
+            self._step('migrate', self._migrate)
+            self._step('seed', self._seed)
+        self._step('api', self._start_api)
+        if self.test_user and not self.snapshots:
+            self.ensure_user(*self.test_user)
+        self._step('build', self._build_client)
+        self._step('client', self._start_client)
+        self.timings['total'] = round(time.monotonic() - started, 2)
+        return self
+
+    def _step(self, name, action):
+        started = time.monotonic()
+        action()
+        self.timings[name] = round(time.monotonic() - started, 2)
+
+    def _server_env(self, database_url=None):
+        env = dict(os.environ)
+        env.update({
+            'DATABASE_URL': database_url or self.database_url,
+            'PORT': str(urlsplit(self.api_url).port or 4000),
+            'CLIENT_URL': self.base_url,
+            'NODE_ENV': 'test',
+        })
+        return env
+
+    def _run(self, name, command, cwd, env=None):
+        """Run a setup command to completion, logging its output."""
+        with open(os.path.join(self.log_dir, f'{name}.log'), 'ab') as log:
+            result = subprocess.run(command, cwd=cwd, env=env or self._server_env(),
+                                    stdout=log, stderr=subprocess.STDOUT)
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(command)} failed - see {self.log_dir}/{name}.log")
+
+    def _spawn(self, name, command, cwd, env):
+        """Start a long-running service, logging its output."""
+        log = open(os.path.join(self.log_dir, f'{name}.log'), 'ab')
+        process = subprocess.Popen(command, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+        self._processes.append((name, process, log))
+        return process
+
+    def _start_postgres(self):
+        database = urlsplit(self.database_url)
+        host, port = database.hostname or 'localhost', database.port or 5432
+        if port_open(host, port):
+            self.reused.append('postgres')
+            return
+        if not shutil.which('docker'):
+            raise RuntimeError(f"No Postgres on {host}:{port} and docker is not available to start one")
+        subprocess.run(['docker', 'rm', '-f', POSTGRES_CONTAINER], capture_output=True)
+        self._run('postgres', [
+            'docker', 'run', '-d', '--rm', '--name', POSTGRES_CONTAINER,
+            '-e', f'POSTGRES_USER={database.username or "postgres"}',
+            '-e', f'POSTGRES_PASSWORD={database.password or "postgres"}',
+            '-e', f'POSTGRES_DB={database.path.lstrip("/") or "postgres"}',
+            '-p', f'{port}:5432', POSTGRES_IMAGE,
+        ], REPO_ROOT, env=dict(os.environ))
+        self._container = POSTGRES_CONTAINER
+        wait_until(self._postgres_ready, self.timeout, 'Postgres')
+
+    def _postgres_ready(self):
+        # The port opens before initdb has finished; pg_isready checks the server itself
+        result = subprocess.run(['docker', 'exec', POSTGRES_CONTAINER, 'pg_isready', '-U',
+                                 urlsplit(self.database_url).username or 'postgres'], capture_output=True)
+        return result.returncode == 0
+
+    def _install_dependencies(self):
+        for directory in (SERVER_DIR, CLIENT_DIR):
+            if not os.path.isdir(os.path.join(directory, 'node_modules')):
+                self._run('install', [shutil.which('npm') or 'npm', 'ci'], directory)
+
+    def _migrate(self, env=None):
+        self._run('migrate', [npx(), 'prisma', 'migrate', 'deploy'], SERVER_DIR, env)
+        # tool_ratings is only defined in schema.prisma (migrations/add_tool_ratings.sql is not a migration)
+        self._run('migrate', [npx(), 'prisma', 'db', 'push', '--skip-generate'], SERVER_DIR, env)
+
+    def _seed(self, env=None):
+        self._run('seed', ['node', 'prisma/seed.js'], SERVER_DIR, env)
+
+    def _prepare_template(self):
+        """Migrate and seed the template database unless it matches the current schema."""
+        if self.snapshots.template_is_current():
+            self.reused.append('template')
+            return
+        env = self._server_env(self.snapshots.create_template())
+        self._migrate(env)
+        self._seed(env)
+        if self.test_user:
+            email, password = self.test_user
+            self.snapshots.add_user(email, self._hash_password(password), 'Selenium Test User')
+        self.snapshots.finish_template()
+
+    def _hash_password(self, password):
+        """bcrypt hash made with the server's own bcrypt module."""
+        result = subprocess.run(
+            ['node', '-e', "process.stdout.write(require('bcrypt').hashSync(process.argv[1], 10))", password],
+            cwd=SERVER_DIR, capture_output=True, text=True, check=True,
+        )
+        return result.stdout
+
+    def reset_database(self):
+        """
+        Restore the API's clone database from the template and wait until
+        the API has reconnected (the restore closes its pooled connections).
+
+        Returns:
+            Milliseconds the restore took
+        """
+        elapsed = self.snapshots.restore()
+        wait_until(lambda: http_ok(f"{self.api_url}/api/courses"), self.timeout, 'API database connection')
+        return elapsed
+
+    def _start_api(self):
+        health = f"{self.api_url}/api/health"
+        if http_ok(health):
+            self.reused.append('api')
+            return
+        env = self._server_env(self.snapshots.clone_url if self.snapshots else None)
+        process = self._spawn('api', ['node', 'src/index.js'], SERVER_DIR, env)
+        wait_until(lambda: http_ok(health), self.timeout, 'API', process)
+
+    def _build_client(self):
+        self._build_dir, built = ensure_build(log_path=os.path.join(self.log_dir, 'build.log'))
+        if not built:
+            self.reused.append('build')
+
+    def _start_client(self):
+        if http_ok(self.base_url):
+            self.reused.append('client')
+            return
+        base = urlsplit(self.base_url)
+        self._client_server = BuildServer(self._build_dir, self.api_url, host=base.hostname, port=base.port or 80)
+        self._client_server.start()
+
+    def ensure_user(self, email, password, full_name='Selenium Test User'):
+        """Register the test user unless it can already sign in."""
+        api = ApiClient(self.api_url)
+        try:
+            api.login(email, password)
+        except ApiError:
+            api.post('/api/auth/register', {'fullName': full_name, 'email': email, 'password': password})
+
+    def stop(self):
+        """Stop the services this stack started (reused ones keep running)."""
+        for _, process, log in reversed(self._processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            log.close()
+        self._processes = []
+        if self._client_server:
+            self._client_server.stop()
+            self._client_server = None
+        if self.snapshots:
+            if self.snapshots.restore_times_ms:
+                # After the API has stopped, so no connection holds the clone
+                self.snapshots.drop_clone()
+            self.snapshots.close()
+        if self._container:
+            subprocess.run(['docker', 'stop', self._container], capture_output=True)
+            self._container = None
+
+    def report(self):
+        report = {'timings_s': self.timings, 'reused': self.reused}
+        if self.snapshots:
+            report['snapshots'] = self.snapshots.report()
+        return report
+
+    def write_report(self, report_dir):
+        return write_json(report_dir, 'stack.json', self.report())
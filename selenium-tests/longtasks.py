@@ -0,0 +1,244 @@
+"""
+Main-Thread Long Task Detector
+Records browser long tasks (>50ms) and attributes each one to the Selenium
+action that preceded it, so UI jank is reported per user interaction.
+"""
+
+import bisect
+import json
+import time
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webelement import WebElement
+from driver_hooks import USER_ACTION_COMMANDS, add_command_listener
+from perf_reports import write_json
+
+
+# Anything above this is a long task; the excess counts as blocking time
+LONG_TASK_THRESHOLD_MS = 50
+
+# Number of interactions listed per test in the report
+WORST_INTERACTIONS = 5
+
+# Installed before any page script runs. Task start times are stored as epoch
+# milliseconds so they can be matched with actions across page loads.
+LONG_TASK_OBSERVER_JS = r"""
+(function () {
+  if (window.__studyhubLongTasks) return;
+  var state = { tasks: [], supported: true };
+  state.drain = function () {
+    var tasks = state.tasks;
+    state.tasks = [];
+    return tasks;
+  };
+  window.__studyhubLongTasks = state;
+  try {
+    new PerformanceObserver(function (list) {
+      list.getEntries().forEach(function (entry) {
+        state.tasks.push({
+          start: performance.timeOrigin + entry.startTime,
+          duration: entry.duration,
+          path: location.pathname
+        });
+      });
+    }).observe({ type: 'longtask', buffered: true });
+  } catch (e) {
+    state.supported = false;
+  }
+})();
+"""
+
+DRAIN_LONG_TASKS_JS = """
+return window.__studyhubLongTasks ? window.__studyhubLongTasks.drain() : [];
+"""
+
+# Describes an element by the nearest named React components that render it
+# (e.g. "QuestionCard < ForumPage") plus a short DOM description.
+DESCRIBE_ELEMENT_JS = r"""
+var el = arguments[0];
+var components = [];
+for (var node = el; node && components.length === 0; node = node.parentElement) {
+  var key = Object.keys(node).find(function (k) { return k.indexOf('__reactFiber$') === 0; });
+  if (!key) continue;
+  for (var fiber = node[key]; fiber && components.length < 3; fiber = fiber['return']) {
+    var type = fiber.type;
+    if (!type || typeof type === 'string') continue;
+    var name = type.displayName || type.name ||
+               (type.render && (type.render.displayName || type.render.name)) ||
+               (type.type && (type.type.displayName || type.type.name));
+    if (name && components.indexOf(name) === -1) components.push(name);
+  }
+}
+var dom = el.tagName.toLowerCase();
+['id', 'name', 'placeholder', 'aria-label'].forEach(function (attr) {
+  var value = el.getAttribute(attr);
+  if (value) dom += '[' + attr + '="' + value + '"]';
+});
+var text = (el.innerText || el.value || '').trim().replace(/\s+/g, ' ').slice(0, 40);
+if (text) dom += ' "' + text + '"';
+return components.length ? components.join(' < ') + ' ' + dom : dom;
+"""
+
+
+class LongTaskMonitor:
+    """
+    Collects long tasks for a single browser session.
+
+    Attach it right after the driver is created; every user action sent
+    through WebDriver is recorded, and long tasks that start after an action
+    (and before the next one) are attributed to it.
+    """
+
+    def __init__(self, budget_ms=0):
+        self.budget_ms = budget_ms
+        self.actions = []
+        self.tasks = []
+
+    def attach(self, driver):
+        """
+        Install the in-page observer and start listening to WebDriver commands.
+
+        Args:
+            driver: Chrome WebDriver instance
+        """
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+            'source': LONG_TASK_OBSERVER_JS
+        })
+        add_command_listener(driver, self)
+
+    def before_command(self, driver, command, params):
+        action = USER_ACTION_COMMANDS.get(command)
+        if action is None:
+            return
+
+        # Collect what the current page has recorded before it may go away
+        self._drain(driver)
+        self.actions.append({
+            'action': action,
+            'target': self._describe_target(driver, command, params),
+            'at': time.time() * 1000,
+        })
+
+    def _describe_target(self, driver, command, params):
+        if command == 'get':
+            return params.get('url', '')
+        if 'id' in params:
+            try:
+                return driver.execute_script(DESCRIBE_ELEMENT_JS, WebElement(driver, params['id']))
+            except WebDriverException:
+                return 'element'
+        return driver.current_url
+
+    def _drain(self, driver):
+        try:
+            self.tasks.extend(driver.execute_script(DRAIN_LONG_TASKS_JS) or [])
+        except WebDriverException:
+            # Page is navigating or the window is gone - nothing to collect
+            pass
+
+    def interactions(self):
+        """
+        Group the recorded long tasks by the action that triggered them.
+
+        Returns:
+            List of interaction dicts sorted by total blocking time, worst first
+        """
+        rows = [
+            {'action': a['action'], 'target': a['target'], 'tasks': 0,
+             'total_ms': 0.0, 'blocking_ms': 0.0, 'longest_ms': 0.0}
+            for a in self.actions
+        ]
+        before_first = {'action': 'initial', 'target': 'before first action', 'tasks': 0,
+                        'total_ms': 0.0, 'blocking_ms': 0.0, 'longest_ms': 0.0}
+        starts = [a['at'] for a in self.actions]
+
+        for task in self.tasks:
+            index = bisect.bisect_right(starts, task['start']) - 1
+            row = rows[index] if index >= 0 else before_first
+            row['tasks'] += 1
+            row['total_ms'] += task['duration']
+            row['blocking_ms'] += max(0.0, task['duration'] - LONG_TASK_THRESHOLD_MS)
+            row['longest_ms'] = max(row['longest_ms'], task['duration'])
+
+        rows.append(before_first)
+        worst = [row for row in rows if row['tasks']]
+        worst.sort(key=lambda row: row['blocking_ms'], reverse=True)
+        return worst
+
+    def finish(self, driver, item):
+        """
+        Collect the remaining tasks and record the result for a test.
+
+        Args:
+            driver: WebDriver instance (still open)
+            item: pytest item the browser belonged to
+
+        Returns:
+            Failure message when the budget was exceeded, otherwise None
+        """
+        self._drain(driver)
+        interactions = self.interactions()
+        report = {
+            'test': item.nodeid,
+            'long_tasks': len(self.tasks),
+            'total_blocking_ms': round(sum(i['blocking_ms'] for i in interactions), 1),
+            'worst_interactions': [
+                {key: round(value, 1) if isinstance(value, float) else value
+                 for key, value in row.items()}
+                for row in interactions[:WORST_INTERACTIONS]
+            ],
+        }
+        item.user_properties.append(('long_tasks', json.dumps(report, ensure_ascii=False)))
+        SESSION_REPORTS.append(report)
+        return self.budget_violation(report)
+
+    def budget_violation(self, report):
+        """
+        Check the worst interaction against the configured budget.
+
+        Returns:
+            Failure message, or None when within budget (or no budget set)
+        """
+        if not self.budget_ms or not report['worst_interactions']:
+            return None
+        worst = report['worst_interactions'][0]
+        if worst['blocking_ms'] <= self.budget_ms:
+            return None
+        return (f"Long-task budget exceeded: {worst['action']} {worst['target']} "
+                f"blocked the main thread for {worst['blocking_ms']}ms "
+                f"(budget {self.budget_ms}ms)")
+
+
+# Reports for every test in the current pytest session
+SESSION_REPORTS = []
+
+
+def write_session_report(report_dir):
+    """
+    Write all long-task reports of the session to a JSON file.
+
+    Args:
+        report_dir: Directory for performance reports
+
+    Returns:
+        Path of the written file, or None when nothing was recorded
+    """
+    if not SESSION_REPORTS:
+        return None
+    return write_json(report_dir, 'longtasks.json', SESSION_REPORTS)
+
+
+def summarize(terminalreporter):
+    """Print the worst interactions of each test to the pytest terminal."""
+    if not SESSION_REPORTS:
+        return
+    terminalreporter.section('main-thread long tasks')
+    for report in sorted(SESSION_REPORTS, key=lambda r: r['total_blocking_ms'], reverse=True):
+        terminalreporter.write_line(
+            f"{report['test']}: {report['long_tasks']} long tasks, "
+            f"{report['total_blocking_ms']}ms blocking"
+        )
+        for row in report['worst_interactions']:
+            terminalreporter.write_line(
+                f"    {row['blocking_ms']:>8}ms  {row['action']:<8} {row['target']} "
+                f"({row['tasks']} tasks, longest {row['longest_ms']}ms)"
+            )
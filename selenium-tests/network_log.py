@@ -0,0 +1,183 @@
+"""
+Browser Network Log
+Turns Chrome's performance log (DevTools Network events) into one record per
+request, so harness instruments and benchmarks can inspect what the page
+fetched, from where, and with what result.
+
+The driver must be created with network capture enabled
+(create_driver(capture_network=True)).
+"""
+
+import json
+import time
+
+
+def new_request_record(request_id, params):
+    """Build the record for a Network.requestWillBeSent event."""
+    request = params['request']
+    return {
+        'request_id': request_id,
+        'url': request['url'],
+        'method': request['method'],
+        'resource_type': params.get('type'),
+        'post_data': request.get('postData'),
+        'request_headers': request.get('headers', {}),
+        'wall_time': params.get('wallTime'),
+        'started': params.get('timestamp'),
+        'finished': None,
+        'status': None,
+        'mime_type': None,
+        'response_headers': {},
+        'from_memory_cache': False,
+        'from_disk_cache': False,
+        'from_service_worker': False,
+        'encoded_bytes': 0,
+        'failed': False,
+        'error_text': None,
+        'blocked_reason': None,
+    }
+
+
+def duration_ms(record):
+    """Time from request start to the end of loading, or None if unfinished."""
+    if record['started'] is None or record['finished'] is None:
+        return None
+    return (record['finished'] - record['started']) * 1000
+
+
+def is_api_request(record):
+    """Whether a request went to the backend (directly or through the dev proxy)."""
+    return '/api/' in record['url']
+
+
+def header(record, name):
+    """Case-insensitive lookup of a response header."""
+    name = name.lower()
+    for key, value in record['response_headers'].items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+class NetworkLog:
+    """
+    Accumulates network requests for one browser session.
+
+    Chrome hands out each performance log entry only once, so every consumer
+    of a driver shares the same NetworkLog (see get_network_log) and keeps a
+    cursor into `records` instead of reading the log itself.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.records = []
+        self._by_id = {}
+        self.last_activity = time.time()
+
+    def refresh(self):
+        """
+        Read new performance log entries into the request records.
+
+        Returns:
+            Number of network events processed
+        """
+        events = 0
+        for entry in self.driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            method = message.get('method', '')
+            if not method.startswith('Network.'):
+                continue
+            events += 1
+            self._handle(method, message.get('params', {}))
+        if events:
+            self.last_activity = time.time()
+        return events
+
+    def _handle(self, method, params):
+        request_id = params.get('requestId')
+        record = self._by_id.get(request_id)
+
+        if method == 'Network.requestWillBeSent':
+            if record and params.get('redirectResponse'):
+                # A redirect ends the previous hop; the next hop gets its own record
+                self._apply_response(record, params['redirectResponse'])
+                record['finished'] = params.get('timestamp')
+            record = new_request_record(request_id, params)
+            self._by_id[request_id] = record
+            self.records.append(record)
+        elif record is None:
+            return
+        elif method == 'Network.requestServedFromCache':
+            record['from_memory_cache'] = True
+        elif method == 'Network.responseReceived':
+            self._apply_response(record, params['response'])
+        elif method == 'Network.loadingFinished':
+            record['encoded_bytes'] = params.get('encodedDataLength', record['encoded_bytes'])
+            record['finished'] = params.get('timestamp')
+        elif method == 'Network.loadingFailed':
+            record['failed'] = True
+            record['error_text'] = params.get('errorText')
+            record['blocked_reason'] = params.get('blockedReason')
+            record['finished'] = params.get('timestamp')
+
+    @staticmethod
+    def _apply_response(record, response):
+        record['status'] = response.get('status')
+        record['mime_type'] = response.get('mimeType')
+        record['response_headers'] = response.get('headers', {})
+        record['from_disk_cache'] = response.get('fromDiskCache', False)
+        record['from_service_worker'] = response.get('fromServiceWorker', False)
+        record['encoded_bytes'] = response.get('encodedDataLength', 0)
+
+    def mark(self):
+        """
+        Cursor for the requests seen so far.
+
+        Returns:
+            Index to pass to since()
+        """
+        self.refresh()
+        return len(self.records)
+
+    def since(self, cursor):
+        """
+        Requests started after a cursor returned by mark().
+
+        Returns:
+            List of request records
+        """
+        self.refresh()
+        return self.records[cursor:]
+
+    def wait_for_idle(self, quiet_seconds=0.5, timeout=30):
+        """
+        Wait until no network events arrive for quiet_seconds.
+
+        Returns:
+            True when the network went idle, False on timeout
+        """
+        deadline = time.time() + timeout
+        self.refresh()
+        while time.time() < deadline:
+            time.sleep(0.1)
+            self.refresh()
+            if time.time() - self.last_activity >= quiet_seconds:
+                return True
+        return False
+
+
+def get_network_log(driver):
+    """
+    Return the NetworkLog shared by everything that inspects this driver.
+
+    Args:
+        driver: WebDriver created with network capture enabled
+
+    Returns:
+        NetworkLog instance
+    """
+    log = getattr(driver, '_network_log', None)
+    if log is None:
+        log = NetworkLog(driver)
+        driver._network_log = log
+    return log
@@ -0,0 +1,226 @@
+"""
+Page Error Collector
+Collects what went wrong inside the browser during a test - console errors,
+uncaught exceptions, unhandled promise rejections and failed API calls - and
+reports it only when a test crosses the configured threshold.
+
+Everything is read from the Chrome logs once, at the end of the test, so a
+clean run costs no extra browser round trips and writes no files.
+"""
+
+import json
+import os
+import re
+import time
+from selenium.common.exceptions import WebDriverException
+from driver_hooks import USER_ACTION_COMMANDS, add_command_listener
+from network_log import get_network_log, is_api_request
+from perf_reports import write_json
+
+
+# Browser log sources that are reported from the network log instead
+NETWORK_LOG_SOURCES = {'network'}
+
+# Requests cancelled by the browser itself (navigation, aborted fetch) are not errors
+IGNORED_NETWORK_ERRORS = {'net::ERR_ABORTED'}
+
+# Per-test reports are written under PERF_REPORT_DIR in this directory
+REPORT_SUBDIR = 'page-errors'
+
+
+def classify_console_entry(entry):
+    """
+    Kind of a SEVERE browser log entry.
+
+    Returns:
+        'unhandled-rejection', 'uncaught-exception' or 'console-error'
+    """
+    message = entry.get('message', '')
+    if 'Uncaught (in promise)' in message:
+        return 'unhandled-rejection'
+    if 'Uncaught' in message:
+        return 'uncaught-exception'
+    return 'console-error'
+
+
+def browser_log(driver):
+    """
+    Every browser console entry of the session so far.
+
+    get_log('browser') empties Chrome's buffer, so everything that reads the
+    console shares this per-driver copy.
+    """
+    entries = getattr(driver, '_browser_log', None)
+    if entries is None:
+        entries = driver._browser_log = []
+    entries.extend(driver.get_log('browser'))
+    return entries
+
+
+def console_errors(entries):
+    """
+    Turn browser log entries into error records.
+
+    Args:
+        entries: Browser log entries (see browser_log)
+
+    Returns:
+        List of error dicts with epoch millisecond timestamps
+    """
+    errors = []
+    for entry in entries:
+        if entry.get('level') != 'SEVERE' or entry.get('source') in NETWORK_LOG_SOURCES:
+            continue
+        errors.append({
+            'kind': classify_console_entry(entry),
+            'at': entry.get('timestamp'),
+            'message': entry.get('message', ''),
+        })
+    return errors
+
+
+def api_errors(records):
+    """
+    Non-2xx (and failed) API responses from the network log.
+
+    Args:
+        records: Request records from NetworkLog
+
+    Returns:
+        List of error dicts with epoch millisecond timestamps
+    """
+    errors = []
+    for record in records:
+        if not is_api_request(record) or record['method'] == 'OPTIONS':
+            continue
+        if record['failed']:
+            if record['error_text'] in IGNORED_NETWORK_ERRORS:
+                continue
+            detail = record['blocked_reason'] or record['error_text']
+        elif record['status'] is None or 200 <= record['status'] < 300 or record['status'] == 304:
+            continue
+        else:
+            detail = f"HTTP {record['status']}"
+        errors.append({
+            'kind': 'api-error',
+            'at': record['wall_time'] * 1000 if record['wall_time'] else None,
+            'message': f"{record['method']} {record['url']} -> {detail}",
+            'status': record['status'],
+        })
+    return errors
+
+
+def report_filename(nodeid):
+    """File-system safe name for a test node id."""
+    return re.sub(r'[^\w.-]+', '_', nodeid).strip('_')
+
+
+class PageErrorCollector:
+    """
+    Buffers page errors for a single browser session.
+
+    The driver must be created with network capture enabled. Only the
+    names of user actions are recorded while the test runs; the logs are
+    read in finish().
+    """
+
+    def __init__(self, report_dir, threshold=0, fail=False):
+        """
+        Args:
+            report_dir: Directory for performance reports
+            threshold: Number of errors a test may produce before it is reported
+            fail: Fail the test when the threshold is exceeded
+        """
+        self.report_dir = os.path.join(report_dir, REPORT_SUBDIR)
+        self.threshold = threshold
+        self.fail = fail
+        self.actions = []
+        self._page = None
+
+    def attach(self, driver):
+        """
+        Start recording user actions for error attribution.
+
+        Args:
+            driver: Chrome WebDriver instance
+        """
+        add_command_listener(driver, self)
+
+    def before_command(self, driver, command, params):
+        action = USER_ACTION_COMMANDS.get(command)
+        if action is None:
+            return
+        if command == 'get':
+            self._page = params.get('url')
+        self.actions.append({'action': action, 'page': self._page, 'at': time.time() * 1000})
+
+    def collect(self, driver):
+        """
+        Read the browser and network logs.
+
+        Returns:
+            List of error dicts sorted by time, each attributed to an action
+        """
+        try:
+            errors = console_errors(browser_log(driver))
+            errors += api_errors(get_network_log(driver).since(0))
+        except WebDriverException as e:
+            print(f"⚠️ Could not read browser logs: {e}")
+            return []
+
+        errors.sort(key=lambda error: error['at'] or 0)
+        for error in errors:
+            error['after'] = self._action_before(error['at'])
+        return errors
+
+    def _action_before(self, at):
+        previous = None
+        for action in self.actions:
+            if at is None or action['at'] > at:
+                break
+            previous = action
+        if previous is None:
+            return 'before first action'
+        return f"{previous['action']} ({previous['page']})" if previous['page'] else previous['action']
+
+    def finish(self, driver, item):
+        """
+        Report the test's page errors if there are more than the threshold.
+
+        Args:
+            driver: WebDriver instance (still open)
+            item: pytest item the browser belonged to
+
+        Returns:
+            Failure message when the threshold was exceeded and failing is
+            enabled, otherwise None
+        """
+        errors = self.collect(driver)
+        if len(errors) <= self.threshold:
+            return None
+
+        report = {'test': item.nodeid, 'errors': errors}
+        report['path'] = write_json(self.report_dir, f"{report_filename(item.nodeid)}.json", report)
+        item.user_properties.append(('page_errors', json.dumps(errors, ensure_ascii=False)))
+        SESSION_REPORTS.append(report)
+
+        if not self.fail:
+            return None
+        lines = [f"{len(errors)} page errors (threshold {self.threshold}):"]
+        lines += [f"    [{e['kind']}] after {e['after']}: {e['message']}" for e in errors]
+        return '\n'.join(lines)
+
+
+# Reports for the tests of the current pytest session that exceeded the threshold
+SESSION_REPORTS = []
+
+
+def summarize(terminalreporter):
+    """Print the page errors of every reported test to the pytest terminal."""
+    if not SESSION_REPORTS:
+        return
+    terminalreporter.section('page errors')
+    for report in SESSION_REPORTS:
+        terminalreporter.write_line(f"{report['test']}: {len(report['errors'])} errors ({report['path']})")
+        for error in report['errors']:
+            terminalreporter.write_line(f"    [{error['kind']}] after {error['after']}: {error['message'][:200]}")
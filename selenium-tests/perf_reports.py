@@ -0,0 +1,54 @@
+"""
+Performance Report Files
+Small helpers shared by the harness instruments and benchmarks for writing
+and reading their JSON reports under TestConfig.PERF_REPORT_DIR.
+"""
+
+import json
+import os
+
+
+def write_json(report_dir, filename, data):
+    """
+    Write a report as pretty-printed UTF-8 JSON.
+
+    Args:
+        report_dir: Directory for performance reports (created if missing)
+        filename: Name of the report file
+        data: JSON-serializable report data
+
+    Returns:
+        Path of the written file
+    """
+    os.makedirs(report_dir, exist_ok=True)
+    filepath = os.path.join(report_dir, filename)
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return filepath
+
+
+def read_json(filepath, default=None):
+    """
+    Read a JSON report, returning a default when it does not exist.
+
+    Args:
+        filepath: Path of the report file
+        default: Value returned when the file is missing or empty
+
+    Returns:
+        Parsed report data
+    """
+    if not filepath or not os.path.exists(filepath):
+        return default
+    with open(filepath, encoding='utf-8') as f:
+        content = f.read()
+    return json.loads(content) if content.strip() else default
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
@@ -0,0 +1,353 @@
+"""
+Process Resource Sampler
+Samples processes in a background thread while a benchmark, load run or
+pytest session runs:
+
+- RssSampler follows the memory of one process tree (e.g. the API server
+  during an upload benchmark) so peak usage can be reported per configuration.
+- ResourceSampler records CPU%, RSS and open file descriptors of the whole
+  stack - the test browsers, chromedriver, the Node API and Postgres - as
+  time series, to see how many parallel workers a machine can host.
+"""
+
+import functools
+import threading
+import time
+from urllib.parse import urlsplit
+import psutil
+from perf_reports import write_json
+from shared_browser import USER_DATA_PREFIX
+
+
+def find_listening_process(url):
+    """
+    Find the process that accepts connections for a URL's port.
+
+    Args:
+        url: e.g. TestConfig.API_URL
+
+    Returns:
+        psutil.Process, or None when it cannot be determined (not running,
+        or not permitted to list other users' sockets)
+    """
+    port = urlsplit(url).port or (443 if url.startswith('https') else 80)
+    try:
+        connections = psutil.net_connections(kind='tcp')
+    except psutil.AccessDenied:
+        return None
+    for connection in connections:
+        if connection.status == psutil.CONN_LISTEN and connection.laddr.port == port and connection.pid:
+            return psutil.Process(connection.pid)
+    return None
+
+
+def tree_rss(process):
+    """Resident memory of a process and all its children, in bytes."""
+    total = 0
+    for proc in [process] + process.children(recursive=True):
+        try:
+            total += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return total
+
+
+class RssSampler:
+    """
+    Records the RSS of a process tree at a fixed interval.
+
+    Usage:
+        with RssSampler(process) as sampler:
+            ...
+        print(sampler.peak_mb)
+    """
+
+    def __init__(self, process, interval=0.05):
+        self.process = process
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        started = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                rss = tree_rss(self.process)
+            except psutil.NoSuchProcess:
+                break
+            self.samples.append((round(time.monotonic() - started, 3), rss))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def peak_mb(self):
+        return max((rss for _, rss in self.samples), default=0) / (1024 * 1024)
+
+    @property
+    def first_mb(self):
+        return self.samples[0][1] / (1024 * 1024) if self.samples else 0
+
+
+def _name(proc):
+    return (proc.info.get('name') or '').lower()
+
+
+def is_chromedriver(proc):
+    return _name(proc).startswith('chromedriver')
+
+
+def is_node_server(proc):
+    """node (or nodemon's child) running server/src/index.js."""
+    cmdline = proc.info.get('cmdline') or []
+    return _name(proc).startswith('node') and any(arg.replace('\\', '/').endswith('src/index.js')
+                                                   for arg in cmdline)
+
+
+def is_postgres(proc):
+    return _name(proc).startswith('postgres')
+
+
+def _harness_chrome(cmdline, debugging_ports):
+    """Whether a command line is the shared or daemon Chrome (see shared_browser.ensure_browser)."""
+    for arg in cmdline:
+        if arg.startswith('--user-data-dir=') and USER_DATA_PREFIX in arg:
+            return True
+        if arg.startswith('--remote-debugging-port=') and arg.split('=', 1)[1] in debugging_ports:
+            return True
+    return False
+
+
+def is_browser(proc, debugging_ports=()):
+    """
+    Chrome processes the harness started (not the user's own browser): those
+    below chromedriver, and the shared or daemon Chrome - launched without
+    chromedriver - with its child processes.
+
+    Args:
+        proc: psutil.Process from process_iter(['name', 'cmdline'])
+        debugging_ports: Remote debugging ports of the shared and daemon browsers
+    """
+    name = _name(proc)
+    if not name.startswith(('chrome', 'google chrome', 'chromium')) or is_chromedriver(proc):
+        return False
+    ports = {str(port) for port in debugging_ports}
+    if _harness_chrome(proc.info.get('cmdline') or [], ports):
+        return True
+    try:
+        for parent in proc.parents():
+            if parent.name().lower().startswith('chromedriver'):
+                return True
+            if parent.name().lower().startswith(('chrome', 'google chrome', 'chromium')) \
+                    and _harness_chrome(parent.cmdline(), ports):
+                return True
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        pass
+    return False
+
+
+# Process group -> predicate on a psutil.Process from process_iter(['name', 'cmdline'])
+PROCESS_GROUPS = {
+    'chromedriver': is_chromedriver,
+    'browser': is_browser,
+    'node': is_node_server,
+    'postgres': is_postgres,
+}
+
+
+def open_files(proc):
+    """Open file descriptors (handles on Windows)."""
+    return proc.num_fds() if hasattr(proc, 'num_fds') else proc.num_handles()
+
+
+class ResourceSampler:
+    """
+    Records CPU%, RSS and open file descriptors per process group at a
+    fixed interval, plus system-wide CPU and memory.
+
+    CPU% is per process as reported by psutil: 100 is one full core, so a
+    group can exceed 100 on a multi-core machine.
+
+    Usage:
+        with ResourceSampler(interval=1.0) as sampler:
+            ...
+        report = sampler.report()
+    """
+
+    def __init__(self, interval=1.0, groups=PROCESS_GROUPS):
+        self.interval = interval
+        self.groups = groups
+        self.samples = []
+        self.markers = []
+        self._started = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._started = time.monotonic()
+        self._stop.clear()
+        # The first cpu_percent() call of each process only sets its baseline
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name='resource-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def mark(self, label):
+        """Record an event (e.g. the start of a test) on the time axis."""
+        if self._started is not None:
+            self.markers.append({'t': self._elapsed(), 'label': label})
+
+    def _elapsed(self):
+        return round(time.monotonic() - self._started, 3)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.samples.append(self._sample())
+
+    def _sample(self):
+        sample = {
+            't': self._elapsed(),
+            'system': {
+                'cpu_percent': psutil.cpu_percent(),
+                'memory_percent': psutil.virtual_memory().percent,
+            },
+        }
+        totals = {name: {'processes': 0, 'cpu_percent': 0.0, 'rss_mb': 0.0, 'fds': 0} for name in self.groups}
+        # process_iter() caches Process objects, so cpu_percent() measures since the last sample
+        for proc in psutil.process_iter(['name', 'cmdline']):
+            group = next((name for name, matches in self.groups.items() if matches(proc)), None)
+            if group is None:
+                continue
+            total = totals[group]
+            total['processes'] += 1
+            try:
+                with proc.oneshot():
+                    total['cpu_percent'] += proc.cpu_percent()
+                    total['rss_mb'] += proc.memory_info().rss / (1024 * 1024)
+                    total['fds'] += open_files(proc)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                # Postgres usually runs as another user: fds (or more) are not readable
+                pass
+        for name, total in totals.items():
+            total['cpu_percent'] = round(total['cpu_percent'], 1)
+            total['rss_mb'] = round(total['rss_mb'], 1)
+            sample[name] = total
+        return sample
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def summary(self):
+        """Mean and peak per group over all samples."""
+        result = {}
+        for name in list(self.groups) + ['system']:
+            series = [sample[name] for sample in self.samples]
+            if not series:
+                continue
+            keys = [key for key in series[0] if key != 'processes']
+            result[name] = {f'peak_{key}': max(s[key] for s in series) for key in keys}
+            result[name].update({f'mean_{key}': round(sum(s[key] for s in series) / len(series), 1)
+                                 for key in keys})
+            if name != 'system':
+                result[name]['peak_processes'] = max(s['processes'] for s in series)
+        return result
+
+    def report(self):
+        """Summary, markers and the full time series as a JSON-serializable dict."""
+        return {
+            'interval_s': self.interval,
+            'duration_s': self.samples[-1]['t'] if self.samples else 0,
+            'cpu_count': psutil.cpu_count(),
+            'memory_total_mb': round(psutil.virtual_memory().total / (1024 * 1024)),
+            'summary': self.summary(),
+            'markers': self.markers,
+            'samples': self.samples,
+        }
+
+
+def format_summary(summary):
+    """Lines of a per-group table for printing."""
+    lines = [f"{'group':<14}{'procs':>6}{'cpu% avg':>10}{'cpu% max':>10}{'rss MB max':>12}{'fds max':>9}"]
+    for name, row in summary.items():
+        if name == 'system':
+            continue
+        lines.append(f"{name:<14}{row['peak_processes']:>6}{row['mean_cpu_percent']:>10}"
+                     f"{row['peak_cpu_percent']:>10}{row['peak_rss_mb']:>12}{row['peak_fds']:>9}")
+    system = summary.get('system')
+    if system:
+        lines.append(f"system: cpu {system['mean_cpu_percent']}% avg / {system['peak_cpu_percent']}% max, "
+                     f"memory {system['peak_memory_percent']}% max")
+    return lines
+
+
+# Sampler of the running pytest session (RESOURCE_SAMPLE=true)
+SESSION_SAMPLER = None
+
+
+def start_session_sampler(interval, debugging_ports=()):
+    """
+    Start sampling for the session.
+
+    Args:
+        interval: Seconds between samples
+        debugging_ports: Remote debugging ports of the shared and daemon
+            browsers, which are counted as browser processes too
+    """
+    global SESSION_SAMPLER
+    groups = {**PROCESS_GROUPS, 'browser': functools.partial(is_browser, debugging_ports=debugging_ports)}
+    SESSION_SAMPLER = ResourceSampler(interval=interval, groups=groups).start()
+
+
+def mark_test(nodeid):
+    if SESSION_SAMPLER:
+        SESSION_SAMPLER.mark(nodeid)
+
+
+def summarize(terminalreporter):
+    """Stop the session sampler and print its per-group table."""
+    if not SESSION_SAMPLER:
+        return
+    SESSION_SAMPLER.stop()
+    terminalreporter.section('process resources')
+    for line in format_summary(SESSION_SAMPLER.summary()):
+        terminalreporter.write_line(line)
+
+
+def write_session_report(report_dir):
+    """
+    Write the session's resource time series to a JSON file.
+
+    Args:
+        report_dir: Directory for performance reports
+
+    Returns:
+        Path of the written file, or None when nothing was sampled
+    """
+    if not SESSION_SAMPLER or not SESSION_SAMPLER.samples:
+        return None
+    return write_json(report_dir, 'resources.json', SESSION_SAMPLER.report())
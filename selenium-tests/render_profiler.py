@@ -0,0 +1,210 @@
+"""
+React Render-Count Profiler
+Installs a minimal __REACT_DEVTOOLS_GLOBAL_HOOK__ before the page loads and
+counts React commits and per-component renders, without any client changes.
+"""
+
+import json
+from selenium.common.exceptions import WebDriverException
+from driver_hooks import USER_ACTION_COMMANDS, add_command_listener
+from perf_reports import read_json, write_json
+
+
+# Number of components listed per test in the report
+TOP_COMPONENTS = 10
+
+# React only talks to the hook if it exists before react-dom is evaluated, so
+# this must run on every new document. The hook keeps the interface that
+# react-dom and the Vite React Refresh runtime expect (inject, renderers,
+# onCommitFiberRoot, ...). A fiber is counted when it mounts or when React
+# performed work on it in this commit; unchanged subtrees are skipped the
+# same way React DevTools skips them.
+RENDER_HOOK_JS = r"""
+(function () {
+  if (window.__REACT_DEVTOOLS_GLOBAL_HOOK__) return;
+  var PERFORMED_WORK = 1;
+  var COMPONENT_TAGS = { 0: true, 1: true, 11: true, 14: true, 15: true };
+  var stats = { commits: 0, renders: {} };
+  var nextRendererId = 1;
+
+  function componentName(type) {
+    if (!type || typeof type === 'string') return null;
+    return type.displayName || type.name ||
+           (type.render && (type.render.displayName || type.render.name)) ||
+           (type.type && (type.type.displayName || type.type.name)) ||
+           'Anonymous';
+  }
+
+  function didRender(fiber) {
+    if (!fiber.alternate) return true;
+    var flags = fiber.flags !== undefined ? fiber.flags : fiber.effectTag;
+    return (flags & PERFORMED_WORK) === PERFORMED_WORK;
+  }
+
+  function walk(fiber) {
+    for (; fiber; fiber = fiber.sibling) {
+      if (COMPONENT_TAGS[fiber.tag] && didRender(fiber)) {
+        var name = componentName(fiber.type);
+        stats.renders[name] = (stats.renders[name] || 0) + 1;
+      }
+      var previous = fiber.alternate;
+      if (fiber.child && (!previous || fiber.child !== previous.child)) {
+        walk(fiber.child);
+      }
+    }
+  }
+
+  window.__REACT_DEVTOOLS_GLOBAL_HOOK__ = {
+    renderers: new Map(),
+    supportsFiber: true,
+    isDisabled: false,
+    inject: function (renderer) {
+      var id = nextRendererId++;
+      this.renderers.set(id, renderer);
+      return id;
+    },
+    checkDCE: function () {},
+    onScheduleFiberRoot: function () {},
+    onCommitFiberUnmount: function () {},
+    onPostCommitFiberRoot: function () {},
+    onCommitFiberRoot: function (rendererId, root) {
+      stats.commits += 1;
+      try {
+        walk(root.current.child);
+      } catch (e) {
+        stats.errors = (stats.errors || 0) + 1;
+      }
+    }
+  };
+
+  window.__studyhubRenderStats = {
+    drain: function () {
+      var drained = { commits: stats.commits, renders: stats.renders };
+      stats.commits = 0;
+      stats.renders = {};
+      return drained;
+    }
+  };
+})();
+"""
+
+DRAIN_RENDER_STATS_JS = """
+return window.__studyhubRenderStats ? window.__studyhubRenderStats.drain() : null;
+"""
+
+
+class RenderProfiler:
+    """
+    Counts React commits and component renders for a single browser session.
+
+    The in-page counters are lost on every full page load, so they are
+    collected before each navigation and once more when the test finishes.
+    """
+
+    def __init__(self):
+        self.commits = 0
+        self.renders = {}
+
+    def attach(self, driver):
+        """
+        Install the DevTools hook shim and start listening to WebDriver commands.
+
+        Args:
+            driver: Chrome WebDriver instance
+        """
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+            'source': RENDER_HOOK_JS
+        })
+        add_command_listener(driver, self)
+
+    def before_command(self, driver, command, params):
+        if USER_ACTION_COMMANDS.get(command) in ('navigate', 'back', 'forward', 'refresh'):
+            self._drain(driver)
+
+    def _drain(self, driver):
+        try:
+            stats = driver.execute_script(DRAIN_RENDER_STATS_JS)
+        except WebDriverException:
+            return
+        if not stats:
+            return
+        self.commits += stats['commits']
+        for name, count in stats['renders'].items():
+            self.renders[name] = self.renders.get(name, 0) + count
+
+    def finish(self, driver, item):
+        """
+        Collect the remaining counters and record the result for a test.
+
+        Args:
+            driver: WebDriver instance (still open)
+            item: pytest item the browser belonged to
+
+        Returns:
+            None - render counts are reported, not enforced
+        """
+        self._drain(driver)
+        # Sort by count, then name, so reports from different runs line up
+        ranked = sorted(self.renders.items(), key=lambda entry: (-entry[1], entry[0]))
+        report = {
+            'test': item.nodeid,
+            'commits': self.commits,
+            'renders': sum(self.renders.values()),
+            'components': dict(ranked),
+        }
+        item.user_properties.append(('react_renders', json.dumps(
+            {**report, 'components': dict(ranked[:TOP_COMPONENTS])}, ensure_ascii=False
+        )))
+        SESSION_REPORTS.append(report)
+        return None
+
+
+# Reports for every test in the current pytest session
+SESSION_REPORTS = []
+
+
+def write_session_report(report_dir):
+    """
+    Write all render-count reports of the session to a JSON file.
+
+    Args:
+        report_dir: Directory for performance reports
+
+    Returns:
+        Path of the written file, or None when nothing was recorded
+    """
+    if not SESSION_REPORTS:
+        return None
+    return write_json(report_dir, 'renders.json', SESSION_REPORTS)
+
+
+def summarize(terminalreporter, baseline_path=None):
+    """
+    Print the most-rendered components of each test to the pytest terminal.
+
+    Args:
+        terminalreporter: pytest terminal reporter
+        baseline_path: Optional renders.json from an earlier run to compare with
+    """
+    if not SESSION_REPORTS:
+        return
+    baseline = {r['test']: r for r in read_json(baseline_path, default=[])}
+
+    terminalreporter.section('react renders')
+    for report in SESSION_REPORTS:
+        previous = baseline.get(report['test'])
+        terminalreporter.write_line(
+            f"{report['test']}: {report['commits']} commits, {report['renders']} renders"
+            + (_delta(report['renders'], previous['renders']) if previous else '')
+        )
+        for name, count in list(report['components'].items())[:TOP_COMPONENTS]:
+            previous_count = previous['components'].get(name, 0) if previous else None
+            terminalreporter.write_line(
+                f"    {count:>6}  {name}"
+                + (_delta(count, previous_count) if previous else '')
+            )
+
+
+def _delta(current, previous):
+    """Format the change against the baseline, e.g. ' (+12 vs baseline)'."""
+    return f" ({current - previous:+d} vs baseline)"
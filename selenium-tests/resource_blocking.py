@@ -0,0 +1,189 @@
+"""
+Resource Blocking
+Drops resources functional tests do not need (images, web fonts, favicons,
+analytics) with the DevTools Network.setBlockedURLs command, so `driver.get`
+and `document.readyState == 'complete'` do not wait for them.
+
+Every page load is timed per route, separately for blocked and unblocked
+loads, so the report shows how much load time blocking saves - within one
+session when perf tests (which never block) visit the same routes, or
+against the report of a run with RESOURCE_BLOCKING=none.
+"""
+
+import re
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+from driver_hooks import add_command_listener
+from network_log import get_network_log
+from perf_reports import read_json, write_json
+
+
+# URL patterns (Network.setBlockedURLs wildcards) per resource class
+RESOURCE_CLASSES = {
+    'images': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*/uploads/avatars/*'],
+    'fonts': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot', '*fonts.googleapis.com*', '*fonts.gstatic.com*'],
+    'favicons': ['*/favicon.ico', '*google.com/s2/favicons*', '*icons.duckduckgo.com*'],
+    'analytics': ['*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+                  '*plausible.io*', '*hotjar.com*', '*clarity.ms*'],
+    'media': ['*.mp4', '*.webm', '*.mp3', '*.ogg'],
+}
+
+# What functional tests block by default
+FUNCTIONAL_PROFILE = ['images', 'fonts', 'favicons', 'analytics']
+
+NAVIGATION_TIMING_JS = """
+var entry = performance.getEntriesByType('navigation')[0];
+return entry ? {load: entry.loadEventEnd, dom: entry.domContentLoadedEventEnd} : null;
+"""
+
+
+def parse_profile(value):
+    """
+    Resource classes to block for a RESOURCE_BLOCKING setting.
+
+    Args:
+        value: 'functional', 'none' or a comma-separated list of classes
+
+    Returns:
+        List of class names
+
+    Raises:
+        ValueError: For an unknown class
+    """
+    value = (value or 'none').strip().lower()
+    if value == 'functional':
+        return list(FUNCTIONAL_PROFILE)
+    if value in ('none', 'off', 'false'):
+        return []
+    classes = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in classes if name not in RESOURCE_CLASSES]
+    if unknown:
+        raise ValueError(f"Unknown resource classes: {', '.join(unknown)} "
+                         f"(known: {', '.join(RESOURCE_CLASSES)})")
+    return classes
+
+
+def blocked_patterns(classes):
+    return [pattern for name in classes for pattern in RESOURCE_CLASSES[name]]
+
+
+def route_of(url):
+    """Route of a URL with ids replaced, e.g. /forum/12 -> /forum/:id."""
+    path = urlsplit(url).path.rstrip('/') or '/'
+    return re.sub(r'/\d+(?=/|$)', '/:id', path)
+
+
+class ResourceBlocker:
+    """
+    Instrument that blocks resource classes and times every page load.
+
+    Args:
+        classes: Resource classes to block (empty: only time page loads)
+        capture_network: The driver records network events, so blocked
+            requests can be counted
+    """
+
+    def __init__(self, classes, capture_network=False):
+        self.classes = list(classes)
+        self.capture_network = capture_network
+        self.loads = []
+        self._cursor = 0
+
+    def attach(self, driver):
+        if self.classes:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_patterns(self.classes)})
+        add_command_listener(driver, self)
+
+    def before_command(self, driver, command, params):
+        if command == 'get' and self.capture_network:
+            self._cursor = get_network_log(driver).mark()
+
+    def after_command(self, driver, command, params, error):
+        if command != 'get' or error is not None:
+            return
+        try:
+            timing = driver.execute_script(NAVIGATION_TIMING_JS)
+        except WebDriverException:
+            return
+        if not timing or not timing['load']:
+            return
+        blocked = None
+        if self.capture_network:
+            blocked = sum(1 for record in get_network_log(driver).since(self._cursor)
+                          if record['blocked_reason'])
+        self.loads.append({'route': route_of(params['url']), 'load_ms': round(timing['load'], 1),
+                           'dom_ms': round(timing['dom'], 1), 'blocked_requests': blocked})
+
+    def finish(self, driver, item):
+        SESSION_LOADS.extend({**load, 'blocking': bool(self.classes)} for load in self.loads)
+        if self.classes:
+            SESSION_CLASSES.update(self.classes)
+        return None
+
+
+# Page loads of the current pytest session
+SESSION_LOADS = []
+SESSION_CLASSES = set()
+
+
+def route_report(loads):
+    """Mean load times per route, split into blocked and unblocked loads."""
+    routes = {}
+    for load in loads:
+        key = 'blocked' if load['blocking'] else 'unblocked'
+        routes.setdefault(load['route'], {}).setdefault(key, []).append(load)
+    report = {}
+    for route, groups in sorted(routes.items()):
+        report[route] = {}
+        for key, group in groups.items():
+            counted = [load['blocked_requests'] for load in group if load['blocked_requests'] is not None]
+            report[route][key] = {
+                'loads': len(group),
+                'mean_load_ms': round(sum(load['load_ms'] for load in group) / len(group), 1),
+                'mean_dom_ms': round(sum(load['dom_ms'] for load in group) / len(group), 1),
+                'blocked_requests': sum(counted) if counted else None,
+            }
+    return report
+
+
+def write_session_report(report_dir):
+    """
+    Write the per-route load times of the session to route-loads.json.
+
+    Returns:
+        Path of the written file, or None when no page was loaded
+    """
+    if not SESSION_LOADS:
+        return None
+    return write_json(report_dir, 'route-loads.json', {
+        'blocked_classes': sorted(SESSION_CLASSES),
+        'routes': route_report(SESSION_LOADS),
+    })
+
+
+def summarize(terminalreporter, baseline_path=None):
+    """
+    Print the load time blocking saves per route.
+
+    Args:
+        terminalreporter: pytest terminal reporter
+        baseline_path: Optional route-loads.json of an unblocked run; used
+            for routes this session only loaded with blocking
+    """
+    if not SESSION_LOADS or not SESSION_CLASSES:
+        return
+    baseline = (read_json(baseline_path, default={}) or {}).get('routes', {})
+    terminalreporter.section(f"resource blocking ({', '.join(sorted(SESSION_CLASSES))})")
+    for route, stats in route_report(SESSION_LOADS).items():
+        blocked = stats.get('blocked')
+        if not blocked:
+            continue
+        unblocked = stats.get('unblocked') or baseline.get(route, {}).get('unblocked')
+        line = f"{route:<28} {blocked['mean_load_ms']:>8.1f}ms load ({blocked['loads']} loads"
+        if blocked['blocked_requests'] is not None:
+            line += f", {blocked['blocked_requests']} requests blocked"
+        line += ')'
+        if unblocked:
+            line += f", saves {unblocked['mean_load_ms'] - blocked['mean_load_ms']:.1f}ms"
+        terminalreporter.write_line(line)
@@ -0,0 +1,190 @@
+"""
+Test Result Cache
+Skips tests whose inputs have not changed since they last passed. Every test
+gets a key - a SHA-256 over:
+
+- its test module, conftest.py and the harness modules either imports
+- the client bundle (build_server.source_hash)
+- the server route modules behind the endpoints the test called (from the
+  dependency map, see dependency_map.py), what they require, and what
+  index.js runs for every request
+- the Prisma schema
+- the settings that change what the test runs against (URLs, stand-in API,
+  cassettes, production build)
+
+A test whose key equals the key of its last green run is skipped and
+reported as cached. Tests without a dependency map entry always run, as does
+everything with RESULT_CACHE_FORCE=true. Results are kept in
+TestConfig.RESULT_CACHE_FILE; in CI, persist that file between runs together
+with the dependency map.
+"""
+
+import hashlib
+import json
+import os
+import time
+import pytest
+import dependency_map
+from build_server import source_hash
+from perf_reports import read_json
+
+
+PRISMA_SCHEMA = os.path.join(dependency_map.REPO_ROOT, 'server', 'prisma', 'schema.prisma')
+
+# TestConfig settings that change what a test runs against
+CONFIG_KEYS = ('BASE_URL', 'API_URL', 'STANDIN_API', 'STANDIN_SIZE', 'CASSETTE_MODE', 'SERVE_BUILD')
+
+CACHED_REASON = 'cached: unchanged since it passed'
+
+
+def file_digest(paths):
+    """SHA-256 over the repository-relative paths and contents of files."""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.relpath(path, dependency_map.REPO_ROOT).replace(os.sep, '/').encode('utf-8'))
+        if os.path.isfile(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+class KeyBuilder:
+    """
+    Computes result cache keys; the parts shared by all tests are hashed once.
+
+    Args:
+        tests: Dependency map returned by dependency_map.load_map()
+        config: TestConfig class
+    """
+
+    def __init__(self, tests, config):
+        self.tests = tests
+        self.harness = dependency_map.harness_graph()
+        self.server = dependency_map.server_graph()
+        self.mounts = dependency_map.server_mounts()
+        # index.js itself, not the route modules it requires
+        shared = dependency_map.requires(
+            self.server, dependency_map.server_shared(self.server, self.mounts)) | {dependency_map.SERVER_INDEX}
+        settings = json.dumps({name: getattr(config, name) for name in CONFIG_KEYS}, sort_keys=True)
+        self.common = hashlib.sha256('\n'.join([
+            source_hash(),
+            file_digest(shared | {PRISMA_SCHEMA}),
+            settings,
+        ]).encode('utf-8')).hexdigest()
+
+    def server_files(self, endpoints):
+        """Route modules (and what they require) behind the endpoints a test called."""
+        paths = [endpoint.split(' ', 1)[1] for endpoint in endpoints]
+        modules = {module for prefix, module in self.mounts.items()
+                   if any(path == prefix or path.startswith(prefix + '/') for path in paths)}
+        return dependency_map.requires(self.server, modules)
+
+    def key(self, item):
+        """
+        Result cache key of a test.
+
+        Returns:
+            Hex digest, or None when the test's dependencies are not known
+        """
+        entry = self.tests.get(item.nodeid)
+        if not entry or entry['endpoints'] is None:
+            return None
+        module = os.path.abspath(str(item.fspath))
+        harness = dependency_map.requires(self.harness, {module, dependency_map.CONFTEST})
+        return hashlib.sha256('\n'.join([
+            self.common,
+            file_digest(harness),
+            file_digest(self.server_files(entry['endpoints'])),
+        ]).encode('utf-8')).hexdigest()
+
+
+def load_results(path):
+    """Last green runs as {node id: {'key', 'passed'}}."""
+    return (read_json(path, default={}) or {}).get('tests', {})
+
+
+def apply(items, cache_path, map_path, config, force=False):
+    """
+    Compute the key of every collected test and skip the ones cached as green.
+
+    Args:
+        items: Collected test items
+        cache_path: Result cache file
+        map_path: Dependency map file
+        config: TestConfig class
+        force: Run every test, but still record the results
+    """
+    builder = KeyBuilder(dependency_map.load_map(map_path), config)
+    results = load_results(cache_path)
+    for item in items:
+        key = builder.key(item)
+        if key is None:
+            continue
+        SESSION_KEYS[item.nodeid] = key
+        last = results.get(item.nodeid)
+        if not force and last and last['key'] == key:
+            passed = time.strftime('%Y-%m-%d %H:%M', time.localtime(last['passed']))
+            item.add_marker(pytest.mark.skip(reason=f"{CACHED_REASON} ({passed})"))
+            CACHED.append(item.nodeid)
+
+
+def record(item, report):
+    """
+    Record the outcome of a test phase (call from pytest_runtest_makereport).
+
+    A test counts as green when setup, call and teardown all passed.
+    """
+    if item.nodeid not in SESSION_KEYS or item.nodeid in CACHED:
+        return
+    if report.failed:
+        SESSION_RESULTS[item.nodeid] = False
+    elif report.when == 'teardown' and getattr(item, 'rep_call', None) is not None \
+            and item.rep_call.passed and SESSION_RESULTS.get(item.nodeid) is not False:
+        SESSION_RESULTS[item.nodeid] = True
+
+
+# Keys of the collected tests, outcomes of the tests that ran, and the
+# tests skipped as cached - all for this pytest process
+SESSION_KEYS = {}
+SESSION_RESULTS = {}
+CACHED = []
+
+
+def write_results(path):
+    """
+    Merge this process's outcomes into the cache file: green tests store
+    their key, failed tests lose their entry.
+
+    Returns:
+        Path of the cache file, or None when no cacheable test ran
+    """
+    if not SESSION_RESULTS:
+        return None
+    import fcntl  # Unix only, like the rest of the process management here
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + '.lock', 'w') as lock:
+        # pytest-xdist workers merge their own tests
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        results = load_results(path)
+        for node_id, passed in SESSION_RESULTS.items():
+            if passed:
+                results[node_id] = {'key': SESSION_KEYS[node_id], 'passed': round(time.time())}
+            else:
+                results.pop(node_id, None)
+        partial = path + '.partial'
+        with open(partial, 'w', encoding='utf-8') as f:
+            json.dump({'tests': dict(sorted(results.items()))}, f, ensure_ascii=False, indent=2)
+        os.replace(partial, path)
+    return path
+
+
+def summarize(terminalreporter):
+    """Print how many tests the result cache skipped."""
+    cached = [report for report in terminalreporter.stats.get('skipped', [])
+              if isinstance(report.longrepr, tuple) and report.longrepr[2].startswith('Skipped: ' + CACHED_REASON)]
+    if not cached:
+        return
+    terminalreporter.section('result cache')
+    terminalreporter.write_line(f"{len(cached)} test{'s' if len(cached) != 1 else ''} skipped as cached "
+                                f"(unchanged since the last pass); RESULT_CACHE_FORCE=true runs everything")
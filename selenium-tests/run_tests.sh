@@ -60,6 +60,7 @@ TEST_FILE=""
 HEADLESS=false
 HTML_REPORT=false
 VERBOSE=false
+STACK=false
 
 while [[ $# -gt 0 ]]; do
     case $1 in
@@ -75,6 +76,10 @@ while [[ $# -gt 0 ]]; do
             VERBOSE=true
             shift
             ;;
+        -s|--stack)
+            STACK=true
+            shift
+            ;;
         -t|--test)
             TEST_FILE="$2"
             shift 2
@@ -86,12 +91,14 @@ while [[ $# -gt 0 ]]; do
             echo "  -h, --headless        Run tests in headless mode"
             echo "  -r, --report          Generate HTML report"
             echo "  -v, --verbose         Verbose output"
+            echo "  -s, --stack           Start the database, API and client for the run"
             echo "  -t, --test FILE       Run specific test file"
             echo "  --help                Show this help message"
             echo ""
             echo "Examples:"
             echo "  ./run_tests.sh                          # Run all tests"
             echo "  ./run_tests.sh -h -r                    # Headless with report"
+            echo "  ./run_tests.sh -h -s                    # Headless against a fresh local stack"
             echo "  ./run_tests.sh -t test_01_user_authentication.py"
             exit 0
             ;;
@@ -130,17 +137,26 @@ if [ "$HTML_REPORT" = true ]; then
     print_info "HTML report will be generated: report.html"
 fi
 
-# Check if servers are running
-print_info "Checking if application servers are running..."
-
-if ! curl -s http://localhost:5173 > /dev/null 2>&1; then
-    print_warning "Frontend (http://localhost:5173) is not responding"
-    print_warning "Please start the frontend: cd client && npm run dev"
-fi
+if [ "$STACK" = true ]; then
+    export LOCAL_STACK=true
+    print_info "The local stack (Postgres, API, client build) is started by pytest"
+else
+    # Check if servers are running (same defaults as TestConfig)
+    print_info "Checking if application servers are running..."
+    FRONTEND_URL=$(grep -E '^BASE_URL=' .env | cut -d= -f2-)
+    BACKEND_URL=$(grep -E '^API_URL=' .env | cut -d= -f2-)
+    FRONTEND_URL=${BASE_URL:-${FRONTEND_URL:-http://localhost:3000}}
+    BACKEND_URL=${API_URL:-${BACKEND_URL:-http://localhost:4000}}
+
+    if ! curl -s "$FRONTEND_URL" > /dev/null 2>&1; then
+        print_warning "Frontend ($FRONTEND_URL) is not responding"
+        print_warning "Please start the frontend: cd client && npm run dev (or use --stack)"
+    fi
 
-if ! curl -s http://localhost:4000 > /dev/null 2>&1; then
-    print_warning "Backend (http://localhost:4000) is not responding"
-    print_warning "Please start the backend: cd server && npm run dev"
+    if ! curl -s "$BACKEND_URL/api/health" > /dev/null 2>&1; then
+        print_warning "Backend ($BACKEND_URL) is not responding"
+        print_warning "Please start the backend: cd server && npm run dev (or use --stack)"
+    fi
 fi
 
 echo ""
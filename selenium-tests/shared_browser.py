@@ -0,0 +1,215 @@
+"""
+Shared Browser with Per-Test Contexts
+Runs one Chrome process for all tests (and all pytest-xdist workers) and
+gives every test its own browser context - separate cookies, storage and
+cache, like an incognito window - with its own tab. N parallel tests then
+cost one browser plus N renderers instead of N browsers.
+
+Each test still gets a normal WebDriver: a chromedriver session attached to
+the shared Chrome through `debuggerAddress` and switched to the test's tab.
+When the test ends only its context is disposed. A crashed tab takes down
+nothing but its own context, and a crashed browser is restarted for the
+next test.
+
+Chrome is started by whichever process needs it first (a file lock keeps
+the workers from racing) and stopped by the controlling pytest process at
+the end of the session.
+"""
+
+import json
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import trio
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.common.bidi import cdp
+import browser_startup
+
+
+CHROME_NAMES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+START_TIMEOUT = 30
+
+# Temporary user-data-dir of the shared (and daemon) Chrome; process_sampler finds the browser by it
+USER_DATA_PREFIX = 'studyhub-shared-chrome-'
+
+
+def devtools_endpoint(debugger_address):
+    """
+    Browser-level DevTools WebSocket URL and CDP major version.
+
+    Args:
+        debugger_address: host:port of Chrome's remote debugging server
+
+    Returns:
+        (WebSocket URL, major version) or None when nothing answers
+    """
+    try:
+        with urllib.request.urlopen(f"http://{debugger_address}/json/version", timeout=2) as response:
+            info = json.load(response)
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+    return info['webSocketDebuggerUrl'], info['Browser'].split('/')[-1].split('.')[0]
+
+
+def _state_paths(port):
+    base = os.path.join(tempfile.gettempdir(), f'studyhub-shared-chrome-{port}')
+    return base + '.lock', base + '.json'
+
+
+def chrome_binary(options):
+    """Chrome executable: the one Selenium Manager resolved, else the first on PATH."""
+    browser_startup.resolve_driver(options)
+    if options.binary_location:
+        return options.binary_location
+    for name in CHROME_NAMES:
+        path = shutil.which(name)
+        if path:
+            return path
+    raise RuntimeError("No Chrome binary found for the shared browser")
+
+
+def ensure_browser(port, make_options, timeout=START_TIMEOUT):
+    """
+    Start the shared Chrome unless one already answers on the port.
+
+    Args:
+        port: Remote debugging port
+        make_options: Callable returning the Chrome Options of the test
+            browsers; their command-line switches are used for the launch
+        timeout: Seconds to wait for the DevTools endpoint
+
+    Returns:
+        True when this call started the browser
+    """
+    import fcntl  # Unix only, like the rest of the process management here
+
+    lock_path, state_path = _state_paths(port)
+    with open(lock_path, 'w') as lock:
+        # Only one worker launches; the others wait and then find it running
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if devtools_endpoint(f'127.0.0.1:{port}'):
+            return False
+        options = make_options()
+        user_data_dir = tempfile.mkdtemp(prefix=USER_DATA_PREFIX)
+        command = [chrome_binary(options), f'--remote-debugging-port={port}', f'--user-data-dir={user_data_dir}',
+                   '--no-first-run', '--no-default-browser-check', *options.arguments, 'about:blank']
+        # A new session: the browser outlives the worker that happened to start it
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                   start_new_session=True)
+        deadline = time.monotonic() + timeout
+        while not devtools_endpoint(f'127.0.0.1:{port}'):
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError(f"Shared Chrome did not start on port {port}")
+            time.sleep(0.1)
+        with open(state_path, 'w') as f:
+            json.dump({'pid': process.pid, 'user_data_dir': user_data_dir}, f)
+        return True
+
+
+def stop_browser(port):
+    """Stop the shared Chrome started for this port, if any."""
+    lock_path, state_path = _state_paths(port)
+    if not os.path.exists(state_path):
+        return
+    with open(state_path) as f:
+        state = json.load(f)
+    try:
+        os.killpg(state['pid'], signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+    deadline = time.monotonic() + 10
+    while devtools_endpoint(f'127.0.0.1:{port}') and time.monotonic() < deadline:
+        time.sleep(0.1)
+    shutil.rmtree(state['user_data_dir'], ignore_errors=True)
+    os.remove(state_path)
+
+
+async def _create_context(websocket_url, version):
+    devtools = cdp.import_devtools(version)
+    async with cdp.open_cdp(websocket_url) as connection:
+        context_id = await connection.execute(devtools.target.create_browser_context(dispose_on_detach=False))
+        target_id = await connection.execute(devtools.target.create_target(
+            'about:blank', browser_context_id=context_id))
+        return str(context_id), str(target_id)
+
+
+async def _dispose_context(websocket_url, version, context_id):
+    devtools = cdp.import_devtools(version)
+    async with cdp.open_cdp(websocket_url) as connection:
+        await connection.execute(devtools.target.dispose_browser_context(
+            devtools.browser.BrowserContextID(context_id)))
+
+
+def attach_options(make_options, port):
+    """
+    Options for a chromedriver session attached to the shared Chrome.
+
+    chromedriver rejects launch-only options (switches, excludeSwitches) for
+    an attached browser, so only the logging preferences are carried over.
+    """
+    source = make_options()
+    options = Options()
+    options.debugger_address = f'127.0.0.1:{port}'
+    logging_prefs = source.to_capabilities().get('goog:loggingPrefs')
+    if logging_prefs:
+        options.set_capability('goog:loggingPrefs', logging_prefs)
+    if 'perfLoggingPrefs' in source.experimental_options:
+        options.add_experimental_option('perfLoggingPrefs', source.experimental_options['perfLoggingPrefs'])
+    return options
+
+
+def start_context_driver(port, make_options):
+    """
+    WebDriver for a new browser context in the shared Chrome.
+
+    Args:
+        port: Remote debugging port of the shared Chrome
+        make_options: Callable returning the Chrome Options of the test browsers
+
+    Returns:
+        WebDriver switched to the context's tab; pass it to release_context
+        after quitting
+    """
+    ensure_browser(port, make_options)
+    websocket_url, version = devtools_endpoint(f'127.0.0.1:{port}')
+    context_id, target_id = trio.run(_create_context, websocket_url, version)
+    try:
+        service = ChromeService(executable_path=browser_startup.resolve_driver(make_options()))
+        driver = webdriver.Chrome(service=service, options=attach_options(make_options, port))
+    except Exception:
+        trio.run(_dispose_context, websocket_url, version, context_id)
+        raise
+    driver._browser_context = (port, context_id)
+    # chromedriver names windows by their DevTools target id
+    driver.switch_to.window(target_id)
+    return driver
+
+
+def release_context(driver):
+    """Dispose the browser context of a quit driver (no-op for other drivers)."""
+    context = getattr(driver, '_browser_context', None)
+    if not context:
+        return
+    port, context_id = context
+    endpoint = devtools_endpoint(f'127.0.0.1:{port}')
+    if endpoint is None:
+        # The whole browser is gone; the next test starts a new one
+        return
+    try:
+        trio.run(_dispose_context, *endpoint, context_id)
+    except Exception as e:
+        print(f"⚠️ Could not dispose browser context {context_id}: {e}")
+
+
+def is_controller():
+    """True in the pytest process that owns the session (not an xdist worker)."""
+    return 'PYTEST_XDIST_WORKER' not in os.environ
@@ -0,0 +1,974 @@
+"""
+Stand-in Backend
+A lightweight asyncio HTTP server that answers the StudyHub-IL /api routes
+from in-memory data, so UI tests and benchmarks can run against datasets of
+any size without Postgres, Prisma or the Node server.
+
+Besides the lists it implements the write routes the client uses (register,
+profile and avatar, posts, summaries, tools, comments, ratings, favorites,
+answered marks and deletes) with the response shapes of server/src/routes, so
+UI tests run unchanged against it (STANDIN_API=true). Uploaded files are
+accepted but not stored; summary downloads are empty attachments.
+
+Everything outside /api is forwarded to the real frontend (CLIENT_URL), so the
+browser loads the actual client from the stand-in's origin.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+from aiohttp import ClientSession, web
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+COURSE_NAMES_FILE = os.path.join(REPO_ROOT, 'server', 'data', 'courses.json')
+INSTITUTIONS_FILE = os.path.join(REPO_ROOT, 'server', 'src', 'constants', 'institutions.js')
+
+FORUM_CATEGORIES = ['שאלה', 'דיון', 'עזרה', 'משאבים']
+TOOL_CATEGORIES = ['מחשבון', 'סימולציה', 'תרגול', 'כתיבה', 'מצגות', 'אחר']
+
+# Password of the generated users
+STANDIN_PASSWORD = 'password123'
+
+# Bearer tokens are 'standin-token-<user id>'; any other token is rejected
+TOKEN_PREFIX = 'standin-token-'
+
+AUTH_REQUIRED = {'error': 'לא סופק טוקן אימות'}
+
+# Image types the avatar route accepts, with the extension they are stored under
+AVATAR_EXTENSIONS = {'image/jpeg': 'jpg', 'image/png': 'png', 'image/webp': 'webp'}
+
+# Headers that must not be copied between the proxied connections
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailers', 'transfer-encoding', 'upgrade', 'host',
+}
+
+
+async def forward(session, request, url):
+    """
+    Send an incoming request on to `url` and return the upstream response.
+
+    Args:
+        session: ClientSession (created with auto_decompress=False so bodies
+            keep their encoding)
+        request: Incoming aiohttp request
+        url: Upstream URL including the query string
+    """
+    headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+    async with session.request(
+        request.method, url, headers=headers, data=await request.read(), allow_redirects=False,
+    ) as upstream:
+        body = await upstream.read()
+        response_headers = {
+            k: v for k, v in upstream.headers.items()
+            if k.lower() not in HOP_BY_HOP_HEADERS and k.lower() != 'content-length'
+        }
+        return web.Response(status=upstream.status, headers=response_headers, body=body)
+
+
+def load_institutions():
+    """Read the institution list from the server's constants module."""
+    with open(INSTITUTIONS_FILE, encoding='utf-8') as f:
+        return re.findall(r"^\s*'([^']+)',", f.read(), re.MULTILINE)
+
+
+def load_course_names():
+    """Read the course catalogue used by the server's seed data."""
+    with open(COURSE_NAMES_FILE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _iso(moment):
+    return moment.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+class StandinData:
+    """
+    In-memory dataset shaped like the Prisma models behind the API.
+
+    Records are generated deterministically from a seed, newest first, so the
+    first item of every list is known in advance (see first_title).
+    """
+
+    def __init__(self, posts=100, summaries=100, tools=50, users=50, seed=1, accounts=()):
+        """
+        Args:
+            posts, summaries, tools, users: Number of generated records
+            seed: Random seed
+            accounts: Extra (email, password) or (email, password, role)
+                accounts that can sign in, e.g. the test users; the
+                generated users sign in with STANDIN_PASSWORD
+        """
+        rng = random.Random(seed)
+        now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        institutions = load_institutions()
+        course_names = load_course_names()
+
+        self.users = [
+            {
+                'id': i, 'fullName': f'סטודנט {i}', 'email': f'student{i}@studyhub.local',
+                'role': 'ADMIN' if i == 1 else 'USER', 'institution': rng.choice(institutions),
+                'createdAt': _iso(now - timedelta(days=400 - i % 400)),
+                'avatar': None, 'bio': None, 'location': None, 'fieldOfStudy': None,
+                'website': None, 'interests': [],
+            }
+            for i in range(1, users + 1)
+        ]
+
+        self.courses = [
+            {
+                'id': i, 'courseCode': f'C{i:04d}', 'courseName': name,
+                'institution': institutions[i % len(institutions)], 'semester': 'א',
+                'createdAt': _iso(now),
+            }
+            for i, name in enumerate(course_names, start=1)
+        ]
+
+        self.posts = []
+        for i in range(posts, 0, -1):
+            author = rng.choice(self.users)
+            course = rng.choice(self.courses)
+            comments = rng.randint(0, 6)
+            self.posts.append({
+                'id': i, 'title': f'שאלה מספר {i} בנושא {course["courseName"]}',
+                'content': 'תוכן השאלה ' * rng.randint(5, 30),
+                'category': rng.choice(FORUM_CATEGORIES), 'tags': rng.sample(['מבחן', 'תרגיל', 'הרצאה', 'פרויקט'], 2),
+                'images': [], 'isUrgent': rng.random() < 0.1, 'views': rng.randint(0, 500),
+                'isAnswered': comments > 0 and rng.random() < 0.5,
+                'avgRating': round(rng.uniform(1, 5), 2) if rng.random() < 0.6 else None,
+                'createdAt': _iso(now - timedelta(minutes=posts - i)),
+                'courseId': course['id'], 'authorId': author['id'],
+                'author': {'id': author['id'], 'fullName': author['fullName']},
+                'course': {'courseCode': course['courseCode'], 'courseName': course['courseName']},
+                '_count': {'comments': comments, 'ratings': rng.randint(0, 10)},
+            })
+
+        self.summaries = []
+        for i in range(summaries, 0, -1):
+            uploader = rng.choice(self.users)
+            course = rng.choice(self.courses)
+            extension = rng.choice(['pdf', 'docx'])
+            self.summaries.append({
+                'id': i, 'title': f'סיכום {i} - {course["courseName"]}',
+                'description': 'סיכום הרצאות ותרגולים', 'filePath': f'uploads/summary-{i}.{extension}',
+                'uploadDate': _iso(now - timedelta(minutes=summaries - i)),
+                'avgRating': round(rng.uniform(1, 5), 2) if rng.random() < 0.7 else None,
+                'courseId': course['id'], 'uploadedById': uploader['id'],
+                'course': {'courseCode': course['courseCode'], 'courseName': course['courseName'],
+                           'institution': course['institution']},
+                'uploadedBy': {'id': uploader['id'], 'fullName': uploader['fullName']},
+                '_count': {'ratings': rng.randint(0, 20), 'comments': rng.randint(0, 5)},
+            })
+
+        self.tools = []
+        for i in range(tools, 0, -1):
+            owner = rng.choice(self.users)
+            ratings = rng.randint(0, 15)
+            self.tools.append({
+                'id': i, 'title': f'כלי {i}', 'url': f'https://tools.example.com/{i}',
+                'description': 'כלי עזר ללימודים', 'category': rng.choice(TOOL_CATEGORIES),
+                'avgRating': round(rng.uniform(1, 5), 2) if ratings else None,
+                'createdAt': _iso(now - timedelta(minutes=tools - i)), 'addedById': owner['id'],
+                'addedBy': {'id': owner['id'], 'fullName': owner['fullName']},
+                '_count': {'ratings': ratings}, 'isFavorite': False, 'ratingCount': ratings,
+            })
+
+        self.passwords = {user['email']: STANDIN_PASSWORD for user in self.users}
+        self.post_comments = {}
+        self.summary_comments = {}
+        # item id -> {user id: rating}
+        self.post_ratings = {}
+        self.summary_ratings = {}
+        self.tool_ratings = {}
+        self.favorites = []
+        self._ids = {}
+        for email, password, *role in accounts:
+            self.add_user(email.split('@')[0], email, password, role=role[0] if role else 'USER')
+
+    def next_id(self, kind, records):
+        """Next free id of a record type (ids are never reused)."""
+        current = self._ids.get(kind) or max((r['id'] for r in records), default=0)
+        self._ids[kind] = current + 1
+        return current + 1
+
+    def add_user(self, full_name, email, password, institution=None, role='USER'):
+        user = {
+            'id': self.next_id('users', self.users), 'fullName': full_name, 'email': email, 'role': role,
+            'institution': institution, 'createdAt': _iso(datetime.now(timezone.utc)),
+            'avatar': None, 'bio': None, 'location': None, 'fieldOfStudy': None,
+            'website': None, 'interests': [],
+        }
+        self.users.append(user)
+        self.passwords[email] = password
+        return user
+
+    def find(self, records, item_id):
+        return next((r for r in records if str(r['id']) == str(item_id)), None)
+
+    def delete_user(self, user_id):
+        """Remove a user and, like the database's cascades, everything they created."""
+        for user in self.users:
+            if user['id'] == user_id:
+                self.passwords.pop(user['email'], None)
+        self.users = [u for u in self.users if u['id'] != user_id]
+        self.posts = [p for p in self.posts if p['authorId'] != user_id]
+        self.summaries = [s for s in self.summaries if s['uploadedById'] != user_id]
+        self.tools = [t for t in self.tools if t['addedById'] != user_id]
+        self.favorites = [f for f in self.favorites if f['userId'] != user_id]
+
+    def first_title(self, route):
+        """
+        Title of the first item a list page shows with the default sort order.
+
+        Args:
+            route: Client route ('/forum', '/summaries' or '/tools')
+        """
+        items = {'/forum': self.posts, '/summaries': self.summaries, '/tools': self.tools}[route]
+        return items[0]['title'] if items else None
+
+
+def _contains(value, search):
+    return value is not None and search.lower() in value.lower()
+
+
+class StandinBackend:
+    """
+    aiohttp application answering /api from a StandinData instance.
+
+    List responses are serialized once per query string and reused, since
+    benchmark runs request the same large lists over and over.
+    """
+
+    def __init__(self, data, client_url=None):
+        self.data = data
+        self.client_url = client_url.rstrip('/') if client_url else None
+        self._json_cache = {}
+        self._client_session = None
+
+    def create_app(self):
+        app = web.Application(client_max_size=50 * 1024 * 1024)
+        app.router.add_get('/api/health', self.health)
+        app.router.add_post('/api/auth/register', self.register)
+        app.router.add_post('/api/auth/login', self.login)
+        app.router.add_get('/api/auth/me', self.me)
+        app.router.add_put('/api/auth/profile', self.update_profile)
+        app.router.add_post('/api/auth/profile/avatar', self.upload_avatar)
+        app.router.add_get('/api/courses/institutions', self.institutions)
+        app.router.add_get('/api/courses', self.courses)
+        app.router.add_get('/api/courses/{id}', self.get_course)
+        app.router.add_get('/api/stats', self.stats)
+        app.router.add_get('/api/forum', self.list_posts)
+        app.router.add_post('/api/forum', self.create_post)
+        app.router.add_get('/api/forum/my-posts', self.my_posts)
+        app.router.add_get('/api/forum/{id}', self.get_post)
+        app.router.add_put('/api/forum/{id}', self.update_post)
+        app.router.add_delete('/api/forum/{id}', self.delete_post)
+        app.router.add_patch('/api/forum/{id}/answer', self.mark_answered)
+        app.router.add_post('/api/forum/{id}/comments', self.comment_post)
+        app.router.add_post('/api/forum/{id}/ratings', self.rate_post)
+        app.router.add_get('/api/forum/{id}/ratings', self.post_ratings)
+        app.router.add_get('/api/summaries', self.list_summaries)
+        app.router.add_post('/api/summaries', self.create_summary)
+        app.router.add_get('/api/summaries/my-content', self.my_summaries)
+        app.router.add_get('/api/summaries/{id}', self.get_summary)
+        app.router.add_put('/api/summaries/{id}', self.update_summary)
+        app.router.add_delete('/api/summaries/{id}', self.delete_summary)
+        app.router.add_get('/api/summaries/{id}/download', self.download_summary)
+        app.router.add_post('/api/summaries/{id}/comments', self.comment_summary)
+        app.router.add_post('/api/summaries/{id}/rate', self.rate_summary)
+        app.router.add_get('/api/summaries/{id}/ratings', self.summary_ratings)
+        app.router.add_get('/api/tools', self.list_tools)
+        app.router.add_post('/api/tools', self.create_tool)
+        app.router.add_get('/api/tools/my-content', self.my_tools)
+        app.router.add_get('/api/tools/{id}', self.get_tool)
+        app.router.add_put('/api/tools/{id}', self.update_tool)
+        app.router.add_delete('/api/tools/{id}', self.delete_tool)
+        app.router.add_post('/api/tools/{id}/rate', self.rate_tool)
+        app.router.add_get('/api/tools/{id}/ratings', self.tool_ratings)
+        app.router.add_get('/api/favorites', self.list_favorites)
+        app.router.add_post('/api/favorites/{kind}/{id}', self.add_favorite)
+        app.router.add_delete('/api/favorites/{kind}/{id}', self.remove_favorite)
+        app.router.add_delete('/api/admin/users/{id}', self.delete_user)
+        app.router.add_route('*', '/api/{tail:.*}', self.not_found)
+        app.router.add_route('*', '/{tail:.*}', self.proxy_to_client)
+        app.on_cleanup.append(self._close_client_session)
+        return app
+
+    # --- helpers -------------------------------------------------------------
+
+    def _cached_json(self, request, build, user=None):
+        # Responses that depend on who asks are cached per user
+        key = (request.path_qs, user['id'] if user else None)
+        body = self._json_cache.get(key)
+        if body is None:
+            body = json.dumps(build(), ensure_ascii=False).encode('utf-8')
+            self._json_cache[key] = body
+        return web.Response(body=body, content_type='application/json')
+
+    def replace_data(self, data):
+        """Serve a new dataset from now on (e.g. a fresh one per test)."""
+        self.data = data
+        self._changed()
+
+    def _changed(self):
+        """Drop cached list responses after a write."""
+        self._json_cache.clear()
+
+    def current_user(self, request):
+        """
+        The user a bearer token belongs to. Tokens handed out by login are
+        'standin-token-<id>'; any other token is unknown (None, answered 401).
+        """
+        authorization = request.headers.get('Authorization', '')
+        if not authorization.startswith('Bearer '):
+            return None
+        token = authorization[len('Bearer '):]
+        if not token.startswith(TOKEN_PREFIX):
+            return None
+        return self.data.find(self.data.users, token[len(TOKEN_PREFIX):])
+
+    @staticmethod
+    async def _fields(request):
+        """Form fields of a JSON or multipart body (uploaded files as FileField)."""
+        if request.content_type == 'multipart/form-data':
+            return await request.post()
+        try:
+            return await request.json()
+        except ValueError:
+            return {}
+
+    @staticmethod
+    def _uploads(fields, name):
+        return [f for f in (fields.getall(name, []) if hasattr(fields, 'getall') else []) if hasattr(f, 'filename')]
+
+    def _course_summary(self, course_id, *keys):
+        course = self.data.find(self.data.courses, course_id)
+        return {key: course[key] for key in keys} if course else None
+
+    @staticmethod
+    def _ratings_response(ratings, users, user):
+        rows = [{'userId': user_id, 'rating': rating,
+                 'user': {'id': user_id, 'fullName': users.get(user_id, '')}} for user_id, rating in ratings.items()]
+        return {
+            'ratings': rows,
+            'avgRating': sum(ratings.values()) / len(ratings) if ratings else None,
+            'userRating': ratings.get(user['id']) if user else None,
+            'totalRatings': len(ratings),
+        }
+
+    def _rate(self, store, item, user, rating):
+        ratings = store.setdefault(item['id'], {})
+        ratings[user['id']] = int(rating)
+        item['avgRating'] = sum(ratings.values()) / len(ratings)
+        self._changed()
+        return {'message': 'דירוג נשמר בהצלחה',
+                'rating': {'rating': int(rating), 'userId': user['id']}, 'avgRating': item['avgRating']}
+
+    def _can_modify(self, user, owner_id):
+        return user['id'] == owner_id or user['role'] == 'ADMIN'
+
+    async def _close_client_session(self, app):
+        if self._client_session:
+            await self._client_session.close()
+
+    # --- routes --------------------------------------------------------------
+
+    async def health(self, request):
+        return web.json_response({'status': 'ok', 'message': 'StudyHub-IL stand-in backend'})
+
+    async def register(self, request):
+        body = await self._fields(request)
+        if not body.get('fullName') or not body.get('email') or len(body.get('password') or '') < 6:
+            return web.json_response({'errors': [{'msg': 'נתונים לא תקינים'}]}, status=400)
+        if body['email'] in self.data.passwords:
+            return web.json_response({'error': 'משתמש עם אימייל זה כבר קיים'}, status=400)
+        user = self.data.add_user(body['fullName'], body['email'], body['password'], body.get('institution'))
+        self._changed()
+        return web.json_response({'message': 'משתמש נוצר בהצלחה', 'token': f"{TOKEN_PREFIX}{user['id']}",
+                                  'user': user, 'emailSent': False}, status=201)
+
+    async def login(self, request):
+        body = await self._fields(request)
+        email = body.get('email')
+        if email not in self.data.passwords or self.data.passwords[email] != body.get('password'):
+            return web.json_response({'error': 'אימייל או סיסמה שגויים'}, status=401)
+        user = next(u for u in self.data.users if u['email'] == email)
+        return web.json_response({'message': 'התחברת בהצלחה', 'token': f"{TOKEN_PREFIX}{user['id']}", 'user': user})
+
+    async def me(self, request):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response({'error': 'לא סופק טוקן אימות'}, status=401)
+        return web.json_response(self._user_with_counts(user))
+
+    def _user_with_counts(self, user):
+        return {**user, '_count': {
+            'summaries': sum(1 for s in self.data.summaries if s['uploadedById'] == user['id']),
+            'forumPosts': sum(1 for p in self.data.posts if p['authorId'] == user['id']),
+            'forumComments': sum(1 for comments in self.data.post_comments.values()
+                                 for c in comments if c['authorId'] == user['id']),
+            'ratings': sum(1 for ratings in self.data.summary_ratings.values() if user['id'] in ratings),
+        }}
+
+    async def update_profile(self, request):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        body = await self._fields(request)
+        if body.get('fullName'):
+            user['fullName'] = body['fullName'].strip()
+        for field in ('bio', 'location', 'institution', 'fieldOfStudy', 'website'):
+            if field in body:
+                user[field] = body[field] or None
+        if 'interests' in body:
+            user['interests'] = body['interests'] if isinstance(body['interests'], list) else []
+        self._changed()
+        return web.json_response({'message': 'הפרופיל עודכן בהצלחה', 'user': self._user_with_counts(user)})
+
+    async def upload_avatar(self, request):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        files = self._uploads(await self._fields(request), 'avatar')
+        if not files:
+            return web.json_response({'error': 'לא הועלה קובץ תמונה'}, status=400)
+        extension = AVATAR_EXTENSIONS.get(files[0].content_type)
+        if not extension:
+            return web.json_response({'error': 'רק קבצי תמונה (JPG, PNG, WEBP) מותרים'}, status=400)
+        timestamp = int(datetime.now(timezone.utc).timestamp() * 1000)
+        user['avatar'] = f"/uploads/avatars/{user['id']}_{timestamp}.{extension}"
+        self._changed()
+        return web.json_response({'message': 'תמונת הפרופיל עודכנה בהצלחה', 'user': self._user_with_counts(user),
+                                  'avatarUrl': user['avatar']})
+
+    async def institutions(self, request):
+        return web.json_response(load_institutions())
+
+    async def courses(self, request):
+        institution = request.query.get('institution')
+        search = request.query.get('search')
+        courses = [
+            {**c, '_count': {'summaries': 0, 'forumPosts': 0}} for c in self.data.courses
+            if (not institution or c['institution'] == institution)
+            and (not search or _contains(c['courseName'], search) or _contains(c['courseCode'], search))
+        ]
+        return web.json_response(courses)
+
+    async def get_course(self, request):
+        course = self.data.find(self.data.courses, request.match_info['id'])
+        if not course:
+            return web.json_response({'error': 'קורס לא נמצא'}, status=404)
+        summaries = [s for s in self.data.summaries if s['courseId'] == course['id']]
+        posts = [p for p in self.data.posts if p['courseId'] == course['id']]
+        return web.json_response({
+            **course,
+            'summaries': sorted(summaries, key=lambda s: s['uploadDate'], reverse=True)[:10],
+            'forumPosts': sorted(posts, key=lambda p: p['createdAt'], reverse=True)[:5],
+            '_count': {'summaries': len(summaries), 'forumPosts': len(posts), 'helpRequests': 0},
+        })
+
+    async def stats(self, request):
+        return web.json_response({
+            'summaries': len(self.data.summaries), 'forumPosts': len(self.data.posts),
+            'tools': len(self.data.tools), 'users': len(self.data.users),
+        })
+
+    async def list_posts(self, request):
+        query = request.query
+        user = self.current_user(request)
+
+        def build():
+            posts = self.data.posts
+            if query.get('courseId'):
+                posts = [p for p in posts if p['courseId'] == int(query['courseId'])]
+            if query.get('category'):
+                posts = [p for p in posts if p['category'] == query['category']]
+            if query.get('myQuestions') == 'true':
+                posts = [p for p in posts if user and p['authorId'] == user['id']]
+            if query.get('search'):
+                posts = [p for p in posts
+                         if _contains(p['title'], query['search']) or _contains(p['content'], query['search'])]
+            if 'answered' in query:
+                answered = query['answered'] == 'true'
+                posts = [p for p in posts
+                         if (p['isAnswered'] or p['_count']['comments'] > 0) == answered]
+            return posts
+
+        return self._cached_json(request, build, user if query.get('myQuestions') == 'true' else None)
+
+    async def get_post(self, request):
+        post = self.data.find(self.data.posts, request.match_info['id'])
+        if not post:
+            return web.json_response({'error': 'פוסט לא נמצא'}, status=404)
+        post['views'] += 1
+        course = self.data.find(self.data.courses, post['courseId'])
+        return web.json_response({**post, 'course': course,
+                                  'comments': self.data.post_comments.get(post['id'], [])})
+
+    async def my_posts(self, request):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        return web.json_response([p for p in self.data.posts if p['authorId'] == user['id']])
+
+    async def create_post(self, request):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        body = await self._fields(request)
+        title, content = body.get('title') or '', body.get('content') or ''
+        if not 10 <= len(title.strip()) <= 150:
+            return web.json_response({'error': 'כותרת חייבת להכיל בין 10 ל-150 תווים'}, status=400)
+        if len(content.strip()) < 50:
+            return web.json_response({'error': 'תוכן חייב להכיל לפחות 50 תווים'}, status=400)
+        course = self._course_summary(body.get('courseId'), 'courseCode', 'courseName')
+        if not course:
+            return web.json_response({'error': 'קורס הוא שדה חובה'}, status=400)
+        post_id = self.data.next_id('posts', self.data.posts)
+        tags = body.get('tags') or []
+        if isinstance(tags, str):
+            tags = json.loads(tags) if tags.startswith('[') else [t for t in tags.split(',') if t]
+        post = {
+            'id': post_id, 'title': title.strip(), 'content': content.strip(),
+            'category': body.get('category') or 'general', 'tags': tags,
+            'images': [f'uploads/forum-{post_id}-{n}-{f.filename}' for n, f in enumerate(self._uploads(body, 'images'))],
+            'isUrgent': str(body.get('isUrgent')).lower() == 'true', 'views': 0, 'isAnswered': False,
+            'avgRating': None, 'createdAt': _iso(datetime.now(timezone.utc)),
+            'courseId': int(body['courseId']), 'authorId': user['id'],
+            'author': {'id': user['id'], 'fullName': user['fullName']}, 'course': course,
+            '_count': {'comments': 0, 'ratings': 0},
+        }
+        self.data.posts.insert(0, post)
+        self._changed()
+        return web.json_response({'message': 'השאלה נוצרה בהצלחה', 'post': post}, status=201)
+
+    async def update_post(self, request):
+        return await self._update(request, self.data.posts, 'authorId', 'פוסט לא נמצא', 'post',
+                                  ('title', 'content', 'category', 'tags', 'isUrgent'))
+
+    async def delete_post(self, request):
+        return await self._delete(request, 'posts', 'authorId', 'פוסט לא נמצא', 'הפוסט נמחק בהצלחה')
+
+    async def mark_answered(self, request):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        post = self.data.find(self.data.posts, request.match_info['id'])
+        if not post:
+            return web.json_response({'error': 'פוסט לא נמצא'}, status=404)
+        if not self._can_modify(user, post['authorId']):
+            return web.json_response({'error': 'אין לך הרשאה לעדכן פוסט זה'}, status=403)
+        post['isAnswered'] = True
+        self._changed()
+        return web.json_response({'message': 'הפוסט סומן כנענה', 'post': post})
+
+    async def comment_post(self, request):
+        return await self._comment(request, self.data.posts, self.data.post_comments, 'פוסט לא נמצא')
+
+    async def rate_post(self, request):
+        response = await self._rate_route(request, self.data.posts, self.data.post_ratings, 'פוסט לא נמצא')
+        if response.status == 200:
+            # The forum route answers 201, unlike the summary and tool routes
+            response.set_status(201)
+        return response
+
+    async def post_ratings(self, request):
+        return self._ratings_route(request, self.data.post_ratings)
+
+    async def list_summaries(self, request):
+        query = request.query
+
+        def build():
+            summaries = self.data.summaries
+            if query.get('courseId'):
+                summaries = [s for s in summaries if s['courseId'] == int(query['courseId'])]
+            if query.get('institution'):
+                summaries = [s for s in summaries if s['course']['institution'] == query['institution']]
+            if query.get('search'):
+                search = query['search']
+                summaries = [s for s in summaries
+                             if _contains(s['title'], search) or _contains(s['description'], search)
+                             or _contains(s['course']['courseName'], search)
+                             or _contains(s['course']['courseCode'], search)]
+            sort_by = query.get('sortBy', 'recent')
+            if sort_by == 'rating':
+                summaries = sorted(summaries, key=lambda s: s['avgRating'] or 0, reverse=True)
+            elif sort_by == 'title':
+                summaries = sorted(summaries, key=lambda s: s['title'])
+            return summaries
+
+        return self._cached_json(request, build)
+
+    async def get_summary(self, request):
+        summary = self.data.find(self.data.summaries, request.match_info['id'])
+        if not summary:
+            return web.json_response({'error': 'סיכום לא נמצא'}, status=404)
+        course = self.data.find(self.data.courses, summary['courseId'])
+        ratings = self.data.summary_ratings.get(summary['id'], {})
+        return web.json_response({
+            **summary, 'course': course,
+            'ratings': [{'userId': user_id, 'rating': rating} for user_id, rating in ratings.items()],
+            'comments': self.data.summary_comments.get(summary['id'], []),
+        })
+
+    async def my_summaries(self, request):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        return web.json_response([s for s in self.data.summaries if s['uploadedById'] == user['id']])
+
+    async def create_summary(self, request):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        body = await self._fields(request)
+        files = self._uploads(body, 'file')
+        if not files:
+            return web.json_response({'error': 'יש להעלות קובץ PDF או DOCX'}, status=400)
+        if not body.get('title'):
+            return web.json_response({'errors': [{'msg': 'כותרת היא שדה חובה'}]}, status=400)
+        course = self._course_summary(body.get('courseId'), 'courseCode', 'courseName', 'institution')
+        if not course:
+            return web.json_response({'error': 'קורס לא נמצא'}, status=404)
+        summary_id = self.data.next_id('summaries', self.data.summaries)
+        summary = {
+            'id': summary_id, 'title': body['title'], 'description': body.get('description') or '',
+            'filePath': f'uploads/summary-{summary_id}-{files[0].filename}',
+            'uploadDate': _iso(datetime.now(timezone.utc)), 'avgRating': None,
+            'courseId': int(body['courseId']), 'uploadedById': user['id'], 'course': course,
+            'uploadedBy': {'id': user['id'], 'fullName': user['fullName']},
+            '_count': {'ratings': 0, 'comments': 0},
+        }
+        self.data.summaries.insert(0, summary)
+        self._changed()
+        return web.json_response({'message': 'סיכום הועלה בהצלחה', 'summary': summary}, status=201)
+
+    async def update_summary(self, request):
+        return await self._update(request, self.data.summaries, 'uploadedById', 'סיכום לא נמצא', 'summary',
+                                  ('title', 'description'))
+
+    async def delete_summary(self, request):
+        return await self._delete(request, 'summaries', 'uploadedById', 'סיכום לא נמצא', 'הסיכום נמחק בהצלחה')
+
+    async def download_summary(self, request):
+        summary = self.data.find(self.data.summaries, request.match_info['id'])
+        if not summary:
+            return web.json_response({'error': 'סיכום לא נמצא'}, status=404)
+        # Uploads are not stored, so (like the server with local storage) an
+        # attachment is sent - an empty one
+        filename = quote(os.path.basename(summary['filePath']))
+        return web.Response(body=b'', content_type='application/octet-stream',
+                            headers={'Content-Disposition': f"attachment; filename*=UTF-8''{filename}"})
+
+    async def comment_summary(self, request):
+        return await self._comment(request, self.data.summaries, self.data.summary_comments, 'סיכום לא נמצא')
+
+    async def rate_summary(self, request):
+        return await self._rate_route(request, self.data.summaries, self.data.summary_ratings, 'סיכום לא נמצא')
+
+    async def summary_ratings(self, request):
+        return self._ratings_route(request, self.data.summary_ratings)
+
+    async def list_tools(self, request):
+        query = request.query
+
+        def build():
+            tools = self.data.tools
+            if query.get('category'):
+                tools = [t for t in tools if t['category'] == query['category']]
+            if query.get('search'):
+                tools = [t for t in tools
+                         if _contains(t['title'], query['search']) or _contains(t['description'], query['search'])]
+            return tools
+
+        return self._cached_json(request, build)
+
+    async def get_tool(self, request):
+        tool = self.data.find(self.data.tools, request.match_info['id'])
+        if not tool:
+            return web.json_response({'error': 'כלי לא נמצא'}, status=404)
+        return web.json_response(tool)
+
+    async def my_tools(self, request):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        return web.json_response([t for t in self.data.tools if t['addedById'] == user['id']])
+
+    async def create_tool(self, request):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        body = await self._fields(request)
+        if not body.get('title') or not body.get('url'):
+            return web.json_response({'errors': [{'msg': 'כותרת וקישור הם שדות חובה'}]}, status=400)
+        tool = {
+            'id': self.data.next_id('tools', self.data.tools), 'title': body['title'], 'url': body['url'],
+            'description': body.get('description') or '', 'category': body.get('category') or 'אחר',
+            'avgRating': None, 'createdAt': _iso(datetime.now(timezone.utc)), 'addedById': user['id'],
+            'addedBy': {'id': user['id'], 'fullName': user['fullName']},
+            '_count': {'ratings': 0}, 'isFavorite': False, 'ratingCount': 0,
+        }
+        self.data.tools.insert(0, tool)
+        self._changed()
+        return web.json_response({'message': 'כלי נוסף בהצלחה', 'tool': tool}, status=201)
+
+    async def update_tool(self, request):
+        return await self._update(request, self.data.tools, 'addedById', 'כלי לא נמצא', 'tool',
+                                  ('title', 'url', 'description', 'category'))
+
+    async def delete_tool(self, request):
+        return await self._delete(request, 'tools', 'addedById', 'כלי לא נמצא', 'כלי נמחק בהצלחה')
+
+    async def rate_tool(self, request):
+        return await self._rate_route(request, self.data.tools, self.data.tool_ratings, 'כלי לא נמצא')
+
+    async def tool_ratings(self, request):
+        return self._ratings_route(request, self.data.tool_ratings)
+
+    async def list_favorites(self, request):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        favorites = []
+        for favorite in self.data.favorites:
+            if favorite['userId'] != user['id']:
+                continue
+            summary = self.data.find(self.data.summaries, favorite['summaryId'])
+            tool = self.data.find(self.data.tools, favorite['toolId'])
+            favorites.append({**favorite, 'summary': summary, 'tool': tool})
+        return web.json_response(favorites)
+
+    def _favorite_key(self, request):
+        kind = request.match_info['kind']
+        if kind not in ('summary', 'tool'):
+            return None
+        item_id = int(request.match_info['id'])
+        return {'summaryId': item_id if kind == 'summary' else None, 'toolId': item_id if kind == 'tool' else None}
+
+    async def add_favorite(self, request):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        key = self._favorite_key(request)
+        if key is None:
+            return await self.not_found(request)
+        if any(f['userId'] == user['id'] and f['summaryId'] == key['summaryId'] and f['toolId'] == key['toolId']
+               for f in self.data.favorites):
+            return web.json_response({'error': 'כבר במועדפים'}, status=400)
+        favorite = {'id': self.data.next_id('favorites', self.data.favorites), 'userId': user['id'], **key,
+                    'createdAt': _iso(datetime.now(timezone.utc))}
+        self.data.favorites.append(favorite)
+        return web.json_response({'message': 'נוסף למועדפים', 'favorite': favorite}, status=201)
+
+    async def remove_favorite(self, request):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        key = self._favorite_key(request)
+        if key is None:
+            return await self.not_found(request)
+        self.data.favorites = [
+            f for f in self.data.favorites
+            if not (f['userId'] == user['id'] and f['summaryId'] == key['summaryId'] and f['toolId'] == key['toolId'])
+        ]
+        return web.json_response({'message': 'הוסר מהמועדפים'})
+
+    async def delete_user(self, request):
+        user = self.current_user(request)
+        if not user or user['role'] != 'ADMIN':
+            return web.json_response({'error': 'נדרשות הרשאות מנהל'}, status=403)
+        user_id = int(request.match_info['id'])
+        if user_id == user['id']:
+            return web.json_response({'error': 'לא ניתן למחוק את עצמך'}, status=400)
+        if not self.data.find(self.data.users, user_id):
+            return web.json_response({'error': 'שגיאה במחיקת משתמש'}, status=500)
+        self.data.delete_user(user_id)
+        self._changed()
+        return web.json_response({'message': 'משתמש נמחק בהצלחה'})
+
+    # --- shared write routes -------------------------------------------------
+
+    async def _update(self, request, records, owner_key, missing, response_key, fields):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        item = self.data.find(records, request.match_info['id'])
+        if not item:
+            return web.json_response({'error': missing}, status=404)
+        if not self._can_modify(user, item[owner_key]):
+            return web.json_response({'error': 'אין לך הרשאה לעדכן פריט זה'}, status=403)
+        body = await self._fields(request)
+        for field in fields:
+            if field in body:
+                item[field] = body[field]
+        if body.get('courseId'):
+            course = self._course_summary(body['courseId'], 'courseCode', 'courseName')
+            if course:
+                item['courseId'], item['course'] = int(body['courseId']), {**item['course'], **course}
+        self._changed()
+        return web.json_response({'message': 'עודכן בהצלחה', response_key: item})
+
+    async def _delete(self, request, attribute, owner_key, missing, message):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        records = getattr(self.data, attribute)
+        item = self.data.find(records, request.match_info['id'])
+        if not item:
+            return web.json_response({'error': missing}, status=404)
+        if not self._can_modify(user, item[owner_key]):
+            return web.json_response({'error': 'אין לך הרשאה למחוק פריט זה'}, status=403)
+        setattr(self.data, attribute, [r for r in records if r is not item])
+        self._changed()
+        return web.json_response({'message': message})
+
+    async def _comment(self, request, records, store, missing):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        item = self.data.find(records, request.match_info['id'])
+        if not item:
+            return web.json_response({'error': missing}, status=404)
+        text = ((await self._fields(request)).get('text') or '').strip()
+        if not text:
+            return web.json_response({'errors': [{'msg': 'תוכן התגובה הוא שדה חובה'}]}, status=400)
+        comments = store.setdefault(item['id'], [])
+        comment = {
+            'id': sum(len(c) for c in store.values()) + 1, 'text': text, 'authorId': user['id'],
+            'createdAt': _iso(datetime.now(timezone.utc)),
+            'author': {'id': user['id'], 'fullName': user['fullName']},
+        }
+        comments.append(comment)
+        item['_count']['comments'] = item['_count'].get('comments', 0) + 1
+        self._changed()
+        return web.json_response({'message': 'תגובה נוספה בהצלחה', 'comment': comment}, status=201)
+
+    async def _rate_route(self, request, records, store, missing):
+        user = self.current_user(request)
+        if not user:
+            return web.json_response(AUTH_REQUIRED, status=401)
+        item = self.data.find(records, request.match_info['id'])
+        if not item:
+            return web.json_response({'error': missing}, status=404)
+        rating = (await self._fields(request)).get('rating')
+        if not str(rating).isdigit() or not 1 <= int(rating) <= 5:
+            return web.json_response({'errors': [{'msg': 'דירוג חייב להיות בין 1 ל-5'}]}, status=400)
+        return web.json_response(self._rate(store, item, user, rating))
+
+    def _ratings_route(self, request, store):
+        ratings = store.get(int(request.match_info['id']), {}) if request.match_info['id'].isdigit() else {}
+        users = {u['id']: u['fullName'] for u in self.data.users}
+        return web.json_response(self._ratings_response(ratings, users, self.current_user(request)))
+
+    async def not_found(self, request):
+        return web.json_response(
+            {'error': 'Not Found', 'message': f'Cannot {request.method} {request.path}'}, status=404
+        )
+
+    async def proxy_to_client(self, request):
+        if not self.client_url:
+            return web.Response(status=404, text='No CLIENT_URL configured for the stand-in backend')
+        if self._client_session is None:
+            # Bodies are passed through untouched, including their encoding
+            self._client_session = ClientSession(auto_decompress=False)
+
+        return await forward(self._client_session, request, self.client_url + request.path_qs)
+
+
+class BackgroundServer:
+    """
+    Runs an aiohttp application on its own event loop in a background thread,
+    so synchronous code (pytest fixtures, Selenium scripts) can start and stop it.
+
+    Args:
+        backend: Object with a create_app() method returning a web.Application
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+        name: Name of the server thread
+    """
+
+    def __init__(self, backend, host='127.0.0.1', port=0, name='background-server'):
+        self.backend = backend
+        self.host = host
+        self.port = port
+        self.name = name
+        self.url = None
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    def start(self):
+        """
+        Start serving and block until the server accepts connections.
+
+        Returns:
+            Base URL of the server
+        """
+        started = threading.Event()
+        errors = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self._start_site())
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            self._loop.close()
+            self._loop = None
+            raise errors[0]
+        return self.url
+
+    async def _start_site(self):
+        self._runner = web.AppRunner(self.backend.create_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f'http://{self.host}:{port}'
+
+    def stop(self):
+        """Stop the server and its event loop."""
+        if not self._loop:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+class StandinServer(BackgroundServer):
+    """
+    Runs a StandinBackend in a background thread.
+
+    Usage:
+        with StandinServer(StandinData(posts=10000), client_url=TestConfig.BASE_URL) as server:
+            driver.get(f"{server.url}/forum")
+    """
+
+    def __init__(self, data, client_url=None, host='127.0.0.1', port=0):
+        super().__init__(StandinBackend(data, client_url), host, port, name='standin-backend')
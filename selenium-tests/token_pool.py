@@ -0,0 +1,200 @@
+"""
+Token Pool for Load Tests
+Signs in a pool of accounts and hands out the one whose rate-limit budget
+still has room, so a load test can drive rate-limited endpoints without
+running into 429s from a single account.
+
+RATE_LIMITS mirrors the express-rate-limit limiters in server/src/routes.
+Keep it in sync when a limiter is added or its window changes.
+"""
+
+import asyncio
+import re
+import time
+from collections import deque, namedtuple
+
+
+RateLimit = namedtuple('RateLimit', 'name method pattern window_s max key')
+
+# key: 'user' limiters count per account and can be spread over the pool;
+# 'ip' limiters count per client address and cannot.
+#
+# The tool limiters in tools.js (create 10/h, update 20/h, delete 20/h,
+# rate 100/h) are not listed: they run after `authenticate` and skip
+# requests with req.user set, so they never apply to signed-in users.
+RATE_LIMITS = [
+    RateLimit('updatePostLimiter', 'PUT', re.compile(r'^/api/forum/(\d+|:id)$'), 3600, 30, 'user'),
+    RateLimit('updateSummaryLimiter', 'PUT', re.compile(r'^/api/summaries/(\d+|:id)$'), 3600, 30, 'user'),
+    RateLimit('avatarUploadLimiter', 'POST', re.compile(r'^/api/auth/profile/avatar$'), 900, 5, 'ip'),
+]
+
+# Fallback password for accounts the pool registers itself
+POOL_PASSWORD = 'loadtest123'
+
+# Logins run in parallel, but bcrypt makes them expensive for the server
+SIGN_IN_CONCURRENCY = 10
+
+
+def find_limit(method, path, limits=RATE_LIMITS):
+    """The limiter that applies to a request (path with real ids or ':id'), or None."""
+    path = path.split('?')[0]
+    for limit in limits:
+        if limit.method == method and limit.pattern.match(path):
+            return limit
+    return None
+
+
+class PoolMember:
+    """One signed-in account and its recent requests per limiter."""
+
+    def __init__(self, email, password):
+        self.email = email
+        self.password = password
+        self.token = None
+        self.user = None
+        # limiter name -> deque of request times (monotonic seconds)
+        self.hits = {}
+        # limiter name -> monotonic time until which the server reported no budget left
+        self.blocked_until = {}
+
+    def has_budget(self, limit, now):
+        if self.blocked_until.get(limit.name, 0) > now:
+            return False
+        hits = self.hits.setdefault(limit.name, deque())
+        # A sliding window never allows more than the server's fixed window does
+        while hits and hits[0] <= now - limit.window_s:
+            hits.popleft()
+        return len(hits) < limit.max
+
+    def spend(self, limit, now):
+        self.hits.setdefault(limit.name, deque()).append(now)
+
+
+class TokenPool:
+    """
+    Authenticated accounts shared by the virtual users of a load test.
+
+    Usage:
+        pool = TokenPool(accounts)
+        await pool.sign_in(http_session, api_url, size=50)
+        member = pool.claim('PUT', '/api/summaries/12')
+    """
+
+    def __init__(self, accounts, limits=RATE_LIMITS):
+        """
+        Args:
+            accounts: List of (email, password) tuples to sign in
+            limits: Rate limits to respect
+        """
+        self.members = [PoolMember(email, password) for email, password in accounts]
+        self.limits = limits
+        self.ip_hits = {}
+        self._next = 0
+
+    async def sign_in(self, session, api_url, size=0, prefix='loadtest'):
+        """
+        Sign in every account, registering extra pool accounts as needed.
+
+        Args:
+            session: aiohttp ClientSession
+            api_url: Base URL of the API
+            size: Minimum pool size; missing accounts are registered as
+                <prefix>-<n>@studyhub.local with POOL_PASSWORD
+            prefix: Email prefix for registered accounts
+
+        Returns:
+            Number of members that signed in
+        """
+        for index in range(len(self.members), size):
+            self.members.append(PoolMember(f"{prefix}-{index}@studyhub.local", POOL_PASSWORD))
+
+        semaphore = asyncio.Semaphore(SIGN_IN_CONCURRENCY)
+
+        async def sign_in_member(member, index):
+            async with semaphore:
+                result = await self._post(session, f"{api_url}/api/auth/login",
+                                          {'email': member.email, 'password': member.password})
+                if result is None and member.password == POOL_PASSWORD:
+                    result = await self._post(session, f"{api_url}/api/auth/register", {
+                        'fullName': f"Load Test {index}",
+                        'email': member.email,
+                        'password': member.password,
+                    })
+                if result:
+                    member.token = result['token']
+                    member.user = result['user']
+
+        await asyncio.gather(*(sign_in_member(m, i) for i, m in enumerate(self.members)))
+        failed = [m.email for m in self.members if not m.token]
+        if failed:
+            print(f"⚠️ {len(failed)} pool accounts could not sign in: {', '.join(failed[:5])}")
+        self.members = [m for m in self.members if m.token]
+        return len(self.members)
+
+    @staticmethod
+    async def _post(session, url, body):
+        async with session.post(url, json=body) as response:
+            if response.status >= 400:
+                return None
+            return await response.json(content_type=None)
+
+    def member(self, index):
+        """Account for virtual user number `index` (round robin)."""
+        return self.members[index % len(self.members)]
+
+    def claim(self, method, path, member=None):
+        """
+        Reserve one request against a rate-limited endpoint.
+
+        Args:
+            method: HTTP method
+            path: Request path
+            member: Account that has to send it (for endpoints that only work
+                for the owner of the content); any account when None
+
+        Returns:
+            PoolMember to send the request as, or None when every eligible
+            account (or the client address) has used up the limiter's window
+        """
+        limit = find_limit(method, path, self.limits)
+        now = time.monotonic()
+        if limit is None:
+            return member or self.member(self._advance())
+
+        if limit.key == 'ip':
+            hits = self.ip_hits.setdefault(limit.name, deque())
+            while hits and hits[0] <= now - limit.window_s:
+                hits.popleft()
+            if len(hits) >= limit.max:
+                return None
+            hits.append(now)
+            return member or self.member(self._advance())
+
+        if member:
+            candidates = [member]
+        else:
+            start = self._advance()
+            candidates = [self.member(start + i) for i in range(len(self.members))]
+        for candidate in candidates:
+            if candidate.has_budget(limit, now):
+                candidate.spend(limit, now)
+                return candidate
+        return None
+
+    def _advance(self):
+        self._next += 1
+        return self._next
+
+    def observe(self, member, method, path, status, headers):
+        """
+        Update an account's budget from the server's RateLimit-* headers,
+        so usage from before the load test (or other clients) is respected.
+        """
+        limit = find_limit(method, path, self.limits)
+        if limit is None or limit.key != 'user':
+            return
+        remaining = headers.get('RateLimit-Remaining')
+        reset = headers.get('RateLimit-Reset')
+        if status == 429 or remaining == '0':
+            wait = float(reset) if reset and reset.isdigit() else limit.window_s
+            member.blocked_until[limit.name] = time.monotonic() + wait
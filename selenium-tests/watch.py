@@ -0,0 +1,166 @@
+"""
+Watch Mode
+Watches client/src, server/src and the test modules, and on every change runs
+only the tests the changed files can affect (see dependency_map.py), attached
+to the persistent browser of browser_daemon.py - no browser startup and no
+login form between runs.
+
+The dependency map is collected by every test run (DEPENDENCY_MAP=true, the
+default). When it is empty, watch mode starts with one full run to build it.
+Tests added later are picked up when their module changes.
+
+Usage:
+    python watch.py
+    python watch.py -- -x --tb=short
+    python watch.py --changed ../client/src/components/forum/ForumPage.tsx
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import dependency_map
+from conftest import TestConfig
+
+
+# (directory, recursive) of the watched files
+WATCHED = (
+    (dependency_map.CLIENT_SRC, True),
+    (dependency_map.SERVER_SRC, True),
+    (dependency_map.TESTS_DIR, False),
+)
+
+IGNORED_DIRS = ('node_modules', '__pycache__', '.browser-cache', '.build-cache')
+
+
+def snapshot():
+    """Modification time of every watched file."""
+    mtimes = {}
+    for root, recursive in WATCHED:
+        for directory, dirs, files in os.walk(root):
+            dirs[:] = [name for name in dirs if recursive and name not in IGNORED_DIRS]
+            for name in files:
+                if root == dependency_map.TESTS_DIR and not name.endswith('.py'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    mtimes[path] = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    pass
+    return mtimes
+
+
+def changed_files(before, after):
+    return sorted(path for path in before.keys() | after.keys() if before.get(path) != after.get(path))
+
+
+def wait_for_quiet(current, interval):
+    """Wait until files stop changing (an editor saving several files, a git checkout)."""
+    while True:
+        time.sleep(interval)
+        latest = snapshot()
+        if latest == current:
+            return latest
+        current = latest
+
+
+def map_path():
+    return os.path.join(dependency_map.TESTS_DIR, TestConfig.DEPENDENCY_MAP_FILE)
+
+
+def run_tests(selection, pytest_args, use_daemon=True):
+    """
+    Run the selected tests (all tests for an empty selection).
+
+    Args:
+        selection: Node ids and test module names from affected_tests()
+        pytest_args: Extra pytest arguments
+        use_daemon: Attach to the persistent browser
+
+    Returns:
+        pytest exit code
+    """
+    env = dict(os.environ, DEPENDENCY_MAP='true')
+    if use_daemon:
+        env['BROWSER_DAEMON'] = 'true'
+    modules = []
+    selection_file = None
+    if selection:
+        # Collect only the affected modules; conftest deselects the rest
+        modules = sorted({entry.split('::')[0] for entry in selection})
+        with tempfile.NamedTemporaryFile('w', suffix='.json', prefix='studyhub-watch-', delete=False) as f:
+            json.dump(selection, f)
+            selection_file = f.name
+        env['WATCH_SELECTION'] = selection_file
+    try:
+        return subprocess.run([sys.executable, '-m', 'pytest', *modules, *pytest_args],
+                              cwd=dependency_map.TESTS_DIR, env=env).returncode
+    finally:
+        if selection_file:
+            os.remove(selection_file)
+
+
+def describe(selection, everything):
+    """Short description of a selection, e.g. '3 tests, 1 module'."""
+    if everything:
+        return 'all tests'
+    tests = sum(1 for entry in selection if '::' in entry)
+    modules = len(selection) - tests
+    parts = [f"{tests} test{'s' if tests != 1 else ''}"] if tests else []
+    if modules:
+        parts.append(f"{modules} module{'s' if modules != 1 else ''}")
+    return ', '.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rerun the tests affected by changed files')
+    parser.add_argument('--interval', type=float, default=0.5, help='Seconds between checks for changes')
+    parser.add_argument('--no-daemon', action='store_true', help='Start a new browser per test instead')
+    parser.add_argument('--changed', nargs='+', metavar='PATH',
+                        help='Only print the tests these files affect and exit')
+    parser.add_argument('pytest_args', nargs='*', help='Extra pytest arguments (after --)')
+    args = parser.parse_args()
+
+    if args.changed:
+        paths = [os.path.abspath(path) for path in args.changed]
+        selection, everything = dependency_map.affected_tests(paths, dependency_map.load_map(map_path()))
+        print('\n'.join(['(all tests)'] if everything else selection or ['(no tests)']))
+        return
+
+    current = snapshot()
+    if not dependency_map.load_map(map_path()):
+        print("🗺️ No dependency map yet - running all tests once to build it")
+        run_tests([], args.pytest_args, use_daemon=not args.no_daemon)
+    print("👀 Watching client/src, server/src and selenium-tests/*.py (Ctrl+C to stop)")
+
+    try:
+        while True:
+            time.sleep(args.interval)
+            latest = snapshot()
+            if latest == current:
+                continue
+            latest = wait_for_quiet(latest, args.interval)
+            changed = changed_files(current, latest)
+            current = latest
+
+            selection, everything = dependency_map.affected_tests(changed, dependency_map.load_map(map_path()))
+            names = ', '.join(os.path.relpath(path, dependency_map.REPO_ROOT) for path in changed[:5])
+            more = f" (+{len(changed) - 5} more)" if len(changed) > 5 else ''
+            if not selection and not everything:
+                print(f"\n⏭️ {names}{more}: no test depends on it")
+                continue
+            print(f"\n🔁 {names}{more}: running {describe(selection, everything)}")
+            started = time.perf_counter()
+            code = run_tests(selection, args.pytest_args, use_daemon=not args.no_daemon)
+            status = '✅ passed' if code == 0 else '❌ failed'
+            print(f"{status} in {time.perf_counter() - started:.1f}s - watching for changes")
+            # Changes made while the tests ran trigger the next run
+    except KeyboardInterrupt:
+        print("\n🛑 Watch mode stopped")
+
+
+if __name__ == "__main__":
+    main()
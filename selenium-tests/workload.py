@@ -0,0 +1,195 @@
+"""
+Workload Recorder
+Records every /api request the browser sends during a Selenium run - method,
+path with query, JSON body and timing relative to the start of the test - and
+writes them to a compact workload file that loadgen.py can replay at higher
+concurrency with other accounts.
+
+The signed-in user's email and password are replaced with placeholders so
+each replaying virtual user can substitute its own credentials.
+"""
+
+import gzip
+import json
+import os
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+from network_log import get_network_log, is_api_request
+
+
+WORKLOAD_FILENAME = 'workload.jsonl.gz'
+
+EMAIL_PLACEHOLDER = '{{email}}'
+PASSWORD_PLACEHOLDER = '{{password}}'
+
+LOGIN_PATH = '/api/auth/login'
+
+
+def substitute(value, replacements):
+    """
+    Replace strings inside a JSON value.
+
+    Args:
+        value: Decoded JSON value (dict, list, str or scalar)
+        replacements: Dict of text -> replacement
+
+    Returns:
+        Copy of the value with every occurrence replaced
+    """
+    if isinstance(value, dict):
+        return {key: substitute(item, replacements) for key, item in value.items()}
+    if isinstance(value, list):
+        return [substitute(item, replacements) for item in value]
+    if isinstance(value, str):
+        for text, replacement in replacements.items():
+            if text:
+                value = value.replace(text, replacement)
+    return value
+
+
+def request_entry(record, offset_ms, replacements):
+    """
+    Compact workload entry for one recorded request.
+
+    Keys: t (ms since the first request), m (method), p (path and query),
+    a (sent with a token), b (JSON body) or k ('multipart' for uploads,
+    which are not replayed).
+    """
+    url = urlsplit(record['url'])
+    entry = {
+        't': round(offset_ms),
+        'm': record['method'],
+        'p': substitute(url.path + (f"?{url.query}" if url.query else ''), replacements),
+        'a': any(key.lower() == 'authorization' for key in record['request_headers']),
+    }
+    content_type = (record['request_headers'].get('Content-Type') or
+                    record['request_headers'].get('content-type') or '')
+    if content_type.startswith('multipart/'):
+        entry['k'] = 'multipart'
+    elif record['post_data']:
+        try:
+            entry['b'] = substitute(json.loads(record['post_data']), replacements)
+        except ValueError:
+            entry['k'] = 'raw'
+    return entry
+
+
+def login_credentials(records):
+    """Email and password from the first login request, if the test logged in."""
+    for record in records:
+        if record['method'] == 'POST' and urlsplit(record['url']).path == LOGIN_PATH and record['post_data']:
+            try:
+                body = json.loads(record['post_data'])
+            except ValueError:
+                continue
+            return body.get('email'), body.get('password')
+    return None, None
+
+
+def build_session(test, records, fallback_email=None, fallback_password=None):
+    """
+    Turn the API requests of one test into a workload session.
+
+    Args:
+        test: pytest node id
+        records: Request records from NetworkLog
+        fallback_email: Email to replace when the test did not log in itself
+        fallback_password: Password to replace when the test did not log in itself
+
+    Returns:
+        Session dict, or None when the test made no API requests
+    """
+    api = [r for r in records
+           if is_api_request(r) and r['method'] != 'OPTIONS' and r['started'] is not None]
+    if not api:
+        return None
+
+    email, password = login_credentials(api)
+    replacements = {
+        email or fallback_email: EMAIL_PLACEHOLDER,
+        password or fallback_password: PASSWORD_PLACEHOLDER,
+    }
+    first = api[0]['started']
+    return {
+        'test': test,
+        'requests': [request_entry(r, (r['started'] - first) * 1000, replacements) for r in api],
+    }
+
+
+class WorkloadRecorder:
+    """
+    Records the API requests of one test into SESSION_WORKLOAD.
+
+    The driver must be created with network capture enabled.
+    """
+
+    def __init__(self, email=None, password=None):
+        """
+        Args:
+            email: Account email to replace with a placeholder
+            password: Account password to replace with a placeholder
+        """
+        self.email = email
+        self.password = password
+
+    def attach(self, driver):
+        """Nothing to install; the requests are read from the network log in finish()."""
+
+    def finish(self, driver, item):
+        """
+        Add the test's API requests to the session workload.
+
+        Returns:
+            None (recording never fails a test)
+        """
+        try:
+            records = get_network_log(driver).since(0)
+        except WebDriverException as e:
+            print(f"⚠️ Could not read network log: {e}")
+            return None
+        session = build_session(item.nodeid, records, self.email, self.password)
+        if session:
+            SESSION_WORKLOAD.append(session)
+        return None
+
+
+# Recorded sessions (one per test) of the current pytest session
+SESSION_WORKLOAD = []
+
+
+def write_workload(report_dir, sessions=None):
+    """
+    Write recorded sessions as gzipped JSON lines (one session per line).
+
+    Args:
+        report_dir: Directory for performance reports
+        sessions: Sessions to write (default: SESSION_WORKLOAD)
+
+    Returns:
+        Path of the written file, or None when nothing was recorded
+    """
+    sessions = SESSION_WORKLOAD if sessions is None else sessions
+    if not sessions:
+        return None
+    os.makedirs(report_dir, exist_ok=True)
+    filepath = os.path.join(report_dir, WORKLOAD_FILENAME)
+    with gzip.open(filepath, 'wt', encoding='utf-8') as f:
+        for session in sessions:
+            f.write(json.dumps(session, ensure_ascii=False, separators=(',', ':')) + '\n')
+    return filepath
+
+
+def read_workload(filepath):
+    """
+    Read a workload file written by write_workload().
+
+    Returns:
+        List of session dicts
+    """
+    with gzip.open(filepath, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def fill_placeholders(value, email, password):
+    """Fill the placeholders of a recorded path or body with a virtual user's credentials."""
+    return substitute(value, {EMAIL_PLACEHOLDER: email, PASSWORD_PLACEHOLDER: password})